@@ -6,7 +6,12 @@ import pandas as pd
 import plotly.graph_objects as go
 import time
 import re
+from functools import partial
 from utils.sheets_api import SheetsAPI, clear_sheets_cache
+from utils.dashboard_snapshot import DashboardSnapshot, SECTIONS as DASHBOARD_SECTIONS
+from utils.dashboard_cache import DashboardCache
+from utils.row_index import data_version
+from utils import instrumentation
 from utils.ui import (
     load_custom_css, render_stat_card, render_dept_item,
     render_alert_item, render_chart_legend,
@@ -14,6 +19,7 @@ from utils.ui import (
     get_attendance_table_css
 )
 from utils.sidebar import render_shared_sidebar
+from utils import profiler
 
 
 def get_nearest_sunday(d: date) -> date:
@@ -30,6 +36,7 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
+profiler.start("dashboard")
 
 # ============================================================
 # 2. CSS 및 UI 초기화
@@ -48,15 +55,9 @@ if 'api' not in st.session_state:
         # 에러 메시지를 사용자에게 표시하지 않음 (콘솔에만 로깅)
         print(f"DB Connection Error: {str(e)}")
 
-@st.cache_data(ttl=86400, show_spinner=False)  # 24시간 캐시
-def fetch_dashboard_data_from_api(base_date: str):
-    """
-    API에서 대시보드 데이터 조회 (캐시됨)
-
-    Args:
-        base_date: 기준 날짜 (YYYY-MM-DD, 일요일)
-    """
-    data = {
+def empty_dashboard_data(base_date: str) -> dict:
+    """빈 대시보드 데이터 (조회 실패 시 표시용, 캐시하지 않음)"""
+    return {
         "total_members": 0,
         "current_attend": 0,
         "last_week_attend": 0,
@@ -75,122 +76,66 @@ def fetch_dashboard_data_from_api(base_date: str):
         "dept_trends": {}          # 부서별 8주 트렌드 (팝오버용)
     }
 
-    try:
-        api = SheetsAPI()
-
-        # 기준 날짜 파싱
-        last_sunday = pd.Timestamp(base_date)
-        last_sunday_str = base_date
-
-        # 1. 전체 재적 성도 (status='재적' - 출석률 모수)
-        df_members = api.get_members({'status': '재적'})
-        data['total_members'] = len(df_members)
-
-        # 2. 이번달 신규 등록
-        data['new_members'] = api.get_new_members_this_month()
-
-        # 3. 금주 출석 (선택된 날짜 기준)
-        df_this = api.get_attendance(last_sunday.year, date=last_sunday_str)
-        if not df_this.empty:
-            data['current_attend'] = len(df_this[df_this['attend_type'].astype(str).isin(['1', '2'])])
-
-        # 전주 출석
-        prev_sunday = last_sunday - pd.Timedelta(days=7)
-        df_prev = api.get_attendance(prev_sunday.year, date=str(prev_sunday.date()))
-        if not df_prev.empty:
-            data['last_week_attend'] = len(df_prev[df_prev['attend_type'].astype(str).isin(['1', '2'])])
-
-        # 차트 데이터 (4주)
-        dates = []
-        attends = []
-        totals = []
-        for i in range(3, -1, -1):
-            d = last_sunday - pd.Timedelta(days=7*i)
-            d_str = d.strftime('%Y-%m-%d')
-            df_d = api.get_attendance(d.year, date=d_str)
-            cnt = 0
-            if not df_d.empty:
-                cnt = len(df_d[df_d['attend_type'].astype(str).isin(['1', '2'])])
-            dates.append(d.strftime('%m/%d'))
-            attends.append(cnt)
-            totals.append(data['total_members'])
-        data['chart_dates'] = dates
-        data['chart_attend'] = attends
-        data['chart_total'] = totals
-
-        # 4. 부서별 출석
-        data['dept_attendance'] = api.get_department_attendance(last_sunday_str)
-
-        # 5. 목장별 출석
-        data['mokjang_attendance'] = api.get_mokjang_attendance(last_sunday_str)
-
-        # 6. 3주 연속 결석자
-        try:
-            data['absent_3weeks'] = api.get_3week_absent_members()
-        except:
-            data['absent_3weeks'] = []
-
-        # 7. 이번 주 생일자
-        try:
-            data['birthdays'] = api.get_birthdays_this_week()
-        except:
-            data['birthdays'] = []
-
-        # ===== dashboard_v3 용 데이터 =====
-
-        # 8. 8주 부서별 출석 (스택 바 차트용)
-        try:
-            data['stacked_chart_data'] = api.get_8week_dept_attendance()
-            print(f"[DEBUG] stacked_chart_data loaded: {len(data['stacked_chart_data'])} weeks")
-        except Exception as e:
-            print(f"[ERROR] get_8week_dept_attendance failed: {e}")
-            data['stacked_chart_data'] = []
-
-        # 9. 부서별 통계 (부서 카드용) - 선택된 날짜 기준
-        try:
-            data['dept_stats'] = api.get_dept_stats(base_date)
-            print(f"[DEBUG] dept_stats loaded: {len(data['dept_stats'])} departments (base_date={base_date})")
-        except Exception as e:
-            print(f"[ERROR] get_dept_stats failed: {e}")
-            data['dept_stats'] = []
-
-        # 10. 부서별 8주 트렌드 (팝오버 미니차트용) - 선택된 날짜 기준
-        try:
-            dept_trends = {}
-            for dept in data['dept_stats']:
-                dept_id = dept.get('dept_id', '')
-                if dept_id:
-                    dept_trends[dept_id] = api.get_dept_attendance_trend(dept_id, base_date)
-            data['dept_trends'] = dept_trends
-            print(f"[DEBUG] dept_trends loaded: {len(dept_trends)} departments (base_date={base_date})")
-        except Exception as e:
-            print(f"[ERROR] get_dept_attendance_trend failed: {e}")
-            data['dept_trends'] = {}
+def fetch_dashboard_section(section: str, base_date: str) -> dict:
+    """
+    대시보드 섹션 1개 계산 (get_dashboard_cache(section)이 캐시/백그라운드 재계산)
+    조회 실패 시 예외를 그대로 올려 빈 결과가 캐시되지 않도록 함
 
-    except Exception as e:
-        print(f"Data Load Error: {e}")
+    Args:
+        section: DASHBOARD_SECTIONS 중 하나
+        base_date: 기준 날짜 (YYYY-MM-DD, 일요일)
+    """
+    # 섹션에 필요한 프레임만 로드해 집계 (설정 > 진단에 섹션별 소요 시간 기록)
+    with instrumentation.timed('call', f'dashboard.{section}', base_date=base_date):
+        return DashboardSnapshot(SheetsAPI(), base_date).section(section)
 
-    return data
+@st.cache_resource(show_spinner=False)
+def get_dashboard_cache(section: str) -> DashboardCache:
+    """프로세스 공용 섹션별 대시보드 캐시 (stale-while-revalidate, 24시간 또는 데이터 변경 시 재계산)"""
+    return DashboardCache(partial(fetch_dashboard_section, section), data_version, name=f'dashboard_{section}')
 
-def get_dashboard_data(base_date: str, force_refresh=False):
-    """대시보드 데이터 조회 (24시간 캐싱)"""
-    if force_refresh:
-        # 캐시 강제 삭제
-        fetch_dashboard_data_from_api.clear()
-        st.session_state['dashboard_cache_time'] = time.time()
+def invalidate_dashboard():
+    """모든 섹션 캐시 무효화 (기존 값 표시 + 다음 조회 때 백그라운드 재계산)"""
+    for section in DASHBOARD_SECTIONS:
+        get_dashboard_cache(section).invalidate()
 
-    # 캐시 시간이 없으면 초기화
-    if 'dashboard_cache_time' not in st.session_state:
-        st.session_state['dashboard_cache_time'] = time.time()
+def refresh_dashboard_after_save():
+    """출석 저장 직후 - 다음 실행에서 모든 섹션을 기다려서 재계산 (저장 전 값이 남지 않도록)"""
+    st.session_state['dashboard_refresh_now'] = set(DASHBOARD_SECTIONS)
 
-    return fetch_dashboard_data_from_api(base_date)
+def get_dashboard_section(section: str, base_date: str) -> dict:
+    """
+    대시보드 섹션 데이터 조회
+    - 캐시가 오래됐거나 새로고침한 경우에도 기존 값을 바로 반환하고 백그라운드에서 재계산
+    - 저장 직후(refresh_dashboard_after_save)에는 해당 섹션을 바로 재계산해 저장한 값 표시
+    - 섹션마다 따로 캐시되므로 먼저 표시할 섹션(통계 카드)이 무거운 섹션을 기다리지 않음
+    - 계산 시각/재계산 여부는 session_state['dashboard_cache_time'/'dashboard_refreshing']에 섹션별로 저장
+      (헤더 "마지막 업데이트" 표시용)
+    """
+    cache = get_dashboard_cache(section)
+    pending = st.session_state.get('dashboard_refresh_now', set())
+    try:
+        with st.spinner("📊 데이터를 불러오는 중..."):
+            if section in pending:
+                pending.discard(section)
+                data, updated_at = cache.refresh_now(base_date)
+            else:
+                data, updated_at = cache.get(base_date)
+    except Exception as e:
+        # 할당량 초과 재시도 후에도 실패 - 0으로 채운 결과를 캐시하지 않고 다음 실행 때 다시 조회
+        print(f"Data Load Error ({section}): {e}")
+        st.warning("구글 시트 응답이 지연되고 있습니다. 잠시 후 새로고침해 주세요.")
+        return empty_dashboard_data(base_date)
+
+    st.session_state.setdefault('dashboard_cache_time', {})[section] = updated_at
+    st.session_state.setdefault('dashboard_refreshing', {})[section] = cache.is_refreshing(base_date)
+    return {**empty_dashboard_data(base_date), **data}
 
 # 앱 버전 체크 - 새 버전 배포 시 캐시 자동 클리어
 APP_VERSION = "v3.37"  # 헤더 레이아웃: 주차이동 버튼 방식으로 변경
 if st.session_state.get('app_version') != APP_VERSION:
     st.session_state['app_version'] = APP_VERSION
-    st.session_state['dashboard_data_loaded'] = False
-    fetch_dashboard_data_from_api.clear()
+    invalidate_dashboard()
     print(f"[INFO] App version updated to {APP_VERSION}, cache cleared.")
 
 # ============================================================
@@ -208,17 +153,11 @@ if 'selected_sunday' not in st.session_state:
 selected_sunday_str = st.session_state.selected_sunday.strftime('%Y-%m-%d')
 
 # 강제 새로고침 처리
-force_refresh = st.session_state.get('force_refresh', False)
-if force_refresh:
+if st.session_state.get('force_refresh', False):
     st.session_state['force_refresh'] = False
+    invalidate_dashboard()
 
-# 로딩 표시 (데이터 로드 중)
-if 'dashboard_data_loaded' not in st.session_state:
-    with st.spinner("📊 데이터를 불러오는 중..."):
-        dashboard_data = get_dashboard_data(selected_sunday_str, force_refresh=True)
-        st.session_state['dashboard_data_loaded'] = True
-else:
-    dashboard_data = get_dashboard_data(selected_sunday_str, force_refresh=force_refresh)
+# 섹션 데이터는 화면 순서대로 각 섹션을 그리기 직전에 조회 (통계 카드 먼저, 무거운 섹션은 뒤이어)
 
 # ============================================================
 # 4. 사이드바 렌더링 (공유 모듈 사용)
@@ -474,69 +413,14 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# 알림 데이터 준비
-absent_list = dashboard_data.get('absent_3weeks', [])
-birthdays = dashboard_data.get('birthdays', [])
-absent_count = len(absent_list)
-bday_count = len(birthdays)
-
-# 결석자 상세 목록 생성 (툴팁용)
-absent_detail = ""
-if absent_count > 0:
-    dept_absent = {}
-    for m in absent_list:
-        dept = m.get('dept_name', '기타')
-        if dept not in dept_absent:
-            dept_absent[dept] = []
-        dept_absent[dept].append(m['name'])
-    for dept, names in dept_absent.items():
-        absent_detail += f"{dept} ({len(names)}명): {', '.join(names)}. "
-
-# 생일자 상세 목록 생성 (툴팁용)
-bday_detail = ""
-if bday_count > 0:
-    dept_bday = {}
-    for b in birthdays:
-        dept = b.get('dept_name', '기타')
-        if dept not in dept_bday:
-            dept_bday[dept] = []
-        dept_bday[dept].append(f"{b['name']} ({b['birth_date']})")
-    for dept, names in dept_bday.items():
-        bday_detail += f"{dept} ({len(names)}명): {', '.join(names)}. "
-
-absent_tooltip = absent_detail.strip() if absent_count > 0 else "결석자 없음"
-bday_tooltip = bday_detail.strip() if bday_count > 0 else "금주 생일자 없음"
-
-# 캐시 시간 계산
-cache_time = st.session_state.get('dashboard_cache_time', 0)
-if cache_time > 0:
-    cache_age_min = int((time.time() - cache_time) / 60)
-    cache_info = f"{cache_age_min}분 전" if cache_age_min < 60 else f"{cache_age_min // 60}시간 전"
-else:
-    cache_info = "최신"
+# 알림 자리 (결석 판정이 무거우므로 통계 카드를 먼저 그린 뒤 채움)
+alerts_slot = st.empty()
 
 # 날짜 포맷 (목업과 동일: 2025. 12. 21 (일))
 weekday_names = ['월', '화', '수', '목', '금', '토', '일']
 weekday = weekday_names[st.session_state.selected_sunday.weekday()]
 date_str = f"{st.session_state.selected_sunday.year}. {st.session_state.selected_sunday.month}. {st.session_state.selected_sunday.day} ({weekday})"
 
-# Option C 헤더 - 알림 (상단 우측)
-alerts_html = f'''
-<div class="alerts-float">
-    <div class="alert-inline" title="{absent_tooltip}">
-        <span class="dot warning"></span>
-        <span class="label">3주 결석</span>
-        <span class="count warning">{absent_count}명</span>
-    </div>
-    <div class="alert-inline" title="{bday_tooltip}">
-        <span class="dot info"></span>
-        <span class="label">금주 생일</span>
-        <span class="count info">{bday_count}명</span>
-    </div>
-</div>
-'''
-st.markdown(alerts_html, unsafe_allow_html=True)
-
 # 메인 행: 대시보드(좌) + 컨트롤 영역(우)
 col_title, col_controls = st.columns([1.6, 1.4])
 
@@ -577,15 +461,18 @@ with col_controls:
 
     with ctrl_cols[3]:
         if st.button("🔄", key="refresh_btn", help="데이터 새로고침"):
-            fetch_dashboard_data_from_api.clear()
+            # 시트 캐시를 비우고 대시보드는 무효화만 (기존 값 표시 + 백그라운드 재계산)
             clear_sheets_cache()
             st.session_state['force_refresh'] = True
-            st.session_state['dashboard_data_loaded'] = False
-            st.session_state['dashboard_cache_time'] = 0
             st.rerun()
 
     with ctrl_cols[4]:
-        st.markdown(f'<div style="font-size:11px;color:#6B7B8C;padding-top:8px;text-align:center;">{cache_info}</div>', unsafe_allow_html=True)
+        cache_slot = st.empty()  # 통계 카드 조회 후 채움
+
+# ============================================================
+# 통계 카드 (가장 먼저 조회/표시)
+# ============================================================
+dashboard_data = get_dashboard_section('stat_cards', selected_sunday_str)
 
 # 통계 데이터 계산
 val_total = 0
@@ -643,133 +530,183 @@ with stat_cols[3]:
 
 st.markdown("<div style='height: 16px;'></div>", unsafe_allow_html=True)
 
+# 캐시 시간 계산 (통계 카드 기준, 백그라운드 재계산 중인 섹션이 있으면 "업데이트 중")
+cache_time = st.session_state.get('dashboard_cache_time', {}).get('stat_cards', 0)
+if any(st.session_state.get('dashboard_refreshing', {}).values()):
+    cache_info = "업데이트 중"
+elif cache_time > 0:
+    cache_age_min = int((time.time() - cache_time) / 60)
+    cache_info = "최신" if cache_age_min < 1 else (f"{cache_age_min}분 전" if cache_age_min < 60 else f"{cache_age_min // 60}시간 전")
+else:
+    cache_info = "최신"
+
+cache_slot.markdown(f'<div style="font-size:11px;color:#6B7B8C;padding-top:8px;text-align:center;">{cache_info}</div>', unsafe_allow_html=True)
+
 # ============================================================
-# 섹션 1: 8주 출석 현황 (스택 바 차트)
+# 헤더 알림 (3주 결석 / 금주 생일) - 통계 카드 뒤에 계산해 맨 위 자리에 채움
 # ============================================================
-bar_chart_svg = '<svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2"><path d="M18 20V10"/><path d="M12 20V4"/><path d="M6 20v-6"/></svg>'
-inline_legend = '''<div class="inline-legend">
-    <span class="legend-dot" style="background:#6B5B47;"></span>장년
-    <span class="legend-dot" style="background:#556B82;"></span>청년
-    <span class="legend-dot" style="background:#6B8E23;"></span>청소년
-    <span class="legend-dot" style="background:#D2691E;"></span>어린이
-</div>'''
-st.markdown(f'''<div class="stacked-chart-section">
-    <div class="section-title-row">{bar_chart_svg}<span>최근 8주 출석 현황</span>{inline_legend}</div>
-''', unsafe_allow_html=True)
-
-# 스택 바 차트 데이터
-stacked_data = dashboard_data.get('stacked_chart_data', [])
-
-if stacked_data:
-    # Plotly 스택 바 차트
-    weeks = [d['week'] for d in stacked_data]
-    adults_data = [d['adults'] for d in stacked_data]
-    youth_data = [d['youth'] for d in stacked_data]
-    teens_data = [d['teens'] for d in stacked_data]
-    children_data = [d['children'] for d in stacked_data]
-
-    # 합계 계산 (바 위에 표시용)
-    totals = [a + y + t + c for a, y, t, c in zip(adults_data, youth_data, teens_data, children_data)]
-
-    fig = go.Figure()
-
-    # 어린이부 (맨 아래) - 숫자 내부 표시, textangle=0으로 회전 방지
-    fig.add_trace(go.Bar(
-        x=weeks, y=children_data, name='어린이부',
-        marker_color='#D2691E', marker_line_width=0,
-        text=children_data, textposition='inside',
-        textfont=dict(color='white', size=14),
-        insidetextanchor='middle', textangle=0
-    ))
-    # 청소년부 - 숫자 내부 표시, textangle=0으로 회전 방지
-    fig.add_trace(go.Bar(
-        x=weeks, y=teens_data, name='청소년부',
-        marker_color='#6B8E23', marker_line_width=0,
-        text=teens_data, textposition='inside',
-        textfont=dict(color='white', size=14),
-        insidetextanchor='middle', textangle=0
-    ))
-    # 청년부 - 숫자 내부 표시, textangle=0으로 회전 방지
-    fig.add_trace(go.Bar(
-        x=weeks, y=youth_data, name='청년부',
-        marker_color='#556B82', marker_line_width=0,
-        text=youth_data, textposition='inside',
-        textfont=dict(color='white', size=14),
-        insidetextanchor='middle', textangle=0
-    ))
-    # 장년부 (맨 위) - 숫자 내부 표시, textangle=0으로 회전 방지
-    fig.add_trace(go.Bar(
-        x=weeks, y=adults_data, name='장년부',
-        marker_color='#6B5B47', marker_line_width=0,
-        text=adults_data, textposition='inside',
-        textfont=dict(color='white', size=14),
-        insidetextanchor='middle', textangle=0
-    ))
-
-    # 합계를 바 위에 표시 (scatter로 추가)
-    fig.add_trace(go.Scatter(
-        x=weeks, y=totals, mode='text',
-        text=[str(t) for t in totals],
-        textposition='top center',
-        textfont=dict(color='#2C3E50', size=14, weight='bold'),
-        showlegend=False
-    ))
-
-    fig.update_layout(
-        barmode='stack',
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        margin=dict(l=0, r=0, t=30, b=40),
-        height=380,
-        showlegend=False,
-        barcornerradius=4,
-        dragmode=False,
-        uniformtext=dict(minsize=8, mode='show'),  # 작은 바에도 텍스트 강제 표시
-        xaxis=dict(
-            showgrid=False,
-            showline=False,
-            showticklabels=True,
-            tickfont=dict(size=12, color='#6B7B8C', family='Noto Sans KR')
-        ),
-        yaxis=dict(
-            showgrid=True,
-            gridcolor='#F0F0F0',
-            showline=False,
-            showticklabels=False,
-            zeroline=False
-        )
-    )
+alerts_data = get_dashboard_section('alerts', selected_sunday_str)
+absent_list = alerts_data.get('absent_3weeks', [])
+birthdays = alerts_data.get('birthdays', [])
+absent_count = len(absent_list)
+bday_count = len(birthdays)
 
-    st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False, 'staticPlot': True})
-else:
-    st.markdown('<p style="color:#6B7B8C;font-size:14px;text-align:center;padding:40px;">출석 데이터가 없습니다</p>', unsafe_allow_html=True)
+# 결석자 상세 목록 생성 (툴팁용)
+absent_detail = ""
+if absent_count > 0:
+    dept_absent = {}
+    for m in absent_list:
+        dept = m.get('dept_name', '기타')
+        if dept not in dept_absent:
+            dept_absent[dept] = []
+        dept_absent[dept].append(m['name'])
+    for dept, names in dept_absent.items():
+        absent_detail += f"{dept} ({len(names)}명): {', '.join(names)}. "
 
-st.markdown('</div>', unsafe_allow_html=True)  # stacked-chart-section 닫기
+# 생일자 상세 목록 생성 (툴팁용)
+bday_detail = ""
+if bday_count > 0:
+    dept_bday = {}
+    for b in birthdays:
+        dept = b.get('dept_name', '기타')
+        if dept not in dept_bday:
+            dept_bday[dept] = []
+        dept_bday[dept].append(f"{b['name']} ({b['birth_date']})")
+    for dept, names in dept_bday.items():
+        bday_detail += f"{dept} ({len(names)}명): {', '.join(names)}. "
 
-st.markdown("<div style='height: 24px;'></div>", unsafe_allow_html=True)
+absent_tooltip = absent_detail.strip() if absent_count > 0 else "결석자 없음"
+bday_tooltip = bday_detail.strip() if bday_count > 0 else "금주 생일자 없음"
+
+# Option C 헤더 - 알림 (상단 우측)
+alerts_html = f'''
+<div class="alerts-float">
+    <div class="alert-inline" title="{absent_tooltip}">
+        <span class="dot warning"></span>
+        <span class="label">3주 결석</span>
+        <span class="count warning">{absent_count}명</span>
+    </div>
+    <div class="alert-inline" title="{bday_tooltip}">
+        <span class="dot info"></span>
+        <span class="label">금주 생일</span>
+        <span class="count info">{bday_count}명</span>
+    </div>
+</div>
+'''
+alerts_slot.markdown(alerts_html, unsafe_allow_html=True)
 
 # ============================================================
-# 섹션 2: 부서별 현황 (2x2 카드 + 목장 그리드)
+# 섹션 1: 8주 출석 현황 (스택 바 차트)
 # ============================================================
-hierarchy_svg = '<svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2"><rect x="3" y="3" width="18" height="18" rx="2"/><path d="M3 9h18"/><path d="M9 21V9"/></svg>'
-st.markdown(f'''<div class="hierarchy-section">
-    <div class="section-title">{hierarchy_svg}부서별 현황</div>
-''', unsafe_allow_html=True)
-
-st.markdown("<div style='height: 12px;'></div>", unsafe_allow_html=True)
+def render_stacked_chart(base_date: str):
+    """8주 부서별 출석 스택 바 차트 (통계 카드/알림이 표시된 뒤 조회)"""
+    bar_chart_svg = '<svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2"><path d="M18 20V10"/><path d="M12 20V4"/><path d="M6 20v-6"/></svg>'
+    inline_legend = '''<div class="inline-legend">
+        <span class="legend-dot" style="background:#6B5B47;"></span>장년
+        <span class="legend-dot" style="background:#556B82;"></span>청년
+        <span class="legend-dot" style="background:#6B8E23;"></span>청소년
+        <span class="legend-dot" style="background:#D2691E;"></span>어린이
+    </div>'''
+    st.markdown(f'''<div class="stacked-chart-section">
+        <div class="section-title-row">{bar_chart_svg}<span>최근 8주 출석 현황</span>{inline_legend}</div>
+    ''', unsafe_allow_html=True)
+
+    # 스택 바 차트 데이터
+    stacked_data = get_dashboard_section('stacked_chart', base_date).get('stacked_chart_data', [])
+
+    if stacked_data:
+        # Plotly 스택 바 차트
+        weeks = [d['week'] for d in stacked_data]
+        adults_data = [d['adults'] for d in stacked_data]
+        youth_data = [d['youth'] for d in stacked_data]
+        teens_data = [d['teens'] for d in stacked_data]
+        children_data = [d['children'] for d in stacked_data]
+
+        # 합계 계산 (바 위에 표시용)
+        totals = [a + y + t + c for a, y, t, c in zip(adults_data, youth_data, teens_data, children_data)]
+
+        fig = go.Figure()
+
+        # 어린이부 (맨 아래) - 숫자 내부 표시, textangle=0으로 회전 방지
+        fig.add_trace(go.Bar(
+            x=weeks, y=children_data, name='어린이부',
+            marker_color='#D2691E', marker_line_width=0,
+            text=children_data, textposition='inside',
+            textfont=dict(color='white', size=14),
+            insidetextanchor='middle', textangle=0
+        ))
+        # 청소년부 - 숫자 내부 표시, textangle=0으로 회전 방지
+        fig.add_trace(go.Bar(
+            x=weeks, y=teens_data, name='청소년부',
+            marker_color='#6B8E23', marker_line_width=0,
+            text=teens_data, textposition='inside',
+            textfont=dict(color='white', size=14),
+            insidetextanchor='middle', textangle=0
+        ))
+        # 청년부 - 숫자 내부 표시, textangle=0으로 회전 방지
+        fig.add_trace(go.Bar(
+            x=weeks, y=youth_data, name='청년부',
+            marker_color='#556B82', marker_line_width=0,
+            text=youth_data, textposition='inside',
+            textfont=dict(color='white', size=14),
+            insidetextanchor='middle', textangle=0
+        ))
+        # 장년부 (맨 위) - 숫자 내부 표시, textangle=0으로 회전 방지
+        fig.add_trace(go.Bar(
+            x=weeks, y=adults_data, name='장년부',
+            marker_color='#6B5B47', marker_line_width=0,
+            text=adults_data, textposition='inside',
+            textfont=dict(color='white', size=14),
+            insidetextanchor='middle', textangle=0
+        ))
+
+        # 합계를 바 위에 표시 (scatter로 추가)
+        fig.add_trace(go.Scatter(
+            x=weeks, y=totals, mode='text',
+            text=[str(t) for t in totals],
+            textposition='top center',
+            textfont=dict(color='#2C3E50', size=14, weight='bold'),
+            showlegend=False
+        ))
+
+        fig.update_layout(
+            barmode='stack',
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            margin=dict(l=0, r=0, t=30, b=40),
+            height=380,
+            showlegend=False,
+            barcornerradius=4,
+            dragmode=False,
+            uniformtext=dict(minsize=8, mode='show'),  # 작은 바에도 텍스트 강제 표시
+            xaxis=dict(
+                showgrid=False,
+                showline=False,
+                showticklabels=True,
+                tickfont=dict(size=12, color='#6B7B8C', family='Noto Sans KR')
+            ),
+            yaxis=dict(
+                showgrid=True,
+                gridcolor='#F0F0F0',
+                showline=False,
+                showticklabels=False,
+                zeroline=False
+            )
+        )
 
-# 부서 선택 상태 초기화
-if 'selected_dept' not in st.session_state:
-    dept_stats = dashboard_data.get('dept_stats', [])
-    if dept_stats:
-        st.session_state.selected_dept = dept_stats[0].get('dept_id', '')
+        st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False, 'staticPlot': True})
     else:
-        st.session_state.selected_dept = ''
+        st.markdown('<p style="color:#6B7B8C;font-size:14px;text-align:center;padding:40px;">출석 데이터가 없습니다</p>', unsafe_allow_html=True)
+
+    st.markdown('</div>', unsafe_allow_html=True)  # stacked-chart-section 닫기
+
+    st.markdown("<div style='height: 24px;'></div>", unsafe_allow_html=True)
 
-# 부서 카드 그리드 (클릭 가능한 통합 UI)
-dept_stats = dashboard_data.get('dept_stats', [])
-dept_trends = dashboard_data.get('dept_trends', {})
+render_stacked_chart(selected_sunday_str)
 
+# ============================================================
+# 섹션 2: 부서별 현황 (2x2 카드 + 목장 그리드)
+# ============================================================
 # 부서 버튼 색상 매핑 (차트 색상과 일치)
 DEPT_COLORS = {
     'adults': '#6B5B47',    # 장년부
@@ -778,126 +715,152 @@ DEPT_COLORS = {
     'children': '#D2691E',  # 어린이부
 }
 
-# 부서 버튼 커스텀 CSS (선택 시 부서 색상 적용)
-# 부서 인덱스와 색상을 매핑하여 nth-child 선택자 사용
-selected_dept = st.session_state.get('selected_dept', '')
-selected_idx = None
-selected_color = '#C9A962'
-
-for i, dept in enumerate(dept_stats):
-    if dept.get('dept_id', '') == selected_dept:
-        selected_idx = i + 1  # CSS nth-child는 1부터 시작
-        css_class = dept.get('css_class', 'adults')
-        selected_color = DEPT_COLORS.get(css_class, '#C9A962')
-        break
-
-# CSS 선택자 방식 제거 - 버튼 아래에 직접 색상 바 추가로 변경
+def select_dept(dept_id: str):
+    """부서 카드 클릭 콜백"""
+    st.session_state.selected_dept = dept_id
+    st.session_state.selected_group = None  # 부서 변경 시 목장 선택 초기화
+
+def select_group(group_id):
+    """목장 버튼 클릭 콜백 (None이면 부서 전체)"""
+    st.session_state.selected_group = group_id
+
+@st.fragment
+def render_dept_section(base_date: str):
+    """부서 카드 + 선택한 부서의 목장/출석 테이블 (fragment - 부서를 바꾸면 이 섹션만 다시 실행)"""
+    hierarchy_svg = '<svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2"><rect x="3" y="3" width="18" height="18" rx="2"/><path d="M3 9h18"/><path d="M9 21V9"/></svg>'
+    st.markdown(f'''<div class="hierarchy-section">
+        <div class="section-title">{hierarchy_svg}부서별 현황</div>
+    ''', unsafe_allow_html=True)
+
+    st.markdown("<div style='height: 12px;'></div>", unsafe_allow_html=True)
+
+    # 부서 카드 데이터 (부서별 통계 + 8주 트렌드)
+    dept_data = get_dashboard_section('dept_cards', base_date)
+    dept_stats = dept_data.get('dept_stats', [])
+    dept_trends = dept_data.get('dept_trends', {})
+
+    # 부서 선택 상태 초기화
+    if 'selected_dept' not in st.session_state:
+        if dept_stats:
+            st.session_state.selected_dept = dept_stats[0].get('dept_id', '')
+        else:
+            st.session_state.selected_dept = ''
 
-if dept_stats:
-    # 부서 수에 따라 컬럼 생성 (기본 4개)
-    dept_cols = st.columns(len(dept_stats))
+    # 부서 버튼 커스텀 CSS (선택 시 부서 색상 적용)
+    # 부서 인덱스와 색상을 매핑하여 nth-child 선택자 사용
+    selected_dept = st.session_state.get('selected_dept', '')
+    selected_idx = None
+    selected_color = '#C9A962'
 
     for i, dept in enumerate(dept_stats):
-        dept_id = dept.get('dept_id', '')
-        dept_name = dept.get('name', '')
-        is_active = (dept_id == st.session_state.selected_dept)
-        trend_data = dept_trends.get(dept_id, [])
-
-        with dept_cols[i]:
-            # 부서 고유 색상
+        if dept.get('dept_id', '') == selected_dept:
+            selected_idx = i + 1  # CSS nth-child는 1부터 시작
             css_class = dept.get('css_class', 'adults')
-            dept_color = DEPT_COLORS.get(css_class, '#C9A962')
-
-            # 부서 선택 버튼 (클릭 가능)
-            btn_type = "primary" if is_active else "secondary"
-            if st.button(
-                f"{dept.get('emoji', '👥')} {dept_name}",
-                key=f"dept_card_{dept_id}",
-                use_container_width=True,
-                type=btn_type
-            ):
-                st.session_state.selected_dept = dept_id
-                st.session_state.selected_group = None  # 부서 변경 시 목장 선택 초기화
-                st.rerun()
-
-            # 선택된 부서일 경우 부서 고유색 바 표시
-            if is_active:
-                st.markdown(f'<div style="height:4px;background:{dept_color};border-radius:2px;margin-top:-8px;margin-bottom:8px;"></div>', unsafe_allow_html=True)
-
-            # 부서 통계 카드 (시각적 정보)
-            groups_count = dept.get('groups_count', 0)
-            members_count = dept.get('members_count', 0)
-            attendance_rate = dept.get('attendance_rate', 0)
-            attendance_count = int(members_count * attendance_rate / 100) if members_count > 0 else 0
-            group_label = "반" if dept.get('css_class') == "children" else "목장"
-
-            # 미니 트렌드 라인차트 생성 (꺾은선 + 점 아래 숫자)
-            trend_chart = ""
-            if trend_data and len(trend_data) > 0:
-                max_val = max(trend_data) if max(trend_data) > 0 else 100
-                min_val = min(trend_data) if min(trend_data) > 0 else 0
-                range_val = max_val - min_val if max_val != min_val else 1
-
-                # SVG 꺾은선 차트 생성
-                chart_width = 120
-                chart_height = 36
-                points = []
-                labels = []
-                for idx, val in enumerate(trend_data):
-                    x = int((idx / (len(trend_data) - 1)) * (chart_width - 10)) + 5 if len(trend_data) > 1 else chart_width // 2
-                    y = int(chart_height - 8 - ((val - min_val) / range_val) * (chart_height - 16))
-                    points.append(f"{x},{y}")
-                    # 점 아래 숫자 (매 2번째만 표시하여 겹침 방지)
-                    if idx % 2 == 1 or len(trend_data) <= 4:
-                        labels += f'<circle cx="{x}" cy="{y}" r="3" fill="{dept_color}"/>'
-                        labels += f'<text x="{x}" y="{y + 14}" text-anchor="middle" font-size="11" fill="#6B7B8C">{val}</text>'
-                    else:
-                        labels += f'<circle cx="{x}" cy="{y}" r="2" fill="{dept_color}"/>'
-
-                polyline = f'<polyline points="{" ".join(points)}" fill="none" stroke="{dept_color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>'
-                trend_chart = f'<svg width="100%" height="50" viewBox="0 0 {chart_width} {chart_height + 10}" preserveAspectRatio="xMidYMid meet" style="overflow:visible;">{polyline}{"".join(labels)}</svg>'
-            else:
-                trend_chart = '<div style="color:#6B7B8C;font-size:10px;">8주 트렌드</div>'
+            selected_color = DEPT_COLORS.get(css_class, '#C9A962')
+            break
 
-            active_style = "border-color:#C9A962;background:linear-gradient(135deg,rgba(201,169,98,0.15) 0%,rgba(201,169,98,0.05) 100%);" if is_active else ""
+    # CSS 선택자 방식 제거 - 버튼 아래에 직접 색상 바 추가로 변경
 
-            # 순서: 전체/출석/출석률/목장
-            st.markdown(f'''
-                <div style="background:#F8F6F3;border:2px solid #E8E4DF;border-radius:12px;padding:12px;margin-top:8px;{active_style}">
-                    <div style="display:flex;justify-content:space-between;gap:4px;margin-bottom:8px;">
-                        <div style="text-align:center;flex:1;">
-                            <div style="font-size:11px;color:#6B7B8C;margin-bottom:1px;">전체</div>
-                            <div style="font-size:16px;font-weight:700;color:#2C3E50;">{members_count}</div>
-                        </div>
-                        <div style="text-align:center;flex:1;">
-                            <div style="font-size:11px;color:#6B7B8C;margin-bottom:1px;">출석</div>
-                            <div style="font-size:16px;font-weight:700;color:#4A9B7F;">{attendance_count}</div>
-                        </div>
-                        <div style="text-align:center;flex:1;">
-                            <div style="font-size:11px;color:#6B7B8C;margin-bottom:1px;">출석률</div>
-                            <div style="font-size:16px;font-weight:700;color:#C9A962;">{attendance_rate}%</div>
+    if dept_stats:
+        # 부서 수에 따라 컬럼 생성 (기본 4개)
+        dept_cols = st.columns(len(dept_stats))
+
+        for i, dept in enumerate(dept_stats):
+            dept_id = dept.get('dept_id', '')
+            dept_name = dept.get('name', '')
+            is_active = (dept_id == st.session_state.selected_dept)
+            trend_data = dept_trends.get(dept_id, [])
+
+            with dept_cols[i]:
+                # 부서 고유 색상
+                css_class = dept.get('css_class', 'adults')
+                dept_color = DEPT_COLORS.get(css_class, '#C9A962')
+
+                # 부서 선택 버튼 (콜백에서 선택을 바꿔 fragment 재실행 한 번으로 반영)
+                btn_type = "primary" if is_active else "secondary"
+                st.button(
+                    f"{dept.get('emoji', '👥')} {dept_name}",
+                    key=f"dept_card_{dept_id}",
+                    use_container_width=True,
+                    type=btn_type,
+                    on_click=select_dept,
+                    args=(dept_id,)
+                )
+
+                # 선택된 부서일 경우 부서 고유색 바 표시
+                if is_active:
+                    st.markdown(f'<div style="height:4px;background:{dept_color};border-radius:2px;margin-top:-8px;margin-bottom:8px;"></div>', unsafe_allow_html=True)
+
+                # 부서 통계 카드 (시각적 정보)
+                groups_count = dept.get('groups_count', 0)
+                members_count = dept.get('members_count', 0)
+                attendance_rate = dept.get('attendance_rate', 0)
+                attendance_count = int(members_count * attendance_rate / 100) if members_count > 0 else 0
+                group_label = "반" if dept.get('css_class') == "children" else "목장"
+
+                # 미니 트렌드 라인차트 생성 (꺾은선 + 점 아래 숫자)
+                trend_chart = ""
+                if trend_data and len(trend_data) > 0:
+                    max_val = max(trend_data) if max(trend_data) > 0 else 100
+                    min_val = min(trend_data) if min(trend_data) > 0 else 0
+                    range_val = max_val - min_val if max_val != min_val else 1
+
+                    # SVG 꺾은선 차트 생성
+                    chart_width = 120
+                    chart_height = 36
+                    points = []
+                    labels = []
+                    for idx, val in enumerate(trend_data):
+                        x = int((idx / (len(trend_data) - 1)) * (chart_width - 10)) + 5 if len(trend_data) > 1 else chart_width // 2
+                        y = int(chart_height - 8 - ((val - min_val) / range_val) * (chart_height - 16))
+                        points.append(f"{x},{y}")
+                        # 점 아래 숫자 (매 2번째만 표시하여 겹침 방지)
+                        if idx % 2 == 1 or len(trend_data) <= 4:
+                            labels += f'<circle cx="{x}" cy="{y}" r="3" fill="{dept_color}"/>'
+                            labels += f'<text x="{x}" y="{y + 14}" text-anchor="middle" font-size="11" fill="#6B7B8C">{val}</text>'
+                        else:
+                            labels += f'<circle cx="{x}" cy="{y}" r="2" fill="{dept_color}"/>'
+
+                    polyline = f'<polyline points="{" ".join(points)}" fill="none" stroke="{dept_color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>'
+                    trend_chart = f'<svg width="100%" height="50" viewBox="0 0 {chart_width} {chart_height + 10}" preserveAspectRatio="xMidYMid meet" style="overflow:visible;">{polyline}{"".join(labels)}</svg>'
+                else:
+                    trend_chart = '<div style="color:#6B7B8C;font-size:10px;">8주 트렌드</div>'
+
+                active_style = "border-color:#C9A962;background:linear-gradient(135deg,rgba(201,169,98,0.15) 0%,rgba(201,169,98,0.05) 100%);" if is_active else ""
+
+                # 순서: 전체/출석/출석률/목장
+                st.markdown(f'''
+                    <div style="background:#F8F6F3;border:2px solid #E8E4DF;border-radius:12px;padding:12px;margin-top:8px;{active_style}">
+                        <div style="display:flex;justify-content:space-between;gap:4px;margin-bottom:8px;">
+                            <div style="text-align:center;flex:1;">
+                                <div style="font-size:11px;color:#6B7B8C;margin-bottom:1px;">전체</div>
+                                <div style="font-size:16px;font-weight:700;color:#2C3E50;">{members_count}</div>
+                            </div>
+                            <div style="text-align:center;flex:1;">
+                                <div style="font-size:11px;color:#6B7B8C;margin-bottom:1px;">출석</div>
+                                <div style="font-size:16px;font-weight:700;color:#4A9B7F;">{attendance_count}</div>
+                            </div>
+                            <div style="text-align:center;flex:1;">
+                                <div style="font-size:11px;color:#6B7B8C;margin-bottom:1px;">출석률</div>
+                                <div style="font-size:16px;font-weight:700;color:#C9A962;">{attendance_rate}%</div>
+                            </div>
+                            <div style="text-align:center;flex:1;">
+                                <div style="font-size:11px;color:#6B7B8C;margin-bottom:1px;">{group_label}</div>
+                                <div style="font-size:16px;font-weight:700;color:#2C3E50;">{groups_count}</div>
+                            </div>
                         </div>
-                        <div style="text-align:center;flex:1;">
-                            <div style="font-size:11px;color:#6B7B8C;margin-bottom:1px;">{group_label}</div>
-                            <div style="font-size:16px;font-weight:700;color:#2C3E50;">{groups_count}</div>
+                        <div style="display:flex;align-items:center;justify-content:center;padding-top:6px;border-top:1px solid #E8E4DF;">
+                            {trend_chart}
                         </div>
                     </div>
-                    <div style="display:flex;align-items:center;justify-content:center;padding-top:6px;border-top:1px solid #E8E4DF;">
-                        {trend_chart}
-                    </div>
-                </div>
-            ''', unsafe_allow_html=True)
+                ''', unsafe_allow_html=True)
 
-    # 목장 선택 상태 초기화
-    if 'selected_group' not in st.session_state:
-        st.session_state.selected_group = None  # None이면 부서 전체
-
-    # 선택된 부서의 목장 그리드
-    if st.session_state.selected_dept:
-        try:
-            api = st.session_state.api
-            groups = api.get_groups_by_dept(st.session_state.selected_dept)
+        # 목장 선택 상태 초기화
+        if 'selected_group' not in st.session_state:
+            st.session_state.selected_group = None  # None이면 부서 전체
 
+        # 선택된 부서의 목장 그리드
+        if st.session_state.selected_dept:
             # 선택된 부서명 찾기
             selected_dept_name = "장년부"
             for dept in dept_stats:
@@ -905,182 +868,195 @@ if dept_stats:
                     selected_dept_name = dept.get('name', '장년부')
                     break
 
-            if groups:
-                # 목장 섹션 헤더
-                group_label = "반" if selected_dept_name == "어린이부" else "목장"
-                total_members = sum(g.get('members_count', 0) for g in groups)
-                st.markdown(f'''<div class="groups-section">
-                    <div class="groups-title">선택된 부서의 {group_label} ({selected_dept_name})</div>
-                </div>''', unsafe_allow_html=True)
-
-                # 전체 + 목장 버튼 그리드 (5열)
-                cols_per_row = 5
-                all_items = [{'group_id': None, 'name': '전체', 'members_count': total_members}] + groups
-
-                for row_start in range(0, len(all_items), cols_per_row):
-                    cols = st.columns(cols_per_row)
-                    for col_idx, item in enumerate(all_items[row_start:row_start + cols_per_row]):
-                        with cols[col_idx]:
-                            group_id = item.get('group_id')
-                            group_name = item.get('name', '')
-                            members_count = item.get('members_count', 0)
-                            is_selected = (st.session_state.selected_group == group_id)
-
-                            # 선택된 목장 스타일
-                            btn_type = "primary" if is_selected else "secondary"
-                            # '목장' 단어 제거 (장년부/청년부)
-                            clean_name = group_name.replace('목장', '').strip()
-                            btn_label = f"{clean_name} ({members_count})"
-
-                            if st.button(btn_label, key=f"group_btn_{group_id}", use_container_width=True, type=btn_type):
-                                st.session_state.selected_group = group_id
-                                st.rerun()
-
-                # ============================================================
-                # 출석 현황 테이블 (편집 가능)
-                # ============================================================
-                st.markdown("<div style='height: 16px;'></div>", unsafe_allow_html=True)
-
-                # 출석 테이블 데이터 조회
-                try:
-                    attendance_table_data = api.get_dept_attendance_table(
-                        dept_id=st.session_state.selected_dept,
-                        base_date=selected_sunday_str,
-                        group_id=st.session_state.selected_group
-                    )
+            render_group_attendance(st.session_state.selected_dept, selected_dept_name, base_date)
+    else:
+        st.markdown('<p style="color:#6B7B8C;font-size:14px;text-align:center;padding:40px;">부서 데이터가 없습니다</p>', unsafe_allow_html=True)
 
-                    # 선택된 목장명 찾기
-                    selected_group_name = None
-                    if st.session_state.selected_group:
-                        for g in groups:
-                            if g.get('group_id') == st.session_state.selected_group:
-                                selected_group_name = g.get('name')
-                                break
-
-                    weeks = attendance_table_data.get('weeks', [])
-                    week_dates = attendance_table_data.get('week_dates', [])
-                    members_data = attendance_table_data.get('members', [])
-
-                    if members_data:
-                        title = f"{selected_group_name} 출석 현황" if selected_group_name else f"{selected_dept_name} 출석 현황"
-
-                        # 출석률 계산
-                        total_checks = len(members_data) * len(weeks)
-                        present_checks = sum(sum(m.get('attendance', [])) for m in members_data)
-                        rate = round((present_checks / total_checks) * 100, 1) if total_checks > 0 else 0
-
-                        st.markdown(f'''<div class="attendance-table-section">
-                            <div class="attendance-table-header">
-                                <span class="attendance-table-title">📋 {title} (최근 8주)</span>
-                                <span class="attendance-table-stat">평균 출석률: <strong>{rate}%</strong> ({present_checks}/{total_checks}) | 셀을 클릭하여 출석 수정</span>
-                            </div>
-                        ''', unsafe_allow_html=True)
-
-                        # DataFrame 구성 (편집용)
-                        df_data = []
-                        for m in members_data:
-                            row = {
-                                'member_id': m['member_id'],  # hidden, for API call
-                                '이름': m['name'],
-                                '목장': m['group_name'],
-                            }
-                            # 각 주차별 출석 상태 (체크박스 형태)
-                            for i, week_label in enumerate(weeks):
-                                row[week_label] = bool(m['attendance'][i])
-                            df_data.append(row)
-
-                        df = pd.DataFrame(df_data)
-
-                        # "전체" 선택 시 목장(1st) + 이름(2nd)으로 정렬
-                        if not st.session_state.selected_group:
-                            df = df.sort_values(by=['목장', '이름'], ascending=[True, True]).reset_index(drop=True)
-
-                        # 원본 데이터 저장 (변경 감지용)
-                        original_key = f"original_attendance_{st.session_state.selected_dept}_{st.session_state.selected_group}"
-                        if original_key not in st.session_state:
-                            st.session_state[original_key] = df.copy()
-
-                        # 편집 가능한 테이블
-                        column_config = {
-                            'member_id': None,  # 숨김
-                            '이름': st.column_config.TextColumn('이름', disabled=True, width='small'),
-                            '목장': st.column_config.TextColumn('목장', disabled=True, width='small'),
+    st.markdown('</div>', unsafe_allow_html=True)  # hierarchy-section 닫기
+
+@st.fragment
+def render_group_attendance(dept_id: str, selected_dept_name: str, base_date: str):
+    """
+    선택한 부서의 목장 버튼 + 편집 가능한 출석 테이블
+    (render_dept_section 안의 fragment - 목장 선택/체크박스 편집은 이 부분만 다시 실행)
+    """
+    try:
+        api = st.session_state.api
+        groups = api.get_groups_by_dept(dept_id)
+
+        if groups:
+            # 목장 섹션 헤더
+            group_label = "반" if selected_dept_name == "어린이부" else "목장"
+            total_members = sum(g.get('members_count', 0) for g in groups)
+            st.markdown(f'''<div class="groups-section">
+                <div class="groups-title">선택된 부서의 {group_label} ({selected_dept_name})</div>
+            </div>''', unsafe_allow_html=True)
+
+            # 전체 + 목장 버튼 그리드 (5열)
+            cols_per_row = 5
+            all_items = [{'group_id': None, 'name': '전체', 'members_count': total_members}] + groups
+
+            for row_start in range(0, len(all_items), cols_per_row):
+                cols = st.columns(cols_per_row)
+                for col_idx, item in enumerate(all_items[row_start:row_start + cols_per_row]):
+                    with cols[col_idx]:
+                        group_id = item.get('group_id')
+                        group_name = item.get('name', '')
+                        members_count = item.get('members_count', 0)
+                        is_selected = (st.session_state.selected_group == group_id)
+
+                        # 선택된 목장 스타일
+                        btn_type = "primary" if is_selected else "secondary"
+                        # '목장' 단어 제거 (장년부/청년부)
+                        clean_name = group_name.replace('목장', '').strip()
+                        btn_label = f"{clean_name} ({members_count})"
+
+                        st.button(btn_label, key=f"group_btn_{group_id}", use_container_width=True, type=btn_type,
+                                  on_click=select_group, args=(group_id,))
+
+            # ============================================================
+            # 출석 현황 테이블 (편집 가능)
+            # ============================================================
+            st.markdown("<div style='height: 16px;'></div>", unsafe_allow_html=True)
+
+            # 출석 테이블 데이터 조회
+            try:
+                attendance_table_data = api.get_dept_attendance_table(
+                    dept_id=dept_id,
+                    base_date=base_date,
+                    group_id=st.session_state.selected_group
+                )
+
+                # 선택된 목장명 찾기
+                selected_group_name = None
+                if st.session_state.selected_group:
+                    for g in groups:
+                        if g.get('group_id') == st.session_state.selected_group:
+                            selected_group_name = g.get('name')
+                            break
+
+                weeks = attendance_table_data.get('weeks', [])
+                week_dates = attendance_table_data.get('week_dates', [])
+                members_data = attendance_table_data.get('members', [])
+
+                if members_data:
+                    title = f"{selected_group_name} 출석 현황" if selected_group_name else f"{selected_dept_name} 출석 현황"
+
+                    # 출석률 계산
+                    total_checks = len(members_data) * len(weeks)
+                    present_checks = sum(sum(m.get('attendance', [])) for m in members_data)
+                    rate = round((present_checks / total_checks) * 100, 1) if total_checks > 0 else 0
+
+                    st.markdown(f'''<div class="attendance-table-section">
+                        <div class="attendance-table-header">
+                            <span class="attendance-table-title">📋 {title} (최근 8주)</span>
+                            <span class="attendance-table-stat">평균 출석률: <strong>{rate}%</strong> ({present_checks}/{total_checks}) | 셀을 클릭하여 출석 수정</span>
+                        </div>
+                    ''', unsafe_allow_html=True)
+
+                    # DataFrame 구성 (편집용)
+                    df_data = []
+                    for m in members_data:
+                        row = {
+                            'member_id': m['member_id'],  # hidden, for API call
+                            '이름': m['name'],
+                            '목장': m['group_name'],
                         }
-                        # 주차 컬럼은 체크박스로
-                        for week_label in weeks:
-                            column_config[week_label] = st.column_config.CheckboxColumn(
-                                week_label,
-                                width='small',
-                                help=f'{week_label} 출석 여부 (클릭하여 변경)'
-                            )
-
-                        edited_df = st.data_editor(
-                            df,
-                            column_config=column_config,
-                            hide_index=True,
-                            use_container_width=True,
-                            key=f"attendance_editor_{st.session_state.selected_dept}_{st.session_state.selected_group}"
+                        # 각 주차별 출석 상태 (체크박스 형태)
+                        for i, week_label in enumerate(weeks):
+                            row[week_label] = bool(m['attendance'][i])
+                        df_data.append(row)
+
+                    df = pd.DataFrame(df_data)
+
+                    # "전체" 선택 시 목장(1st) + 이름(2nd)으로 정렬
+                    if not st.session_state.selected_group:
+                        df = df.sort_values(by=['목장', '이름'], ascending=[True, True]).reset_index(drop=True)
+
+                    # 원본 데이터 저장 (변경 감지용)
+                    original_key = f"original_attendance_{dept_id}_{st.session_state.selected_group}"
+                    if original_key not in st.session_state:
+                        st.session_state[original_key] = df.copy()
+
+                    # 편집 가능한 테이블
+                    column_config = {
+                        'member_id': None,  # 숨김
+                        '이름': st.column_config.TextColumn('이름', disabled=True, width='small'),
+                        '목장': st.column_config.TextColumn('목장', disabled=True, width='small'),
+                    }
+                    # 주차 컬럼은 체크박스로
+                    for week_label in weeks:
+                        column_config[week_label] = st.column_config.CheckboxColumn(
+                            week_label,
+                            width='small',
+                            help=f'{week_label} 출석 여부 (클릭하여 변경)'
                         )
 
-                        # 변경 사항 수집 (즉시 저장하지 않음)
-                        original_df = st.session_state[original_key]
-                        pending_changes = []
-
-                        for idx, row in edited_df.iterrows():
-                            member_id = row['member_id']
-                            for i, week_label in enumerate(weeks):
-                                original_val = original_df.loc[idx, week_label] if idx < len(original_df) else None
-                                new_val = row[week_label]
-
-                                if original_val is not None and original_val != new_val:
-                                    pending_changes.append({
-                                        'member_id': member_id,
-                                        'date': week_dates[i],
-                                        'new_val': new_val
-                                    })
-
-                        st.markdown('</div>', unsafe_allow_html=True)
-
-                        # 변경 사항이 있으면 저장 버튼 표시
-                        if pending_changes:
-                            if st.button(f"💾 {len(pending_changes)}건 저장", key="save_attendance_btn", type="primary", use_container_width=True):
-                                with st.spinner("저장 중..."):
-                                    success_count = 0
-                                    for change in pending_changes:
-                                        try:
-                                            result = api.toggle_attendance(change['member_id'], change['date'])
-                                            if result.get('success'):
-                                                success_count += 1
-                                        except Exception as toggle_err:
-                                            st.error(f"출석 변경 실패: {toggle_err}")
-
-                                    if success_count > 0:
-                                        st.session_state[original_key] = edited_df.copy()
-                                        fetch_dashboard_data_from_api.clear()
-                                        st.toast(f"✅ {success_count}건 저장 완료", icon="✅")
-                                        st.rerun()
-                    else:
-                        st.markdown(f'''<div class="attendance-table-section">
-                            <div class="attendance-table-header">
-                                <span class="attendance-table-title">📋 {selected_dept_name} 출석 현황</span>
-                            </div>
-                            <p style="color:#6B7B8C;font-size:14px;text-align:center;padding:40px;">출석 데이터가 없습니다</p>
-                        </div>''', unsafe_allow_html=True)
+                    edited_df = st.data_editor(
+                        df,
+                        column_config=column_config,
+                        hide_index=True,
+                        use_container_width=True,
+                        key=f"attendance_editor_{dept_id}_{st.session_state.selected_group}"
+                    )
+
+                    # 변경 사항 수집 (즉시 저장하지 않음)
+                    original_df = st.session_state[original_key]
+                    pending_changes = []
+
+                    for idx, row in edited_df.iterrows():
+                        member_id = row['member_id']
+                        for i, week_label in enumerate(weeks):
+                            original_val = original_df.loc[idx, week_label] if idx < len(original_df) else None
+                            new_val = row[week_label]
+
+                            if original_val is not None and original_val != new_val:
+                                pending_changes.append({
+                                    'member_id': member_id,
+                                    'date': week_dates[i],
+                                    'new_val': new_val
+                                })
+
+                    st.markdown('</div>', unsafe_allow_html=True)
+
+                    # 변경 사항이 있으면 저장 버튼 표시
+                    if pending_changes:
+                        if st.button(f"💾 {len(pending_changes)}건 저장", key="save_attendance_btn", type="primary", use_container_width=True):
+                            with st.spinner("저장 중..."):
+                                success_count = 0
+                                try:
+                                    result = api.apply_attendance_changes(pending_changes)
+                                    if result.get('success'):
+                                        success_count = len(result.get('results', []))
+                                except Exception as toggle_err:
+                                    st.error(f"출석 변경 실패: {toggle_err}")
+
+                                if success_count > 0:
+                                    st.session_state[original_key] = edited_df.copy()
+                                    st.toast(f"✅ {success_count}건 저장 완료", icon="✅")
+                                    refresh_dashboard_after_save()
+                                    st.rerun()  # 통계 카드/알림/차트도 저장한 값으로 다시 계산되도록 전체 재실행
+                else:
+                    st.markdown(f'''<div class="attendance-table-section">
+                        <div class="attendance-table-header">
+                            <span class="attendance-table-title">📋 {selected_dept_name} 출석 현황</span>
+                        </div>
+                        <p style="color:#6B7B8C;font-size:14px;text-align:center;padding:40px;">출석 데이터가 없습니다</p>
+                    </div>''', unsafe_allow_html=True)
 
-                except Exception as e:
-                    import traceback
-                    error_detail = f"{type(e).__name__}: {e}"
-                    st.markdown(f'<div class="attendance-table-section"><p style="color:#6B7B8C;font-size:14px;text-align:center;padding:40px;">출석 데이터를 불러올 수 없습니다: {error_detail}</p></div>', unsafe_allow_html=True)
-                    print(f"[출석테이블 에러] {traceback.format_exc()}")
+            except Exception as e:
+                import traceback
+                error_detail = f"{type(e).__name__}: {e}"
+                st.markdown(f'<div class="attendance-table-section"><p style="color:#6B7B8C;font-size:14px;text-align:center;padding:40px;">출석 데이터를 불러올 수 없습니다: {error_detail}</p></div>', unsafe_allow_html=True)
+                print(f"[출석테이블 에러] {traceback.format_exc()}")
 
-            else:
-                st.markdown(f'<div class="groups-section"><div class="groups-title">선택된 부서의 목장 ({selected_dept_name})</div><p style="color:#6B7B8C;font-size:14px;text-align:center;padding:20px;">목장 데이터가 없습니다</p></div>', unsafe_allow_html=True)
-        except Exception as e:
-            st.markdown(f'<div class="groups-section"><p style="color:#6B7B8C;font-size:14px;text-align:center;padding:20px;">목장 데이터를 불러올 수 없습니다</p></div>', unsafe_allow_html=True)
-else:
-    st.markdown('<p style="color:#6B7B8C;font-size:14px;text-align:center;padding:40px;">부서 데이터가 없습니다</p>', unsafe_allow_html=True)
+        else:
+            st.markdown(f'<div class="groups-section"><div class="groups-title">선택된 부서의 목장 ({selected_dept_name})</div><p style="color:#6B7B8C;font-size:14px;text-align:center;padding:20px;">목장 데이터가 없습니다</p></div>', unsafe_allow_html=True)
+    except Exception as e:
+        st.markdown(f'<div class="groups-section"><p style="color:#6B7B8C;font-size:14px;text-align:center;padding:20px;">목장 데이터를 불러올 수 없습니다</p></div>', unsafe_allow_html=True)
 
-st.markdown('</div>', unsafe_allow_html=True)  # hierarchy-section 닫기
+render_dept_section(selected_sunday_str)
 
 # 알림은 헤더 우측 상단으로 이동됨
 
+profiler.render()
@@ -0,0 +1,215 @@
+"""
+SheetsAPI 집계 / 대시보드 빌더 벤치마크 (로컬 Sheets 에뮬레이터 + 합성 데이터)
+
+성도 수 × 출석 연수 조합마다 합성 데이터를 에뮬레이터에 올리고, 각 집계를
+- cold: 캐시/스냅샷을 모두 비운 첫 호출 (시트 조회 + 프레임 생성 + 집계)
+- warm: 캐시가 찬 상태의 재호출
+로 실행해 실행 시간, 최대 메모리(cold, tracemalloc), 처리 행 수/API 호출 수(cold)를 출력합니다.
+집계 시간만 보도록 에뮬레이터 호출은 스케줄러(분당 할당량 대기/재시도)를 거치지 않습니다.
+할당량 동작은 SHEETS_BACKEND=emulator + SHEETS_EMULATOR_READS_PER_MINUTE로 앱을 실행해 확인하세요.
+
+사용법 (saint-record-system 폴더에서):
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --members 200 2000 --years 1 3 --save-baseline bench.json
+    python benchmarks/run_benchmarks.py --baseline bench.json --threshold 1.5   # 느려지면 종료 코드 1
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 스냅샷 캐시는 임시 폴더로 (실제 앱 캐시를 건드리지 않도록, utils import 전에 지정)
+_CACHE_DIR = tempfile.mkdtemp(prefix='saint-bench-')
+os.environ['SHEETS_CACHE_DIR'] = _CACHE_DIR
+os.environ['SHEETS_BACKEND'] = 'emulator'
+logging.getLogger('streamlit').setLevel(logging.ERROR)
+
+from utils import sheets_api, sheets_emulator
+from utils.sheets_api import SheetsAPI, clear_sheets_cache
+from utils.dashboard_snapshot import DashboardSnapshot, MEMBER_STATUS
+from utils.sheets_emulator import EmulatedSpreadsheet
+from benchmarks.synthetic_data import generate_congregation, sundays
+
+DEFAULT_MEMBERS = [200, 2000, 20000]
+DEFAULT_YEARS = [1, 10]
+MAX_ATTENDANCE_ROWS = 3_000_000  # 이보다 큰 조합은 건너뜀 (에뮬레이터가 전부 메모리에 올림)
+
+# 회귀 판정 시 무시하는 절대 차이 (작은 값의 측정 잡음)
+TIME_SLACK = 0.05   # 초
+MEMORY_SLACK = 5.0  # MB
+
+
+def yearly_statistics(api: SheetsAPI) -> dict:
+    """통계 페이지 get_yearly_statistics와 같은 조회 (올해 주일별 부서 출석 인원 + 부서별 성도 수)"""
+    today = date.today()
+    sunday_strs = [d.isoformat() for d in sundays(date(today.year, 1, 1), today)]
+    members = api.get_members({'status': MEMBER_STATUS})
+    rollup = api.get_weekly_rollup(today.year)
+    return {
+        'members': len(members),
+        'totals': rollup.totals('dept_id', status=MEMBER_STATUS),
+        'weekly': rollup.present(sunday_strs, 'dept_id', status=MEMBER_STATUS),
+    }
+
+
+def benchmarks(base_date: str, dept_ids: List[str]) -> Dict[str, Callable[[SheetsAPI], object]]:
+    """벤치마크 이름 → 실행 함수 (app.py 대시보드 빌더 포함)"""
+    return {
+        'get_members': lambda api: api.get_members(),
+        'get_dept_attendance_table': lambda api: [api.get_dept_attendance_table(d, base_date) for d in dept_ids],
+        'get_3week_absent_members': lambda api: api.get_3week_absent_members(base_date=base_date),
+        'get_birthdays_this_week': lambda api: api.get_birthdays_this_week(),
+        'get_yearly_statistics': yearly_statistics,
+        'get_group_stats': lambda api: api.get_group_stats(base_date),
+        'get_department_attendance': lambda api: api.get_department_attendance(base_date),
+        'get_mokjang_attendance': lambda api: api.get_mokjang_attendance(base_date),
+        'get_new_members_this_month': lambda api: api.get_new_members_this_month(),
+        'get_8week_dept_attendance': lambda api: api.get_8week_dept_attendance(),
+        'get_dept_stats': lambda api: api.get_dept_stats(base_date),
+        'dashboard': lambda api: DashboardSnapshot(api, base_date).to_dict(),
+        'dashboard_stat_cards': lambda api: DashboardSnapshot(api, base_date).section('stat_cards'),  # 첫 표시 섹션
+    }
+
+
+def _reset_caches():
+    """앱 캐시 + 디스크 스냅샷 비우기 (cold 측정)"""
+    clear_sheets_cache(full=True)
+    shutil.rmtree(_CACHE_DIR, ignore_errors=True)
+    gc.collect()
+
+
+def _timed(fn: Callable[[], object], repeat: int, cold: bool) -> float:
+    """repeat회 실행 중 최솟값 (초)"""
+    best = float('inf')
+    for _ in range(repeat):
+        if cold:
+            _reset_caches()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_scenario(members: int, years: int, seed: int, repeat: int, latency: float) -> Dict[str, Dict]:
+    """성도 수 × 연수 조합 1개 실행 → {벤치마크: 측정값}"""
+    data = generate_congregation(members, years, seed)
+    spreadsheet = EmulatedSpreadsheet(data, latency=latency)
+    sheets_emulator.install(spreadsheet)
+    sheets_api._get_sheets_pool.clear()
+    api = SheetsAPI()
+
+    today = date.today()
+    base_date = (today - timedelta(days=(today.weekday() + 1) % 7)).isoformat()
+    dept_ids = [row[0] for row in data['_Departments'][1:]]
+
+    results = {}
+    for name, bench in benchmarks(base_date, dept_ids).items():
+        run = lambda: bench(api)
+
+        # cold 1회: 메모리 + 처리 행/호출 수
+        _reset_caches()
+        rows_before, calls_before = sum(spreadsheet.rows.values()), sum(spreadsheet.calls.values())
+        tracemalloc.start()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results[name] = {
+            'rows': sum(spreadsheet.rows.values()) - rows_before,
+            'calls': sum(spreadsheet.calls.values()) - calls_before,
+            'peak_mb': round(peak / 1024 / 1024, 2),
+            'cold_s': round(_timed(run, repeat, cold=True), 4),
+            'warm_s': round(_timed(run, repeat, cold=False), 4),
+        }
+
+    sheets_emulator.install(None)
+    sheets_api._get_sheets_pool.clear()
+    return results
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """기준 결과 대비 threshold배를 넘게 느려지거나 메모리가 늘어난 항목"""
+    regressions = []
+    for scenario, benches in results.items():
+        for name, current in benches.items():
+            base = baseline.get(scenario, {}).get(name)
+            if not base:
+                continue
+            for metric, slack in (('cold_s', TIME_SLACK), ('warm_s', TIME_SLACK), ('peak_mb', MEMORY_SLACK)):
+                if current[metric] > base[metric] * threshold and current[metric] - base[metric] > slack:
+                    regressions.append(
+                        f'{scenario} {name} {metric}: {base[metric]} → {current[metric]} '
+                        f'(x{current[metric] / max(base[metric], 1e-9):.2f})'
+                    )
+    return regressions
+
+
+def _print_table(scenario: str, results: Dict[str, Dict]):
+    print(f'\n=== {scenario} ===')
+    print(f"{'benchmark':<28}{'cold(s)':>10}{'warm(s)':>10}{'peak(MB)':>10}{'rows':>10}{'calls':>7}")
+    for name, r in results.items():
+        print(f"{name:<28}{r['cold_s']:>10.4f}{r['warm_s']:>10.4f}{r['peak_mb']:>10.2f}{r['rows']:>10}{r['calls']:>7}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='SheetsAPI 집계 벤치마크 (로컬 에뮬레이터)')
+    parser.add_argument('--members', type=int, nargs='+', default=DEFAULT_MEMBERS, help='성도 수 목록')
+    parser.add_argument('--years', type=int, nargs='+', default=DEFAULT_YEARS, help='출석 기록 연수 목록')
+    parser.add_argument('--seed', type=int, default=0, help='합성 데이터 시드')
+    parser.add_argument('--repeat', type=int, default=3, help='반복 횟수 (최솟값 사용)')
+    parser.add_argument('--latency', type=float, default=0.0, help='에뮬레이터 호출당 지연 (초)')
+    parser.add_argument('--max-rows', type=int, default=MAX_ATTENDANCE_ROWS, help='건너뛸 출석 행 수 기준')
+    parser.add_argument('--output', help='결과 JSON 저장 경로')
+    parser.add_argument('--save-baseline', help='결과를 기준 파일로 저장')
+    parser.add_argument('--baseline', help='비교할 기준 파일 (회귀 시 종료 코드 1)')
+    parser.add_argument('--threshold', type=float, default=1.5, help='회귀 판정 배수')
+    args = parser.parse_args()
+
+    results = {}
+    for members in args.members:
+        for years in args.years:
+            scenario = f'{members}m_{years}y'
+            estimated_rows = members * 52 * years
+            if estimated_rows > args.max_rows:
+                print(f'\n=== {scenario} === skipped (~{estimated_rows:,} attendance rows > --max-rows {args.max_rows:,})')
+                continue
+            started = time.perf_counter()
+            results[scenario] = run_scenario(members, years, args.seed, args.repeat, args.latency)
+            _print_table(scenario, results[scenario])
+            print(f'({time.perf_counter() - started:.1f}s)')
+
+    report = {'created_at': datetime.now().isoformat(timespec='seconds'), 'results': results}
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+
+    shutil.rmtree(_CACHE_DIR, ignore_errors=True)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'\n⚠️ {len(regressions)} regressions (threshold x{args.threshold}):')
+            for line in regressions:
+                print(f'  - {line}')
+            return 1
+        print(f'\n✓ No regressions against {args.baseline} (threshold x{args.threshold})')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
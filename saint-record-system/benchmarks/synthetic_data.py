@@ -0,0 +1,153 @@
+"""
+합성 교인 데이터 생성기 - 실제 시트와 같은 스키마의 Members/_Departments/_Groups/Attendance_{year}
+
+- 같은 seed면 항상 같은 데이터 (벤치마크 결과 비교용)
+- 반환 형식은 시트 값 그대로 ({시트 제목: [[헤더], [행], ...]}) → EmulatedSpreadsheet에 바로 사용
+- 출석은 실제 시트처럼 주일별 출석('1')과 일부 결석('0') 행만 있고, 기록 없음 = 결석
+"""
+
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from utils.enums import MemberStatus, MemberType, ChurchRole, GroupRole
+
+ATTENDANCE_HEADERS = ['attend_id', 'member_id', 'attend_date', 'attend_type', 'year', 'week_no']
+
+MEMBER_HEADERS = [
+    'member_id', 'name', 'family_id', 'dept_id', 'group_id', 'gender', 'birth_date', 'lunar_solar',
+    'phone', 'address', 'church_role', 'group_role', 'member_type', 'status', 'relationship',
+    'baptism_status', 'register_date', 'photo_url', 'created_at', 'updated_at',
+]
+
+# (dept_id, 부서명, 성도 비율, 출생연도 범위)
+DEPARTMENTS = [
+    ('D01', '장년부', 0.55, (1940, 1990)),
+    ('D02', '청년부', 0.20, (1991, 2004)),
+    ('D03', '청소년부', 0.10, (2005, 2012)),
+    ('D04', '어린이부', 0.15, (2013, 2020)),
+]
+
+GROUP_SIZE = 12  # 목장당 평균 성도 수
+GROUP_NAMES = ['네팔', '러시아', '필리핀', '태국', '베냉', '콩고', '칠레', '철원']
+
+# 상태 비율 (재적 성도가 출석률 모수)
+STATUS_WEIGHTS = {
+    MemberStatus.ACTIVE.value: 0.85,
+    MemberStatus.ON_LEAVE.value: 0.05,
+    MemberStatus.TRANSFERRED.value: 0.05,
+    MemberStatus.VISITOR.value: 0.05,
+}
+
+ABSENT_ROW_RATE = 0.15   # 결석 주일 중 '0' 행을 남기는 비율 (나머지는 기록 없음)
+STREAK_RATE = 0.05       # 최근 3주 연속 결석 성도 비율 (결석 알림 대상)
+
+SURNAMES = list('김이박최정강조윤장임한오서신권황안송류홍')
+GIVEN = list('민서준지현우수영하은도윤예진성주원혜경재')
+
+
+def sundays(start: date, end: date) -> List[date]:
+    """start 이후 첫 일요일부터 end 이전 마지막 일요일까지"""
+    first = start + timedelta(days=(6 - start.weekday()) % 7)
+    return [first + timedelta(weeks=i) for i in range((end - first).days // 7 + 1)] if first <= end else []
+
+
+def generate_congregation(members: int, years: int = 1, seed: int = 0,
+                          end_date: Optional[date] = None) -> Dict[str, List[List]]:
+    """
+    합성 교인 데이터 생성
+
+    Args:
+        members: 성도 수
+        years: 출석 기록 연수 (end_date 연도 포함, 이전 연도는 1월 첫 주일부터)
+        seed: 난수 시드
+        end_date: 마지막 출석 날짜 기준 (기본 오늘 - 생일/결석 알림/이번 달 등록이 오늘 기준이므로)
+
+    Returns: {시트 제목: [[헤더], [행], ...]}
+    """
+    rng = np.random.default_rng(seed)
+    end_date = end_date or date.today()
+    start_date = date(end_date.year - years + 1, 1, 1)
+
+    # ===== 부서 / 목장 =====
+    weights = np.array([d[2] for d in DEPARTMENTS])
+    dept_idx = rng.choice(len(DEPARTMENTS), size=members, p=weights / weights.sum())
+
+    groups = []  # (group_id, group_name, dept_id)
+    member_groups = np.empty(members, dtype=object)
+    for i, (dept_id, _, _, _) in enumerate(DEPARTMENTS):
+        idx = np.flatnonzero(dept_idx == i)
+        count = max(1, len(idx) // GROUP_SIZE)
+        first = len(groups)
+        for g in range(count):
+            n = first + g
+            name = GROUP_NAMES[n] if n < len(GROUP_NAMES) else f'{n + 1}'
+            groups.append((f'G{n + 1:03d}', f'{name} 목장', dept_id))
+        member_groups[idx] = [groups[first + g][0] for g in rng.integers(0, count, size=len(idx))]
+
+    # ===== 성도 =====
+    statuses = list(STATUS_WEIGHTS)
+    status = rng.choice(statuses, size=members, p=list(STATUS_WEIGHTS.values()))
+    birth_years = np.array([rng.integers(*DEPARTMENTS[i][3]) for i in dept_idx])
+    birth_days = rng.integers(0, 365, size=members)
+    history_days = max(1, (end_date - start_date).days)
+    created_days = rng.integers(0, history_days + 3650, size=members)  # 일부는 기록 시작 이전 등록
+    this_month = rng.random(members) < 0.01                            # 이번 달 신규 등록
+    month_start = end_date.replace(day=1)
+    today = date.today().isoformat()
+
+    member_rows = []
+    seen_leaders = set()
+    for i in range(members):
+        member_id = f'M{i + 1:05d}'
+        birth = date(int(birth_years[i]), 1, 1) + timedelta(days=int(birth_days[i]))
+        created = (month_start + timedelta(days=int(rng.integers(0, max(1, (end_date - month_start).days + 1))))
+                   if this_month[i] else end_date - timedelta(days=int(created_days[i])))
+        group_id = member_groups[i]
+        leader = group_id not in seen_leaders
+        seen_leaders.add(group_id)
+        name = ''.join(rng.choice(SURNAMES, 1)) + ''.join(rng.choice(GIVEN, 2))
+        member_rows.append([
+            member_id, name, f'F{i // 3 + 1:05d}', DEPARTMENTS[dept_idx[i]][0], group_id,
+            'M' if rng.random() < 0.48 else 'F', birth.isoformat(), 'Y',
+            f'010-{rng.integers(1000, 10000)}-{rng.integers(1000, 10000)}', '',
+            ChurchRole.DEACON.value if rng.random() < 0.3 else ChurchRole.MEMBER.value,
+            GroupRole.LEADER.value if leader else GroupRole.MEMBER.value,
+            MemberType.REGISTERED.value, str(status[i]), '', '', created.isoformat(), '',
+            created.isoformat(), today,
+        ])
+
+    sheets = {
+        'Members': [MEMBER_HEADERS] + member_rows,
+        '_Departments': [['dept_id', 'dept_name', 'sort_order']]
+                        + [[d[0], d[1], n] for n, d in enumerate(DEPARTMENTS, 1)],
+        '_Groups': [['group_id', 'group_name', 'dept_id']] + [list(g) for g in groups],
+    }
+
+    # ===== 출석 =====
+    # 성도별 출석 성향 (재적 성도가 높고, 휴적/전출/방문은 낮음)
+    active = status == MemberStatus.ACTIVE.value
+    propensity = np.where(active, rng.beta(6, 2, size=members), rng.beta(1, 6, size=members))
+    streak = active & (rng.random(members) < STREAK_RATE)
+    member_ids = np.array([row[0] for row in member_rows], dtype=object)
+
+    all_sundays = sundays(start_date, end_date)
+    recent = set(all_sundays[-3:])
+    for year in range(start_date.year, end_date.year + 1):
+        rows = []
+        for sunday in (d for d in all_sundays if d.year == year):
+            draw = rng.random(members)
+            present = draw < propensity
+            if sunday in recent:
+                present &= ~streak
+            absent_row = ~present & (rng.random(members) < ABSENT_ROW_RATE)
+
+            week_no = sunday.isocalendar()[1]
+            prefix = f'AT{year}_W{week_no:02d}_'
+            day = sunday.isoformat()
+            for ids, attend_type in ((member_ids[present], '1'), (member_ids[absent_row], '0')):
+                rows.extend([prefix + m, m, day, attend_type, year, week_no] for m in ids)
+        sheets[f'Attendance_{year}'] = [ATTENDANCE_HEADERS] + rows
+
+    return sheets
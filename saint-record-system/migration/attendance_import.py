@@ -0,0 +1,327 @@
+"""
+출석부 엑셀 → Attendance_{year} 시트 스트리밍 가져오기
+
+- openpyxl read_only 모드로 행 단위 읽기 (시트 전체를 DataFrame으로 올리지 않음)
+- READ_ROWS 행(성도)씩 날짜 열을 한 번에 melt (셀 단위 반복 없음)
+- UPLOAD_ROWS 행씩 append_rows로 업로드하고, 업로드할 때마다 체크포인트 저장
+  → 중간에 실패해도 다시 실행하면 업로드된 행은 건너뛰고 이어서 진행
+- 병합 모드(AttendanceMerger): 시트를 지우지 않고 attend_id 기준 추가/수정분만 반영
+"""
+
+import itertools
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import gspread
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from utils.enums import AttendType
+from utils.snapshot_cache import clear_snapshots
+
+READ_ROWS = 200      # 한 번에 변환할 엑셀 행 수
+UPLOAD_ROWS = 5000   # 한 번에 업로드할 출석 행 수 (요청 크기/할당량 제한 내)
+
+ATTENDANCE_COLUMNS = ['attend_id', 'member_id', 'attend_date', 'attend_type', 'year', 'week_no']
+
+# 엑셀 셀 값 → attend_type (온라인은 출석/결석 이원화에 따라 출석으로)
+ATTEND_VALUES = {
+    '1': AttendType.PRESENT.value,
+    '1.0': AttendType.PRESENT.value,
+    '0': AttendType.ABSENT.value,
+    '0.0': AttendType.ABSENT.value,
+    'O': AttendType.PRESENT.value,
+    'ON': AttendType.PRESENT.value,
+    'ONLINE': AttendType.PRESENT.value,
+    '2': AttendType.PRESENT.value,
+}
+
+
+def read_attendance_blocks(excel_path: str, sheet_name: str, header_idx: int,
+                           block_rows: int = READ_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    출석부 시트를 block_rows 행씩 읽기
+
+    Args:
+        excel_path: 엑셀 파일 경로
+        sheet_name: 시트 이름
+        header_idx: 헤더 행 위치 (0부터, pd.read_excel의 header와 같음)
+
+    Yields: DataFrame (index=성명, columns=날짜 열의 Timestamp, 값=셀 원본 값)
+    """
+    workbook = openpyxl.load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        rows = workbook[sheet_name].iter_rows(values_only=True)
+        header = next(itertools.islice(rows, header_idx, None), None)
+        if header is None or '성명' not in header:
+            raise ValueError(f"'{sheet_name}' {header_idx + 1}행에서 '성명' 헤더를 찾을 수 없습니다")
+
+        name_col = header.index('성명')
+        date_cols = [i for i, h in enumerate(header) if isinstance(h, datetime)]
+        dates = pd.DatetimeIndex([header[i] for i in date_cols])
+        print(f"    - Found {len(date_cols)} date columns ({[str(d)[:10] for d in dates[:3]]}...)")
+
+        def block(buffer: List[Tuple]) -> pd.DataFrame:
+            names = [row[name_col] if len(row) > name_col else None for row in buffer]
+            values = [[row[i] if i < len(row) else None for i in date_cols] for row in buffer]
+            return pd.DataFrame(values, index=names, columns=dates)
+
+        buffer = []
+        for row in rows:
+            buffer.append(row)
+            if len(buffer) >= block_rows:
+                yield block(buffer)
+                buffer = []
+        if buffer:
+            yield block(buffer)
+    finally:
+        workbook.close()
+
+
+def melt_attendance(block: pd.DataFrame, name_to_id: Dict[str, str]) -> pd.DataFrame:
+    """
+    성명 × 날짜 블록 → 출석 레코드 (ATTENDANCE_COLUMNS)
+    이름이 성도 목록에 없거나, 값이 비었거나 출석/결석으로 해석할 수 없는 셀은 제외
+    """
+    member_ids = pd.Series(block.index, dtype=object).astype(str).str.strip().map(name_to_id)
+    known = member_ids.notna().to_numpy()
+    if not known.any() or block.shape[1] == 0:
+        return pd.DataFrame(columns=ATTENDANCE_COLUMNS)
+
+    # 성도 × 날짜 → 긴 형식 (원본 시트에 같은 날짜 열이 두 번 있을 수 있어 melt 대신 numpy로 펼침)
+    values = block.to_numpy(dtype=object)[known]
+    long = pd.DataFrame({
+        'member_id': np.repeat(member_ids[known].to_numpy(), values.shape[1]),
+        'date': np.tile(block.columns.to_numpy(), values.shape[0]),
+        'value': values.ravel(),
+    }).dropna(subset=['value'])
+    long['attend_type'] = long['value'].astype(str).str.strip().str.upper().map(ATTEND_VALUES)
+    long = long.dropna(subset=['attend_type'])
+
+    dates = pd.to_datetime(long['date'])
+    years = dates.dt.year
+    weeks = dates.dt.isocalendar().week.astype(int)
+    return pd.DataFrame({
+        'attend_id': 'AT' + years.astype(str) + '_W' + weeks.map('{:02d}'.format) + '_' + long['member_id'],
+        'member_id': long['member_id'],
+        'attend_date': dates.dt.strftime('%Y-%m-%d'),
+        'attend_type': long['attend_type'],
+        'year': years,
+        'week_no': weeks,
+    }).drop_duplicates('attend_id')[ATTENDANCE_COLUMNS]
+
+
+class AttendanceUploader:
+    """
+    연도별 출석 시트 청크 업로드 + 체크포인트
+
+    - 시트는 이번 가져오기에서 처음 쓸 때 한 번만 비우고 헤더를 씀
+      (여러 원본 시트가 같은 연도를 포함해도 앞서 올린 행을 지우지 않음)
+    - (원본 시트, 연도)별 업로드 행 수를 체크포인트 파일에 기록
+      → 다시 실행하면 같은 순서로 만들어지는 레코드 중 이미 올린 만큼 건너뜀
+    - complete() 호출 시 체크포인트 삭제 (다음 실행은 처음부터)
+
+    Args:
+        spreadsheet: gspread Spreadsheet
+        checkpoint_path: 체크포인트 JSON 경로
+        chunk_rows: append_rows 1회당 행 수
+    """
+
+    def __init__(self, spreadsheet, checkpoint_path: str, chunk_rows: int = UPLOAD_ROWS):
+        self.spreadsheet = spreadsheet
+        self.checkpoint_path = checkpoint_path
+        self.chunk_rows = chunk_rows
+        self.state = self._load_checkpoint()
+        self._seen: Dict[str, int] = {}          # 이번 실행에서 만든 레코드 수 (건너뛰기 계산용)
+        self._buffers: Dict[str, List[List]] = {}
+        self._sheets: Dict[int, gspread.Worksheet] = {}
+
+        if self.state['uploaded']:
+            done = sum(self.state['uploaded'].values())
+            print(f"  ↻ Resuming from checkpoint ({done} rows already uploaded)")
+
+    def _load_checkpoint(self) -> Dict:
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, encoding='utf-8') as f:
+                return json.load(f)
+        return {'cleared': [], 'uploaded': {}}
+
+    def _save_checkpoint(self):
+        tmp_path = f'{self.checkpoint_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _sheet(self, year: int) -> gspread.Worksheet:
+        """연도별 출석 시트 (이번 가져오기에서 처음이면 비우고 헤더 작성)"""
+        if year in self._sheets:
+            return self._sheets[year]
+
+        sheet_name = f'Attendance_{year}'
+        try:
+            sheet = self.spreadsheet.worksheet(sheet_name)
+        except gspread.WorksheetNotFound:
+            sheet = self.spreadsheet.add_worksheet(sheet_name, 10000, 10)
+
+        if sheet_name not in self.state['cleared']:
+            sheet.clear()
+            sheet.update([ATTENDANCE_COLUMNS], 'A1:F1')
+            self.state['cleared'].append(sheet_name)
+            self._save_checkpoint()
+
+        self._sheets[year] = sheet
+        return sheet
+
+    def add(self, source: str, records: pd.DataFrame) -> int:
+        """
+        레코드 추가 (UPLOAD_ROWS가 모이면 업로드)
+
+        Args:
+            source: 원본 시트 이름 (체크포인트 키)
+            records: melt_attendance() 결과
+
+        Returns: 이번에 새로 대기열에 넣은 행 수 (체크포인트로 건너뛴 행 제외)
+        """
+        added = 0
+        for year, group in records.groupby('year', sort=False):
+            key = f'{source}:{int(year)}'
+            rows = [list(r) for r in group.itertuples(index=False, name=None)]
+
+            seen = self._seen.get(key, 0)
+            skip = max(0, self.state['uploaded'].get(key, 0) - seen)
+            self._seen[key] = seen + len(rows)
+            rows = rows[skip:]
+            if not rows:
+                continue
+
+            buffer = self._buffers.setdefault(key, [])
+            buffer.extend(rows)
+            added += len(rows)
+            while len(buffer) >= self.chunk_rows:
+                self._upload(key, int(year), self.chunk_rows)
+        return added
+
+    def _upload(self, key: str, year: int, count: int):
+        """대기열 앞부분 count행 업로드 후 체크포인트 갱신"""
+        buffer = self._buffers[key]
+        chunk = buffer[:count]
+        self._sheet(year).append_rows(chunk, value_input_option='RAW')
+        del buffer[:count]
+        self.state['uploaded'][key] = self.state['uploaded'].get(key, 0) + len(chunk)
+        self._save_checkpoint()
+
+    def flush(self, source: Optional[str] = None):
+        """남은 대기열 업로드 (source가 있으면 해당 원본 시트만)"""
+        for key, buffer in self._buffers.items():
+            if buffer and (source is None or key.startswith(f'{source}:')):
+                self._upload(key, int(key.rsplit(':', 1)[1]), len(buffer))
+
+    def complete(self):
+        """전체 가져오기 완료 - 남은 행 업로드 후 체크포인트 삭제"""
+        self.flush()
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+
+class AttendanceMerger:
+    """
+    연도별 출석 시트 병합 가져오기 (지우지 않고 attend_id 기준으로 차이만 반영)
+
+    - 가져온 레코드를 모아 두었다가 complete()에서 연도별로 기존 행과 비교
+      · 시트에 없는 attend_id → 추가 (append_rows, 청크 단위)
+      · 값이 다른 attend_id → 해당 행 수정 (values_batch_update, 청크 단위)
+      · 가져온 파일에 없는 기존 행(앱에서 입력한 출석 등)은 그대로 둠
+    - 같은 attend_id가 여러 원본 시트에 있으면 나중 시트 값 사용
+    - 차이만 쓰므로 몇 번을 다시 실행해도 결과가 같음 (중단되면 다시 실행)
+    - 반영한 행이 있으면 앱의 디스크 스냅샷 삭제 (확정된 지난 연도 출석도 다음 조회 때 전체 재조회)
+    - dry_run이면 쓰지 않고 연도별 추가/수정/동일 건수만 보고
+
+    Args:
+        spreadsheet: gspread Spreadsheet
+        dry_run: True면 시트를 수정하지 않음
+        chunk_rows: 요청 1회당 행 수
+    """
+
+    def __init__(self, spreadsheet, dry_run: bool = False, chunk_rows: int = UPLOAD_ROWS):
+        self.spreadsheet = spreadsheet
+        self.dry_run = dry_run
+        self.chunk_rows = chunk_rows
+        self._records: Dict[int, Dict[str, List]] = {}  # year → attend_id → 행
+
+    def add(self, source: str, records: pd.DataFrame) -> int:
+        """레코드 추가 (반영은 complete()에서). 추가한 행 수 반환"""
+        for year, group in records.groupby('year', sort=False):
+            pending = self._records.setdefault(int(year), {})
+            for row in group.itertuples(index=False, name=None):
+                pending[row[0]] = list(row)
+        return len(records)
+
+    def flush(self, source: Optional[str] = None):
+        """AttendanceUploader와 같은 인터페이스 (병합은 complete()에서 한 번에 비교)"""
+
+    def _existing(self, year: int) -> Tuple[Optional[gspread.Worksheet], Dict[str, Tuple[int, List[str]]]]:
+        """기존 시트와 attend_id → (행 번호, 값) (같은 attend_id가 여러 행이면 첫 행)"""
+        try:
+            sheet = self.spreadsheet.worksheet(f'Attendance_{year}')
+        except gspread.WorksheetNotFound:
+            return None, {}
+
+        rows = {}
+        for row_num, values in enumerate(sheet.get_all_values()[1:], start=2):
+            values = (values + [''] * len(ATTENDANCE_COLUMNS))[:len(ATTENDANCE_COLUMNS)]
+            if values[0]:
+                rows.setdefault(values[0], (row_num, values))
+        return sheet, rows
+
+    def _merge_year(self, year: int, pending: Dict[str, List]) -> Dict[str, int]:
+        """한 연도 비교 + 반영"""
+        sheet, existing = self._existing(year)
+
+        inserts, updates = [], []
+        for attend_id, row in pending.items():
+            current = existing.get(attend_id)
+            if current is None:
+                inserts.append(row)
+            elif current[1] != [str(v) for v in row]:
+                updates.append((current[0], row))
+
+        if not self.dry_run and (inserts or updates):
+            if sheet is None:
+                sheet = self.spreadsheet.add_worksheet(f'Attendance_{year}', 10000, 10)
+                sheet.update([ATTENDANCE_COLUMNS], 'A1:F1')
+            for start in range(0, len(updates), self.chunk_rows):
+                self.spreadsheet.values_batch_update(body={
+                    'valueInputOption': 'RAW',
+                    'data': [
+                        {'range': f"'{sheet.title}'!A{row_num}:F{row_num}", 'values': [row]}
+                        for row_num, row in updates[start:start + self.chunk_rows]
+                    ]
+                })
+            for start in range(0, len(inserts), self.chunk_rows):
+                sheet.append_rows(inserts[start:start + self.chunk_rows], value_input_option='RAW')
+
+        return {
+            'inserted': len(inserts),
+            'updated': len(updates),
+            'unchanged': len(pending) - len(inserts) - len(updates),
+        }
+
+    def complete(self) -> Dict[int, Dict[str, int]]:
+        """
+        연도별 비교 + 반영
+
+        Returns: {year: {'inserted': n, 'updated': n, 'unchanged': n}}
+        """
+        report = {}
+        for year in sorted(self._records):
+            report[year] = self._merge_year(year, self._records[year])
+            counts = report[year]
+            print(f"    Attendance_{year}: +{counts['inserted']} 추가, "
+                  f"~{counts['updated']} 수정, ={counts['unchanged']} 동일")
+        self._records = {}
+        if not self.dry_run and any(c['inserted'] or c['updated'] for c in report.values()):
+            clear_snapshots()
+        return report
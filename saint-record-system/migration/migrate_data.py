@@ -7,11 +7,25 @@ import sys
 # Add parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.enums import AttendType
+from utils.sheets_scheduler import SchedulingHTTPClient
+from migration.attendance_import import read_attendance_blocks, melt_attendance, AttendanceUploader, AttendanceMerger
 
 class DataMigrator:
-    def __init__(self, excel_path: str, credentials_path: str = None):
+    """
+    출석부 엑셀 → Google Sheets 마이그레이션
+
+    Args:
+        excel_path: 출석부 엑셀 경로
+        credentials_path: 서비스 계정 키 경로 (없으면 기본 위치에서 찾음)
+        merge: True면 병합 모드 - 시스템/성도 시트는 그대로 두고 (기존 member_id 유지)
+               출석만 attend_id 기준으로 추가/수정분 반영 (앱에서 입력한 출석 보존)
+        dry_run: True면 시트를 수정하지 않고 병합 결과 건수만 출력 (병합 모드로 실행)
+    """
+
+    def __init__(self, excel_path: str, credentials_path: str = None, merge: bool = False, dry_run: bool = False):
         self.excel_path = excel_path
+        self.merge = merge or dry_run
+        self.dry_run = dry_run
         
         # Check multiple locations for credentials
         base_dir = os.path.dirname(os.path.abspath(__file__)) # .../saint-record-system/migration
@@ -40,6 +54,10 @@ class DataMigrator:
         self.client = None
         self.spreadsheet = None
         self.errors = []
+        self.uploader = None
+
+        # 출석 업로드 체크포인트 (중단 후 다시 실행하면 이어서 업로드)
+        self.checkpoint_path = f'{excel_path}.import.json'
         
         self.sheet_name = '성도기록부_시스템'
 
@@ -53,7 +71,8 @@ class DataMigrator:
             creds = ServiceAccountCredentials.from_json_keyfile_name(
                 self.credentials_path, self.scope
             )
-            self.client = gspread.authorize(creds)
+            # 분당 할당량 제한 + 429 재시도 (대량 업로드 중 할당량 초과로 중단되지 않도록)
+            self.client = gspread.authorize(creds, http_client=SchedulingHTTPClient)
             
             try:
                 # self.spreadsheet = self.client.open(self.sheet_name)
@@ -74,17 +93,21 @@ class DataMigrator:
         if not self.connect():
             return
 
-        print("Starting Migration...")
-        
-        # Step 1: 시스템 시트 생성
-        print("\n[Step 1] Creating System Sheets...")
-        self.create_sequences_sheet()
-        self.create_departments_sheet()
-        
-        # Step 2: 성도 데이터
-        print("\n[Step 2] Migrating Members...")
-        member_count = self.migrate_members()
-        print(f"  - Migrated {member_count} members")
+        print("Starting Migration..." + (" (merge, dry run)" if self.dry_run else " (merge)" if self.merge else ""))
+
+        if self.merge:
+            # 병합 모드: 시스템/성도 시트를 다시 만들면 member_id가 바뀌므로 기존 시트 사용
+            print("\n[Step 1-2] Skipped (merge mode uses existing system/member sheets)")
+        else:
+            # Step 1: 시스템 시트 생성
+            print("\n[Step 1] Creating System Sheets...")
+            self.create_sequences_sheet()
+            self.create_departments_sheet()
+
+            # Step 2: 성도 데이터
+            print("\n[Step 2] Migrating Members...")
+            member_count = self.migrate_members()
+            print(f"  - Migrated {member_count} members")
         
         # Step 3: 과거 출석 데이터 (2019-2024)
         print("\n[Step 3] Migrating Historical Attendance (2019-2024)...")
@@ -95,6 +118,16 @@ class DataMigrator:
         print("\n[Step 4] Migrating Current Attendance (2025)...")
         curr_count = self.migrate_current_attendance()
         print(f"  - Migrated {curr_count} current records")
+
+        # 출석 업로드 완료 - 체크포인트 삭제 (실패 시 남겨 두고 다음 실행에서 이어서)
+        # 병합 모드는 여기서 연도별로 기존 행과 비교해 추가/수정분 반영
+        if not self.errors:
+            if self.merge:
+                print("\n[Merge] Dry run report:" if self.dry_run else "\n[Merge] Applying attendance changes...")
+            try:
+                self._attendance_uploader().complete()
+            except Exception as e:
+                self.errors.append(f"Failed to finish attendance import: {e}")
         
         # Step 5: 검증
         print("\n[Step 5] Validating...")
@@ -279,22 +312,41 @@ class DataMigrator:
             print(f"  ⚠️ Failed to read Members sheet for mapping: {e}")
             return {}
 
+    def _attendance_uploader(self):
+        """출석 업로더 (과거/현재 출석 가져오기가 공유 - 병합 모드면 AttendanceMerger)"""
+        if self.uploader is None:
+            if self.merge:
+                self.uploader = AttendanceMerger(self.spreadsheet, dry_run=self.dry_run)
+            else:
+                self.uploader = AttendanceUploader(self.spreadsheet, self.checkpoint_path)
+        return self.uploader
+
+    def _import_attendance_sheet(self, sheet_name: str, header_idx: int, name_to_id: dict) -> int:
+        """
+        출석부 시트 하나를 스트리밍으로 가져오기 (행 블록 읽기 → melt → 청크 업로드)
+
+        Returns: 업로드한 출석 행 수 (체크포인트로 건너뛴 행 제외, 병합 모드는 읽은 행 수)
+        """
+        uploader = self._attendance_uploader()
+        count = 0
+        for block in read_attendance_blocks(self.excel_path, sheet_name, header_idx):
+            count += uploader.add(sheet_name, melt_attendance(block, name_to_id))
+        uploader.flush(sheet_name)
+        print(f"    ✓ {'Read' if self.merge else 'Saved'} {count} records from '{sheet_name}'")
+        return count
+
     def migrate_historical_attendance(self) -> int:
         """2019-2024 과거 데이터 마이그레이션"""
         excel = pd.ExcelFile(self.excel_path)
         name_to_id = self.get_name_to_id_map()
         total_records = 0
 
-        # Sheet configuration: (sheet_name, header_row_index)
-        # Note: header_row_index is 0-based. 
-        # 2024: Row 11 (index 10)
-        # 2019-2023: Row 6 (index 5)
         # Sheet configuration: (sheet_name, header_row_index)
         # Note: header_row_index is 0-based index from detect_headers (which matched exact row index)
         history_config = [
             ('2024년', 11), 
-            ('2023년', 6), 
-            ('2022년', 6), 
+            ('2023년', 11), 
+            ('2022년', 11), 
             ('2021이전', 6)
         ]
 
@@ -305,76 +357,7 @@ class DataMigrator:
 
             print(f"  Processing '{sheet_name}'...")
             try:
-                df = pd.read_excel(excel, sheet_name=sheet_name, header=header_idx)
-                
-                # Identify Date Columns (type check)
-                from datetime import datetime
-                date_cols = []
-                for col in df.columns:
-                    match = False
-                    if isinstance(col, pd.Timestamp):
-                        match = True
-                    elif isinstance(col, datetime):
-                        match = True
-                    
-                    if match:
-                        date_cols.append(col)
-                    else:
-                        # Try parsing string if it looks like a date?
-                        # For now, let's stick to object types as seen in analysis
-                        pass
-                        
-                print(f"    - Found {len(date_cols)} date columns ({[str(c)[:10] for c in date_cols[:3]]}...)")
-                if len(date_cols) == 0:
-                    print(f"    [DEBUG] First 5 columns: {df.columns[:5].tolist()}")
-                    print(f"    [DEBUG] Types: {[type(c) for c in df.columns[:5]]}")
-                
-                sheet_records = []
-                
-                for _, row in df.iterrows():
-                    name = str(row.get('성명', '')).strip()
-                    if not name or name not in name_to_id:
-                        continue
-                    
-                    member_id = name_to_id[name]
-
-                    for date_col in date_cols:
-                        value = row[date_col]
-                        if pd.isna(value):
-                            continue
-                        
-                        # Normalize value
-                        val_str = str(value).strip()
-                        attend_type = None
-                        
-                        if val_str == '1' or val_str == '1.0':
-                            attend_type = AttendType.PRESENT.value
-                        elif val_str == '0' or val_str == '0.0':
-                            attend_type = AttendType.ABSENT.value
-                        elif val_str.upper() in ['O', 'ON', 'ONLINE', '2']:
-                            attend_type = AttendType.ONLINE.value
-                        
-                        if attend_type:
-                            year = date_col.year
-                            week_no = date_col.isocalendar()[1]
-                            attend_id = f"AT{year}_W{week_no:02d}_{member_id}"
-                            
-                            sheet_records.append({
-                                'attend_id': attend_id,
-                                'member_id': member_id,
-                                'attend_date': date_col.strftime('%Y-%m-%d'),
-                                'attend_type': attend_type,
-                                'year': year,
-                                'week_no': week_no,
-                            })
-                
-                # Batch save by year (since '2021이전' has multiple years)
-                if sheet_records:
-                    df_sheet = pd.DataFrame(sheet_records)
-                    for year, group in df_sheet.groupby('year'):
-                        self._save_attendance_batch(int(year), group.to_dict('records'))
-                        total_records += len(group)
-                        
+                total_records += self._import_attendance_sheet(sheet_name, header_idx, name_to_id)
             except Exception as e:
                 self.errors.append(f"Error processing {sheet_name}: {e}")
         
@@ -392,88 +375,12 @@ class DataMigrator:
         print("  Processing '출석부' (2025)...")
         # Header is at Row 7 (index 6) for 2025 -> index 7 actually if detect_headers output was 7
         try:
-            df = pd.read_excel(excel, sheet_name='출석부', header=7)
-            
-            # Robust date column detection
-            from datetime import datetime
-            date_cols = []
-            for col in df.columns:
-                if isinstance(col, (pd.Timestamp, datetime)):
-                    date_cols.append(col)
-                    
-            print(f"    - Found {len(date_cols)} date columns")
-            
-            attendance_records = []
-            
-            for _, row in df.iterrows():
-                name = str(row.get('성명', '')).strip()
-                if not name or name not in name_to_id:
-                    continue
-                
-                member_id = name_to_id[name]
-                
-                for date_col in date_cols:
-                    value = row[date_col]
-                    if pd.isna(value):
-                        continue
-                        
-                    val_str = str(value).strip()
-                    attend_type = None
-                    
-                    if val_str == '1' or val_str == '1.0':
-                        attend_type = AttendType.PRESENT.value
-                    elif val_str == '0' or val_str == '0.0':
-                        attend_type = AttendType.ABSENT.value
-                    elif val_str.upper() in ['O', 'ON', '2']:
-                        attend_type = AttendType.ONLINE.value
-                        
-                    if attend_type:
-                        year = date_col.year
-                        week_no = date_col.isocalendar()[1]
-                        attend_id = f"AT{year}_W{week_no:02d}_{member_id}"
-                        
-                        attendance_records.append({
-                            'attend_id': attend_id,
-                            'member_id': member_id,
-                            'attend_date': date_col.strftime('%Y-%m-%d'),
-                            'attend_type': attend_type,
-                            'year': year,
-                            'week_no': week_no,
-                        })
-            
-            if attendance_records:
-                self._save_attendance_batch(2025, attendance_records)
-                return len(attendance_records)
+            return self._import_attendance_sheet('출석부', 7, name_to_id)
         except Exception as e:
              self.errors.append(f"Error processing 2025 출석부: {e}")
              
         return 0
 
-    def _save_attendance_batch(self, year: int, records: list):
-        """Helper to save attendance records to year-specific sheet"""
-        sheet_name = f'Attendance_{year}'
-        try:
-            try:
-                sheet = self.spreadsheet.worksheet(sheet_name)
-                # Append strategy is risky if run multiple times. 
-                # For migration, we might want to clear or carefully append.
-                # Let's clear for now to ensure clean state during dev.
-                # In prod, Upsert or Append is better.
-                sheet.clear() 
-            except gspread.WorksheetNotFound:
-                sheet = self.spreadsheet.add_worksheet(sheet_name, 10000, 10)
-            
-            if not records:
-                return
-
-            headers = list(records[0].keys())
-            rows = [headers] + [[r[h] for h in headers] for r in records]
-            sheet.update(f'A1:F{len(rows)}', rows)
-            print(f"    ✓ Saved {len(records)} records to {sheet_name}")
-            
-        except Exception as e:
-            self.errors.append(f"Failed to update {sheet_name}: {e}")
-
     def migrate_attendance(self):
         """Legacy wrapper"""
         pass
@@ -498,5 +405,12 @@ if __name__ == '__main__':
     # Default Paths
     EXCEL_PATH = r"g:\내 드라이브\g_dev\#yebom\2025출석부(목자용).xlsx"
     
-    migrator = DataMigrator(excel_path=EXCEL_PATH)
+    import argparse
+    parser = argparse.ArgumentParser(description='출석부 엑셀 마이그레이션')
+    parser.add_argument('--excel', default=EXCEL_PATH, help='출석부 엑셀 경로')
+    parser.add_argument('--merge', action='store_true', help='병합 모드 (시트를 지우지 않고 추가/수정분만 반영)')
+    parser.add_argument('--dry-run', action='store_true', help='병합 결과 건수만 출력 (시트 수정 없음)')
+    args = parser.parse_args()
+
+    migrator = DataMigrator(excel_path=args.excel, merge=args.merge, dry_run=args.dry_run)
     migrator.migrate_all()
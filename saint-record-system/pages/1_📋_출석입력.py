@@ -6,8 +6,10 @@ from utils.sheets_api import SheetsAPI
 from utils.enums import AttendType, MemberStatus
 from utils.validators import AttendanceCreate
 from utils.sidebar import render_shared_sidebar
+from utils import profiler
 
 st.set_page_config(page_title="출석 입력", page_icon="📋", layout="wide")
+profiler.start("attendance")
 load_custom_css()
 render_shared_sidebar("attendance")
 
@@ -190,7 +192,7 @@ def load_groups():
     return pd.DataFrame()
 
 @st.cache_data(ttl=60)
-def load_members_by_group(group_id: str = None):
+def load_members_by_group(group_id: str = None, data_version: int = 0):
     if db_connected:
         filters = {'status': MemberStatus.ACTIVE.value}
         if group_id:
@@ -198,11 +200,141 @@ def load_members_by_group(group_id: str = None):
         return api.get_members(filters)
     return pd.DataFrame()
 
-def load_attendance(year: int, week_no: int):
+@st.cache_data(ttl=60)
+def load_attendance(year: int, week_no: int, data_version: int = 0):
     if db_connected:
         return api.get_attendance(year, week_no=week_no)
     return pd.DataFrame()
 
+STATUS_LABELS = {'1': '출석', '0': '결석'}
+
+def _status_key(attendance_key: str, member_id: str) -> str:
+    """성도별 출석 라디오 위젯 키"""
+    return f"attend_{attendance_key}_{member_id}"
+
+def set_all_attendance(attendance_key: str, attend_type: str):
+    """전체 출석/결석 콜백 - 저장 상태와 라디오 위젯 값을 함께 변경"""
+    statuses = st.session_state.attendance_data[attendance_key]
+    for member_id in statuses:
+        statuses[member_id] = attend_type
+        st.session_state[_status_key(attendance_key, member_id)] = attend_type
+
+@st.fragment
+def render_member_attendance(members: pd.DataFrame, attendance_key: str, selected_date: date, year: int, week_no: int):
+    """
+    통계 바 + 성도 목록 + 저장 (fragment)
+
+    성도별 출석/결석은 폼 안의 라디오라 누를 때마다 서버를 다시 실행하지 않고,
+    저장 버튼을 누를 때 한 번에 전송됩니다. 전체 출석/결석 버튼은 이 부분만 다시 실행합니다.
+    """
+    statuses = st.session_state.attendance_data[attendance_key]
+
+    # 일괄 버튼
+    col1, col2, col3 = st.columns([1, 1, 4])
+    with col1:
+        st.button("✅ 전체 출석", use_container_width=True, on_click=set_all_attendance, args=(attendance_key, '1'))
+    with col2:
+        st.button("❌ 전체 결석", use_container_width=True, on_click=set_all_attendance, args=(attendance_key, '0'))
+
+    # === 3. 통계 바 (폼 제출 반영 후 채움) ===
+    # 라디오는 폼 안이라 누를 때마다 다시 실행되지 않으므로, 통계는 저장된 상태 기준 (저장하면 갱신)
+    stats_slot = st.empty()
+
+    # === 4. 성도 목록 (아바타 제거) ===
+    submitted = False
+    if not members.empty:
+        with st.form(key=f"attendance_form_{attendance_key}", border=False):
+            for member in members.to_dict('records'):
+                member_id = member.get('member_id')
+                name = member.get('name', '?')
+                church_role = member.get('church_role', '')
+                group_role = member.get('group_role', '')
+
+                # 위젯 값은 처음 표시할 때만 저장 상태에서 채움 (이후에는 위젯이 상태를 가짐)
+                status_key = _status_key(attendance_key, member_id)
+                if status_key not in st.session_state:
+                    st.session_state[status_key] = '1' if statuses.get(member_id) == '2' else statuses.get(member_id, '0')
+
+                # 아바타 컬럼 제거: 이름/역할, 출석/결석 선택만 표시
+                col1, col2 = st.columns([2.5, 3.5])
+
+                with col1:
+                    role_text = church_role
+                    if group_role and group_role != '목원':
+                        role_text = f"{group_role} · {church_role}"
+                    st.markdown(f'''
+                    <div class="member-info">
+                        <div class="member-name">{name}</div>
+                        <div class="member-role">{role_text}</div>
+                    </div>
+                    ''', unsafe_allow_html=True)
+
+                with col2:
+                    st.radio(
+                        f"{name} 출석 여부", list(STATUS_LABELS), format_func=STATUS_LABELS.get,
+                        key=status_key, horizontal=True, label_visibility="collapsed"
+                    )
+
+                st.markdown("<hr style='border:none;border-top:1px solid #E8E4DF;margin:6px 0;'>", unsafe_allow_html=True)
+
+            st.markdown("<div style='height:20px;'></div>", unsafe_allow_html=True)
+            submitted = st.form_submit_button("💾 출석 저장", use_container_width=True, type="primary")
+
+        if submitted:
+            for member_id in statuses:
+                value = st.session_state.get(_status_key(attendance_key, member_id), statuses[member_id])
+                # 온라인 출석('2')은 출석으로 표시되므로 바꾸지 않았으면 유지
+                if not (value == '1' and statuses[member_id] == '2'):
+                    statuses[member_id] = value
+    else:
+        st.info("해당 목장에 등록된 성도가 없습니다.")
+
+    attend_counts = {'1': 0, '0': 0}
+    for member_id, status in statuses.items():
+        if status == '2':
+            status = '1'
+        attend_counts[status] = attend_counts.get(status, 0) + 1
+    total = sum(attend_counts.values())
+    present_rate = int(attend_counts['1'] / total * 100) if total > 0 else 0
+
+    stats_slot.markdown(f"""
+    <div class="stats-bar">
+        <div class="stat-item">
+            <div class="stat-dot present"></div>
+            <span class="stat-label">출석</span>
+            <span class="stat-value">{attend_counts['1']}</span>
+        </div>
+        <div class="stat-item">
+            <div class="stat-dot absent"></div>
+            <span class="stat-label">결석</span>
+            <span class="stat-value">{attend_counts['0']}</span>
+        </div>
+        <div class="stat-item" style="margin-left: auto;">
+            <span class="stat-label">출석률</span>
+            <span class="stat-value">{present_rate}%</span>
+        </div>
+    </div>
+    <p style="font-size:12px;color:#6B7B8C;margin:4px 2px 0;">저장된 출석 기준 · 선택한 변경은 저장하면 반영됩니다</p>
+    """, unsafe_allow_html=True)
+
+    if submitted:
+        with st.spinner("저장 중..."):
+            records = []
+            for member_id, attend_type in statuses.items():
+                records.append(AttendanceCreate(
+                    member_id=member_id,
+                    attend_date=selected_date,
+                    attend_type=AttendType.from_value(attend_type),
+                    year=year,
+                    week_no=week_no
+                ))
+            if records:
+                result = api.save_attendance(records)
+                if result.get('success'):
+                    st.success(f"저장 완료! (추가: {result.get('inserted')}건, 수정: {result.get('updated')}건)")
+                else:
+                    st.error(f"저장 실패: {result.get('error')}")
+
 # 페이지 헤더
 st.markdown("""
 <div class="page-header">
@@ -284,133 +416,24 @@ if db_connected:
             else:
                 st.button("▶", key="next_week_disabled", use_container_width=True, disabled=True)
 
-        # 데이터 로드
-        members = load_members_by_group(selected_group_id)
-        existing_attendance = load_attendance(year, week_no)
+        # 데이터 로드 (기존 출석은 이 주차/목장을 처음 열 때만 조회)
+        members = load_members_by_group(selected_group_id, api.data_version())
 
         attendance_key = f"{selected_date}_{selected_group_id}"
         if attendance_key not in st.session_state.attendance_data:
-            st.session_state.attendance_data[attendance_key] = {}
-            if not members.empty:
-                for _, member in members.iterrows():
-                    member_id = member.get('member_id')
-                    if not existing_attendance.empty:
-                        member_attend = existing_attendance[existing_attendance['member_id'] == member_id]
-                        if not member_attend.empty:
-                            st.session_state.attendance_data[attendance_key][member_id] = str(member_attend.iloc[0]['attend_type'])
-                        else:
-                            st.session_state.attendance_data[attendance_key][member_id] = '0'
-                    else:
-                        st.session_state.attendance_data[attendance_key][member_id] = '0'
-
-        # 일괄 버튼
-        col1, col2, col3 = st.columns([1, 1, 4])
-        with col1:
-            if st.button("✅ 전체 출석", use_container_width=True):
-                for member_id in st.session_state.attendance_data[attendance_key]:
-                    st.session_state.attendance_data[attendance_key][member_id] = '1'
-                st.rerun()
-        with col2:
-            if st.button("❌ 전체 결석", use_container_width=True):
-                for member_id in st.session_state.attendance_data[attendance_key]:
-                    st.session_state.attendance_data[attendance_key][member_id] = '0'
-                st.rerun()
-
-        # === 3. 통계 바 ===
-        attend_counts = {'1': 0, '0': 0}
-        for member_id, status in st.session_state.attendance_data.get(attendance_key, {}).items():
-            if status == '2':
-                status = '1'
-            attend_counts[status] = attend_counts.get(status, 0) + 1
-        total = sum(attend_counts.values())
-        present_rate = int(attend_counts['1'] / total * 100) if total > 0 else 0
-
-        st.markdown(f"""
-        <div class="stats-bar">
-            <div class="stat-item">
-                <div class="stat-dot present"></div>
-                <span class="stat-label">출석</span>
-                <span class="stat-value">{attend_counts['1']}</span>
-            </div>
-            <div class="stat-item">
-                <div class="stat-dot absent"></div>
-                <span class="stat-label">결석</span>
-                <span class="stat-value">{attend_counts['0']}</span>
-            </div>
-            <div class="stat-item" style="margin-left: auto;">
-                <span class="stat-label">출석률</span>
-                <span class="stat-value">{present_rate}%</span>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-
-        # === 4. 성도 목록 (아바타 제거) ===
-        if not members.empty:
-            for idx, member in members.iterrows():
-                member_id = member.get('member_id')
-                name = member.get('name', '?')
-                church_role = member.get('church_role', '')
-                group_role = member.get('group_role', '')
-
-                current_status = st.session_state.attendance_data.get(attendance_key, {}).get(member_id, '0')
-
-                # 아바타 컬럼 제거: 이름/역할, 상태, 버튼만 표시
-                col1, col2, col3 = st.columns([2.5, 1.5, 2])
-
-                with col1:
-                    role_text = church_role
-                    if group_role and group_role != '목원':
-                        role_text = f"{group_role} · {church_role}"
-                    st.markdown(f'''
-                    <div class="member-info">
-                        <div class="member-name">{name}</div>
-                        <div class="member-role">{role_text}</div>
-                    </div>
-                    ''', unsafe_allow_html=True)
-
-                with col2:
-                    display_status = '1' if current_status == '2' else current_status
-                    status_text = {'1': '✅ 출석', '0': '❌ 결석'}
-                    status_color = {'1': '#4A9B7F', '0': '#E8985E'}
-                    st.markdown(f'<div style="font-weight:600; color:{status_color.get(display_status, "#4A9B7F")}; padding-top:8px;">{status_text.get(display_status, "✅ 출석")}</div>', unsafe_allow_html=True)
-
-                with col3:
-                    btn_cols = st.columns(2)
-                    with btn_cols[0]:
-                        if st.button("출석", key=f"p_{member_id}", use_container_width=True):
-                            st.session_state.attendance_data[attendance_key][member_id] = '1'
-                            st.rerun()
-                    with btn_cols[1]:
-                        if st.button("결석", key=f"a_{member_id}", use_container_width=True):
-                            st.session_state.attendance_data[attendance_key][member_id] = '0'
-                            st.rerun()
-
-                st.markdown("<hr style='border:none;border-top:1px solid #E8E4DF;margin:6px 0;'>", unsafe_allow_html=True)
-        else:
-            st.info("해당 목장에 등록된 성도가 없습니다.")
-
-        st.markdown("<div style='height:20px;'></div>", unsafe_allow_html=True)
-
-        if st.button("💾 출석 저장", use_container_width=True, type="primary"):
-            with st.spinner("저장 중..."):
-                if not members.empty:
-                    records = []
-                    for member_id, attend_type in st.session_state.attendance_data.get(attendance_key, {}).items():
-                        records.append(AttendanceCreate(
-                            member_id=member_id,
-                            attend_date=selected_date,
-                            attend_type=AttendType.from_value(attend_type),
-                            year=year,
-                            week_no=week_no
-                        ))
-                    if records:
-                        result = api.save_attendance(records)
-                        if result.get('success'):
-                            st.success(f"저장 완료! (저장: {result.get('inserted')}건)")
-                            st.cache_data.clear()
-                        else:
-                            st.error(f"저장 실패: {result.get('error')}")
+            existing_attendance = load_attendance(year, week_no, api.data_version())
+            existing = {}
+            if not existing_attendance.empty:
+                first = existing_attendance.drop_duplicates('member_id')
+                existing = dict(zip(first['member_id'], first['attend_type'].astype(str)))
+            st.session_state.attendance_data[attendance_key] = {
+                member_id: existing.get(member_id, '0') for member_id in members.get('member_id', [])
+            }
+
+        render_member_attendance(members, attendance_key, selected_date, year, week_no)
     else:
         st.warning("목장 데이터가 없습니다.")
 else:
     st.warning("데이터베이스에 연결할 수 없습니다.")
+
+profiler.render()
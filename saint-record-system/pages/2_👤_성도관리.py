@@ -7,8 +7,10 @@ from utils.sheets_api import SheetsAPI
 from utils.enums import MemberStatus, MemberType, ChurchRole, GroupRole, Relationship, BaptismStatus
 from utils.validators import MemberCreate, MemberUpdate
 from utils.sidebar import render_shared_sidebar
+from utils import profiler
 
 st.set_page_config(page_title="성도 관리", page_icon="👤", layout="wide")
+profiler.start("members")
 load_custom_css()
 render_shared_sidebar("members")
 
@@ -535,7 +537,6 @@ if db_connected:
                             st.session_state.edit_mode = False
                             st.session_state.show_detail = False
                             st.session_state.selected_member = None
-                            st.cache_data.clear()
                             st.rerun()
                         else:
                             st.error(f"저장 실패: {result.get('error')}")
@@ -876,7 +877,6 @@ if db_connected:
                         result = api.create_member(member_data)
                         if result.get('success'):
                             st.success(f"등록 완료! (ID: {result.get('member_id')})")
-                            st.cache_data.clear()
                         else:
                             st.error(f"등록 실패: {result.get('error')}")
                     except Exception as e:
@@ -884,3 +884,5 @@ if db_connected:
 
 else:
     st.warning("데이터베이스에 연결할 수 없습니다. 설정을 확인해주세요.")
+
+profiler.render()
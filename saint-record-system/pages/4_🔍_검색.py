@@ -4,8 +4,10 @@ from utils.ui import load_custom_css
 from utils.sheets_api import SheetsAPI
 from utils.enums import MemberStatus, ChurchRole, GroupRole, BaptismStatus
 from utils.sidebar import render_shared_sidebar
+from utils import profiler
 
 st.set_page_config(page_title="검색", page_icon="🔍", layout="wide")
+profiler.start("search")
 load_custom_css()
 render_shared_sidebar("search")
 
@@ -108,7 +110,7 @@ except Exception as e:
 
 # 데이터 로드
 @st.cache_data(ttl=300)
-def load_members():
+def load_members(data_version: int = 0):
     if db_connected:
         return api.get_members()
     return pd.DataFrame()
@@ -137,7 +139,7 @@ st.markdown("""
 
 if db_connected:
     with st.spinner("📊 데이터를 불러오는 중..."):
-        members = load_members()
+        members = load_members(api.data_version())
         departments = load_departments()
         groups = load_groups()
 
@@ -245,3 +247,5 @@ if db_connected:
         st.info("검색 조건을 입력하고 검색 버튼을 클릭하세요.")
 else:
     st.warning("데이터베이스에 연결할 수 없습니다.")
+
+profiler.render()
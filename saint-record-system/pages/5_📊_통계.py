@@ -5,8 +5,10 @@ from datetime import datetime, timedelta
 from utils.sheets_api import SheetsAPI
 from utils.ui import load_custom_css
 from utils.sidebar import render_shared_sidebar
+from utils import profiler
 
 st.set_page_config(page_title="통계", page_icon="📊", layout="wide")
+profiler.start("stats")
 load_custom_css()
 render_shared_sidebar("stats")
 
@@ -32,8 +34,8 @@ api = st.session_state.api
 
 
 @st.cache_data(ttl=3600, show_spinner=False)
-def get_yearly_statistics():
-    """연간 주간 출석 데이터 (부서별)"""
+def get_yearly_statistics(data_version: int = 0):
+    """연간 주간 출석 데이터 (부서별, data_version이 바뀌면 다시 집계)"""
     members = api.get_members({'status': '출석'})
     departments = api.get_departments()
     groups = api.get_groups()
@@ -56,51 +58,45 @@ def get_yearly_statistics():
     days_since_sunday = (today.weekday() + 1) % 7
     last_sunday = today - timedelta(days=days_since_sunday)
 
-    # 부서별 성도 수
+    # 올해 주일 목록
+    sundays = []
+    current_sunday = first_sunday
+    while current_sunday <= last_sunday:
+        sundays.append(current_sunday)
+        current_sunday += timedelta(days=7)
+    sunday_strs = [d.strftime('%Y-%m-%d') for d in sundays]
+
+    # 주간 집계에서 부서별 성도 수 / 주간 출석 인원 조회 (주일마다 출석 프레임을 다시 거르지 않음)
+    rollup = api.get_weekly_rollup(current_year)
+    dept_totals = rollup.totals('dept_id', status='출석')
+    weekly_counts = rollup.present(sunday_strs, 'dept_id', status='출석')
+
+    dept_ids = {}
     dept_member_counts = {}
     for dept_name in DEPT_ORDER:
         dept_row = departments[departments['dept_name'] == dept_name]
         if not dept_row.empty:
-            dept_id = str(dept_row.iloc[0]['dept_id'])
-            dept_members = members[members['dept_id'].astype(str) == dept_id]
-            dept_member_counts[dept_name] = len(dept_members)
+            dept_ids[dept_name] = str(dept_row.iloc[0]['dept_id'])
+            dept_member_counts[dept_name] = int(dept_totals.get(dept_ids[dept_name], 0))
         else:
             dept_member_counts[dept_name] = 0
 
     total_members = sum(dept_member_counts.values())
 
-    # 주간 데이터 수집
+    # 주간 데이터
     weekly_data = []
-    current_sunday = first_sunday
-
-    while current_sunday <= last_sunday:
-        sunday_str = current_sunday.strftime('%Y-%m-%d')
-        year = current_sunday.year
-        attendance = api.get_attendance(year, date=sunday_str)
-
+    for sunday, sunday_str in zip(sundays, sunday_strs):
         week_data = {
             'date': sunday_str,
-            'display_date': current_sunday.strftime('%m/%d'),
-            'week_no': current_sunday.isocalendar()[1],
+            'display_date': sunday.strftime('%m/%d'),
+            'week_no': sunday.isocalendar()[1],
         }
 
         # 부서별 출석 집계
         total_present = 0
         for dept_name in DEPT_ORDER:
-            dept_row = departments[departments['dept_name'] == dept_name]
-            if not dept_row.empty:
-                dept_id = str(dept_row.iloc[0]['dept_id'])
-                dept_members = members[members['dept_id'].astype(str) == dept_id]
-                member_ids = dept_members['member_id'].tolist()
-
-                if not attendance.empty and member_ids:
-                    dept_attendance = attendance[attendance['member_id'].isin(member_ids)]
-                    present = len(dept_attendance[dept_attendance['attend_type'].astype(str).isin(['1', '2'])])
-                else:
-                    present = 0
-            else:
-                present = 0
-
+            dept_id = dept_ids.get(dept_name)
+            present = int(weekly_counts.at[dept_id, sunday_str]) if dept_id in weekly_counts.index else 0
             week_data[dept_name] = present
             total_present += present
 
@@ -108,7 +104,6 @@ def get_yearly_statistics():
         week_data['출석률'] = round((total_present / total_members) * 100, 1) if total_members > 0 else 0
 
         weekly_data.append(week_data)
-        current_sunday += timedelta(days=7)
 
     return {
         'weekly_data': weekly_data,
@@ -134,7 +129,7 @@ st.markdown("""
 
 # 데이터 로드
 with st.spinner("데이터 로딩 중..."):
-    data = get_yearly_statistics()
+    data = get_yearly_statistics(api.data_version())
 
 weekly_data = data.get('weekly_data', [])
 members = data.get('members', pd.DataFrame())
@@ -274,6 +269,9 @@ with tab2:
         last_week = weekly_data[-1] if weekly_data else None
         last_week_date = last_week['date'] if last_week else None
 
+        # 목장별 금주 출석 (주간 집계에서 한 번에 조회)
+        group_stats_df = api.get_group_stats(last_week_date, status='출석') if last_week_date else None
+
         # 부서별 통계 카드 + 목장 펼침
         for dept_name in DEPT_ORDER:
             dept_row = departments[departments['dept_name'] == dept_name]
@@ -281,7 +279,7 @@ with tab2:
                 continue
 
             dept_id = str(dept_row.iloc[0]['dept_id'])
-            dept_members = members[members['dept_id'].astype(str) == dept_id]
+            dept_members = members[members['dept_id'] == dept_id]
             dept_total = len(dept_members)
 
             if dept_total == 0:
@@ -306,7 +304,7 @@ with tab2:
                     st.metric("출석률", f"{dept_rate}%")
 
                 # 해당 부서의 목장 목록
-                dept_groups = groups[groups['dept_id'].astype(str) == dept_id]
+                dept_groups = groups[groups['dept_id'] == dept_id]
 
                 if dept_groups.empty:
                     st.info("등록된 목장이 없습니다.")
@@ -322,23 +320,15 @@ with tab2:
                         if not group_id:
                             continue
 
-                        group_members = dept_members[dept_members['group_id'].astype(str) == group_id]
-                        group_total = len(group_members)
+                        group_total = int((dept_members['group_id'] == group_id).sum())
 
                         if group_total == 0:
                             continue
 
                         # 금주 출석
                         group_present = 0
-                        if last_week_date:
-                            year = int(last_week_date[:4])
-                            attendance = api.get_attendance(year, date=last_week_date)
-                            if not attendance.empty:
-                                member_ids = group_members['member_id'].tolist()
-                                group_attendance = attendance[attendance['member_id'].isin(member_ids)]
-                                group_present = len(group_attendance[
-                                    group_attendance['attend_type'].astype(str).isin(['1', '2'])
-                                ])
+                        if group_stats_df is not None and (dept_id, group_id) in group_stats_df.index:
+                            group_present = int(group_stats_df.at[(dept_id, group_id), 'present'])
 
                         group_rate = round((group_present / group_total) * 100, 1) if group_total > 0 else 0
 
@@ -394,3 +384,5 @@ st.markdown("---")
 if st.button("🔄 데이터 새로고침", use_container_width=False):
     get_yearly_statistics.clear()
     st.rerun()
+
+profiler.render()
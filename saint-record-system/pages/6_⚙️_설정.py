@@ -1,10 +1,13 @@
 import streamlit as st
+import json
 import pandas as pd
 from utils.ui import load_custom_css
 from utils.sheets_api import SheetsAPI, clear_sheets_cache
 from utils.sidebar import render_shared_sidebar
+from utils import instrumentation, profiler
 
 st.set_page_config(page_title="설정", page_icon="⚙️", layout="wide")
+profiler.start("settings")
 load_custom_css()
 render_shared_sidebar("settings")
 
@@ -117,7 +120,7 @@ except Exception as e:
 
 # 데이터 로드 함수
 @st.cache_data(ttl=300)
-def load_data_stats():
+def load_data_stats(data_version: int = 0):
     if db_connected:
         members = api.get_members()
         departments = api.get_departments()
@@ -165,7 +168,7 @@ st.markdown("""
 # 데이터 통계 섹션
 if db_connected:
     with st.spinner("데이터를 불러오는 중..."):
-        stats = load_data_stats()
+        stats = load_data_stats(api.data_version())
 
     st.markdown(f"""
     <div class="settings-card">
@@ -206,15 +209,85 @@ with col1:
     if st.button("🗑️ 캐시 초기화", use_container_width=True, type="primary"):
         st.cache_data.clear()
         st.cache_resource.clear()
-        clear_sheets_cache()
+        clear_sheets_cache(full=True)
         st.success("캐시가 초기화되었습니다.")
         st.rerun()
 
 with col2:
     if st.button("🔄 데이터 새로고침", use_container_width=True):
         st.cache_data.clear()
+        clear_sheets_cache()
         st.rerun()
 
+# 진단 섹션 (Sheets 요청 / 캐시 적중 / 호출 시간 - 느려졌을 때 원인 호출 찾기)
+st.markdown("""
+<div class="settings-card">
+    <div class="settings-card-title">🩺 진단</div>
+    <p style="font-size:13px; color:#6B7B8C; margin-bottom:16px;">
+        서버가 시작된 뒤(또는 초기화한 뒤) 기록된 Sheets API 요청, 캐시 적중률, 함수별 소요 시간입니다.
+        최근 이벤트는 링 버퍼에 보관되며, 카운터는 누적값입니다.
+    </p>
+</div>
+""", unsafe_allow_html=True)
+
+diagnostics = instrumentation.recorder.export()
+counters = diagnostics['counters']
+cache_stats = diagnostics['cache']
+cache_hits = sum(c['hits'] for c in cache_stats.values())
+cache_total = cache_hits + sum(c['misses'] for c in cache_stats.values())
+
+m1, m2, m3, m4, m5, m6 = st.columns(6)
+m1.metric("읽기 요청", counters.get('api_read', 0))
+m2.metric("쓰기 요청", counters.get('api_write', 0))
+m3.metric("메타데이터", counters.get('api_metadata', 0))
+m4.metric("429 재시도", counters.get('retries_429', 0), help=f"전체 재시도 {counters.get('retries', 0)}회")
+m5.metric("수신량", f"{counters.get('bytes_received', 0) / 1024:,.0f} KB",
+          help=f"송신 {counters.get('bytes_sent', 0) / 1024:,.1f} KB")
+m6.metric("캐시 적중률", f"{cache_hits / cache_total:.0%}" if cache_total else "-")
+
+summary_tab, events_tab, cache_tab = st.tabs(["⏱️ 소요 시간 (합계 순)", "📜 최근 이벤트", "🗄️ 캐시"])
+with summary_tab:
+    if diagnostics['summary']:
+        st.dataframe(pd.DataFrame(diagnostics['summary']), use_container_width=True, hide_index=True)
+    else:
+        st.caption("기록된 호출이 없습니다.")
+
+with events_tab:
+    if diagnostics['events']:
+        events_df = pd.DataFrame(diagnostics['events'][::-1][:300])
+        events_df['at'] = pd.to_datetime(events_df['at'], unit='s', utc=True).dt.tz_convert('Asia/Seoul').dt.strftime('%H:%M:%S')
+        st.dataframe(events_df, use_container_width=True, hide_index=True)
+    else:
+        st.caption("기록된 이벤트가 없습니다.")
+
+with cache_tab:
+    if cache_stats:
+        st.dataframe(pd.DataFrame.from_dict(cache_stats, orient='index').rename_axis('cache').reset_index(),
+                     use_container_width=True, hide_index=True)
+    else:
+        st.caption("기록된 캐시 호출이 없습니다.")
+
+d1, d2, d3 = st.columns([1, 1, 2])
+with d1:
+    st.download_button(
+        "📥 JSON 내보내기",
+        data=json.dumps(diagnostics, ensure_ascii=False, indent=2, default=str),
+        file_name=f"diagnostics_{pd.Timestamp.now():%Y%m%d_%H%M%S}.json",
+        mime="application/json",
+        use_container_width=True
+    )
+with d2:
+    if st.button("♻️ 진단 기록 초기화", use_container_width=True):
+        instrumentation.recorder.reset()
+        st.rerun()
+with d3:
+    # 콜백에서 바꿔야 이번 재실행의 profiler.start()부터 반영됨
+    st.toggle(
+        "⏱️ 재실행 프로파일링", value=profiler.is_enabled(), key="profiler_toggle",
+        on_change=lambda: profiler.set_enabled(st.session_state.profiler_toggle),
+        help="켜면 모든 페이지 하단에 재실행 시간 분석(데이터 로드/집계/HTML/Plotly)이 표시됩니다. 주소에 ?profile=1을 붙여도 켜집니다."
+    )
+
 # 도움말 섹션
 st.markdown("""
 <div class="settings-card">
@@ -283,3 +356,5 @@ with st.expander("📋 버전 히스토리"):
 
     **v3.11** - UI 개선 및 성도관리 기능 강화
     """)
+
+profiler.render()
@@ -6,8 +6,10 @@ from utils.sheets_api import SheetsAPI
 from utils.enums import Relationship, MemberStatus, BaptismStatus, ChurchRole, GroupRole, MemberType
 from utils.validators import MemberUpdate
 from utils.sidebar import render_shared_sidebar
+from utils import profiler
 
 st.set_page_config(page_title="가정 관리", page_icon="👨‍👩‍👧", layout="wide")
+profiler.start("family")
 load_custom_css()
 render_shared_sidebar("family")
 
@@ -281,7 +283,7 @@ except Exception as e:
 
 # 데이터 로드
 @st.cache_data(ttl=300)
-def load_members():
+def load_members(data_version: int = 0):
     if db_connected:
         return api.get_members()
     return pd.DataFrame()
@@ -532,7 +534,6 @@ def render_member_edit_form(member, departments, groups):
             if result.get('success'):
                 st.success("저장되었습니다!")
                 st.session_state.editing_member_id = None
-                st.cache_data.clear()
                 st.rerun()
             else:
                 st.error(f"저장 실패: {result.get('error')}")
@@ -642,7 +643,7 @@ def render_family_detail(family_id, family_members, head_name, departments, grou
 # ============================================================
 if db_connected:
     with st.spinner("📊 데이터를 불러오는 중..."):
-        members = load_members()
+        members = load_members(api.data_version())
         groups = load_groups()
         departments = load_departments()
 
@@ -683,3 +684,5 @@ if db_connected:
         st.info("등록된 성도가 없습니다.")
 else:
     st.warning("데이터베이스에 연결할 수 없습니다.")
+
+profiler.render()
@@ -0,0 +1,59 @@
+"""
+연도 경계 조회 - 앞 연도 출석 시트(Attendance_{year})가 아직 없을 때 빈 출석으로 처리되는지
+
+사용법 (saint-record-system 폴더에서):
+    python -m pytest tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+from datetime import date
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 스냅샷 캐시는 임시 폴더로 (utils import 전에 지정)
+_CACHE_DIR = tempfile.mkdtemp(prefix='saint-test-')
+os.environ['SHEETS_CACHE_DIR'] = _CACHE_DIR
+os.environ['SHEETS_BACKEND'] = 'emulator'
+
+import pytest
+
+from utils import sheets_api, sheets_emulator
+from utils.sheets_api import SheetsAPI, clear_sheets_cache
+from utils.sheets_emulator import EmulatedSpreadsheet
+from benchmarks.synthetic_data import generate_congregation
+
+
+@pytest.fixture
+def api():
+    """2026년 출석 시트만 있는 에뮬레이터"""
+    data = generate_congregation(30, years=1, end_date=date(2026, 3, 29))
+    assert [name for name in data if name.startswith('Attendance_')] == ['Attendance_2026']
+    sheets_emulator.install(EmulatedSpreadsheet(data))
+    sheets_api._get_sheets_pool.clear()
+    clear_sheets_cache(full=True)
+    yield SheetsAPI()
+    sheets_emulator.install(None)
+    sheets_api._get_sheets_pool.clear()
+    clear_sheets_cache(full=True)
+    shutil.rmtree(_CACHE_DIR, ignore_errors=True)
+
+
+def test_window_across_missing_previous_year(api):
+    """1월 초 기준 - 최근 주 범위가 없는 2025년 시트에 걸쳐도 예외 없이 2026년 출석만 집계"""
+    absent = api.get_3week_absent_members(base_date='2026-01-04')
+    assert isinstance(absent, list)
+
+    dept_id = str(api.get_departments().iloc[0]['dept_id'])
+    table = api.get_dept_attendance_table(dept_id, '2026-01-04')
+    assert isinstance(table, dict)
+
+
+def test_missing_year_is_empty(api):
+    """시트가 없는 연도는 빈 출석 (새해 첫 저장 전)"""
+    assert len(api.get_attendance(2024)) == 0
+    assert all(d['present'] == 0 for d in api.get_department_attendance('2027-01-03'))
+    assert api.get_weekly_rollup(2027) is not None
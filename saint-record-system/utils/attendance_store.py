@@ -0,0 +1,117 @@
+"""출석 컬럼형 저장소 - 성도 × 주일 비트맵 인덱스"""
+
+import numpy as np
+import pandas as pd
+from typing import Optional, Sequence
+
+# 출석으로 집계하는 attend_type 값 (기존 온라인 '2'는 출석으로 취급)
+PRESENT_TYPES = ('1', '2')
+
+
+class AttendanceStore:
+    """
+    연도별 출석 데이터를 성도(행) × 주일(열) 비트맵으로 보관
+
+    - member_ids: 행 순서의 성도 ID 배열
+    - dates: 열 순서의 날짜 배열 (datetime64[D], 오름차순)
+    - bits: np.packbits로 압축한 출석 비트맵 (행마다 ceil(주일 수 / 8) 바이트)
+
+    시트 레코드 → DataFrame 변환과 문자열 비교를 매번 반복하지 않고,
+    비트 연산으로 부서/목장별 출석을 집계하기 위한 읽기 전용 구조입니다.
+    """
+
+    def __init__(self, member_ids: np.ndarray, dates: np.ndarray, bits: np.ndarray):
+        self.member_ids = member_ids
+        self.dates = dates
+        self.bits = bits
+        self._member_index = pd.Index(member_ids)
+        self._date_index = {str(d): i for i, d in enumerate(dates)}
+
+    @classmethod
+    def empty(cls) -> 'AttendanceStore':
+        return cls(
+            np.array([], dtype=object),
+            np.array([], dtype='datetime64[D]'),
+            np.zeros((0, 0), dtype=np.uint8)
+        )
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> 'AttendanceStore':
+        """정규화된 출석 프레임(normalize_attendance 결과)으로 비트맵 생성"""
+        if frame.empty:
+            return cls.empty()
+
+        valid = frame['attend_date'].notna().to_numpy()
+        if not valid.any():
+            return cls.empty()
+
+        member_codes, member_ids = pd.factorize(frame['member_id'].to_numpy()[valid])
+        date_codes, dates = pd.factorize(frame['attend_date'].to_numpy()[valid], sort=True)
+        present = frame['present'].to_numpy()[valid]
+
+        dense = np.zeros((len(member_ids), len(dates)), dtype=bool)
+        dense[member_codes[present], date_codes[present]] = True
+
+        return cls(
+            np.asarray(member_ids, dtype=object),
+            np.asarray(dates).astype('datetime64[D]'),
+            np.packbits(dense, axis=1)
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """비트맵 + 인덱스 배열이 차지하는 메모리 (bytes)"""
+        return int(self.bits.nbytes + self.dates.nbytes + self.member_ids.nbytes)
+
+    def _column_bits(self, date: str) -> Optional[np.ndarray]:
+        """날짜 한 열의 출석 비트 (행 순서, 0/1). 해당 날짜가 없으면 None"""
+        col = self._date_index.get(date)
+        if col is None:
+            return None
+        return (self.bits[:, col >> 3] >> (7 - (col & 7))) & 1
+
+    def present_mask(self, member_ids: Sequence[str], date: str) -> np.ndarray:
+        """member_ids 순서대로 해당 날짜 출석 여부 (bool 배열)"""
+        result = np.zeros(len(member_ids), dtype=bool)
+        column = self._column_bits(date)
+        if column is None or len(member_ids) == 0:
+            return result
+
+        rows = self._member_index.get_indexer(pd.Index(member_ids).astype(str))
+        found = rows >= 0
+        result[found] = column[rows[found]].astype(bool)
+        return result
+
+    def presence_matrix(self, member_ids: Sequence[str], dates: Sequence[str]) -> np.ndarray:
+        """성도 × 날짜 출석 행렬 (bool, shape=(len(member_ids), len(dates)))"""
+        matrix = np.zeros((len(member_ids), len(dates)), dtype=bool)
+        if len(member_ids) == 0 or len(dates) == 0 or len(self.member_ids) == 0:
+            return matrix
+
+        rows = self._member_index.get_indexer(pd.Index(member_ids).astype(str))
+        found = rows >= 0
+        for j, date in enumerate(dates):
+            column = self._column_bits(date)
+            if column is not None:
+                matrix[found, j] = column[rows[found]].astype(bool)
+        return matrix
+
+    def count_present(self, date: str) -> int:
+        """해당 날짜 전체 출석 인원"""
+        column = self._column_bits(date)
+        return int(column.sum()) if column is not None else 0
+
+
+def absence_streaks(presence: np.ndarray) -> np.ndarray:
+    """
+    성도별 현재 연속 결석 주 수
+
+    Args:
+        presence: 출석 행렬 (bool, 성도 × 주일, 과거 → 최근 순)
+
+    Returns: int 배열 - 가장 최근 주일부터 거슬러 올라가며 센 연속 결석 수 (최대 열 개수)
+    """
+    if presence.shape[1] == 0:
+        return np.zeros(presence.shape[0], dtype=int)
+    # 최근 주일부터 뒤집은 결석 행렬의 누적곱 = 첫 출석 전까지 1
+    return np.cumprod(~presence[:, ::-1], axis=1).sum(axis=1)
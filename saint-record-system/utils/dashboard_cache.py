@@ -0,0 +1,157 @@
+"""대시보드 데이터 캐시 - stale-while-revalidate (오래된 값을 바로 보여주고 백그라운드에서 재계산)"""
+
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from .single_flight import SingleFlight
+from .snapshot_cache import CACHE_DIR
+
+MAX_AGE = 86400     # 이 시간(초)이 지나면 백그라운드 재계산
+MAX_ENTRIES = 16    # 보관할 기준 날짜 수 (오래 조회하지 않은 날짜부터 제거)
+
+
+class _Entry:
+    """기준 날짜별 대시보드 데이터 + 계산 당시 데이터 버전/시각"""
+
+    def __init__(self, data: dict, version: Optional[int], updated_at: float):
+        self.data = data
+        self.version = version  # None이면 무효화됨 (다음 조회 때 재계산)
+        self.updated_at = updated_at
+        self.used_at = time.time()
+
+
+class DashboardCache:
+    """
+    대시보드 데이터 stale-while-revalidate 캐시 (프로세스 공용)
+
+    - 캐시가 없으면 바로 계산 (첫 실행만 대기)
+    - 데이터 버전이 바뀌었거나, MAX_AGE가 지났거나, invalidate()된 경우
+      기존 값을 그대로 반환하고 백그라운드 스레드에서 재계산 → 다음 rerun부터 새 값
+    - 저장 직후처럼 새 값을 바로 보여야 하면 refresh_now()로 기다려서 재계산
+    - 계산 결과는 디스크에도 저장해 재배포/재시작 직후에도 기존 값을 먼저 보여줌
+
+    Args:
+        compute: 기준 날짜(YYYY-MM-DD) → 대시보드 데이터 dict (실패 시 예외)
+        version: 현재 성도/출석 데이터 버전
+        name: 캐시 이름 (디스크 저장 파일명 - 섹션별 캐시를 따로 둘 때 구분)
+    """
+
+    def __init__(self, compute: Callable[[str], dict], version: Callable[[], int], name: str = 'dashboard'):
+        self._compute = compute
+        self._version = version
+        self._name = name
+        self._disk_path = os.path.join(CACHE_DIR, f'{name}.json')
+        self._entries: Dict[str, _Entry] = self._load()
+        self._refreshing = set()
+        self._flights = SingleFlight()  # 같은 기준 날짜 동시 계산 합치기
+        self._lock = threading.Lock()
+
+    # ===== 조회 =====
+
+    def get(self, base_date: str) -> Tuple[dict, float]:
+        """
+        대시보드 데이터 조회 (캐시가 오래됐으면 기존 값 반환 + 백그라운드 재계산)
+
+        Returns: (대시보드 데이터, 계산 시각 epoch 초)
+        """
+        with self._lock:
+            entry = self._entries.get(base_date)
+        if entry is None:
+            entry = self._flights.do(base_date, lambda: self._refresh(base_date))
+        elif self._is_stale(entry):
+            self._revalidate(base_date)
+
+        entry.used_at = time.time()
+        return entry.data, entry.updated_at
+
+    def refresh_now(self, base_date: str) -> Tuple[dict, float]:
+        """
+        바로 재계산해 반환 (이 프로세스에서 쓰기 직후 - 저장한 값이 화면에 바로 보여야 할 때)
+
+        진행 중인 재계산이 있으면 합류하고, 그 계산이 쓰기 전 버전이었으면 한 번 더 계산합니다.
+        Returns: (대시보드 데이터, 계산 시각 epoch 초)
+        """
+        entry = self._flights.do(base_date, lambda: self._refresh(base_date))
+        if entry.version != self._version():
+            entry = self._flights.do(base_date, lambda: self._refresh(base_date))
+        entry.used_at = time.time()
+        return entry.data, entry.updated_at
+
+    def is_refreshing(self, base_date: str) -> bool:
+        """백그라운드 재계산 중인지"""
+        with self._lock:
+            return base_date in self._refreshing
+
+    def invalidate(self):
+        """모든 기준 날짜를 무효화 (값은 유지, 다음 조회 때 백그라운드 재계산)"""
+        with self._lock:
+            for entry in self._entries.values():
+                entry.version = None
+
+    # ===== 내부 =====
+
+    def _is_stale(self, entry: _Entry) -> bool:
+        return (
+            entry.version is None
+            or entry.version != self._version()
+            or time.time() - entry.updated_at > MAX_AGE
+        )
+
+    def _refresh(self, base_date: str) -> _Entry:
+        """계산 후 저장 (버전은 계산 전에 읽음 - 계산 중 변경이 있으면 다음 조회 때 다시 계산)"""
+        version = self._version()
+        entry = _Entry(self._compute(base_date), version, time.time())
+        with self._lock:
+            self._entries[base_date] = entry
+            self._evict()
+            entries = dict(self._entries)
+        self._save(entries)
+        return entry
+
+    def _revalidate(self, base_date: str):
+        """백그라운드 재계산 시작 (기준 날짜별 1개)"""
+        with self._lock:
+            if base_date in self._refreshing:
+                return
+            self._refreshing.add(base_date)
+
+        def run():
+            try:
+                self._flights.do(base_date, lambda: self._refresh(base_date))
+            except Exception as e:
+                # 실패해도 기존 값 유지 (다음 조회 때 다시 시도)
+                print(f"Dashboard refresh error ({self._name} {base_date}): {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(base_date)
+
+        threading.Thread(target=run, name=f'{self._name}-refresh-{base_date}', daemon=True).start()
+
+    def _evict(self):
+        """MAX_ENTRIES 초과 시 가장 오래 조회하지 않은 날짜부터 제거"""
+        while len(self._entries) > MAX_ENTRIES:
+            oldest = min(self._entries, key=lambda d: self._entries[d].used_at)
+            del self._entries[oldest]
+
+    def _load(self) -> Dict[str, _Entry]:
+        """디스크 저장본 (재시작 전 값 - 버전을 알 수 없으므로 무효화 상태로 불러옴)"""
+        try:
+            with open(self._disk_path, encoding='utf-8') as f:
+                saved = json.load(f)
+            return {d: _Entry(e['data'], None, e['updated_at']) for d, e in saved.items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def _save(self, entries: Dict[str, _Entry]):
+        """디스크 저장 (임시 파일 → 교체)"""
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp_path = f'{self._disk_path}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({d: {'data': e.data, 'updated_at': e.updated_at} for d, e in entries.items()}, f, ensure_ascii=False)
+            os.replace(tmp_path, self._disk_path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Dashboard cache save error ({self._name}): {e}")
@@ -0,0 +1,304 @@
+"""대시보드 스냅샷 - 한 번의 로드/집계로 대시보드 전체 섹션 생성"""
+
+import numpy as np
+import pandas as pd
+from functools import cached_property
+from typing import List, Dict, Optional
+
+from .sheets_api import (
+    SheetsAPI, prefetch_sheets, DEPT_STYLES, DEPT_CARD_STYLES, DEPT_DEFAULT_STYLE,
+    MOKJANG_STYLES, MOKJANG_DEFAULT_STYLE, DEPT_CHART_KEYS
+)
+
+TREND_WEEKS = 8  # 스택 차트 / 부서 트렌드 주 수
+CHART_WEEKS = 4  # 출석 추이 차트 주 수
+ABSENT_WEEKS = 3  # 연속 결석 알림 기준
+MEMBER_STATUS = '재적'  # 대시보드 집계 대상 성도 상태
+
+
+class DashboardSnapshot:
+    """
+    대시보드 데이터 빌더
+
+    성도/부서/목장 프레임은 처음 쓰는 섹션에서 한 번만 로드하고, 부서/목장별 주간
+    출석 인원은 주간 집계(WeeklyRollup)에서 읽습니다. 성도별 출석 행렬은 연속 결석
+    판정에 필요한 최근 주일만, 결석 알림 섹션을 계산할 때 만듭니다.
+    (SheetsAPI 집계 메서드를 섹션마다 따로 호출하면 같은 프레임을 반복 생성)
+
+    섹션 하나만 필요하면 section(name)으로 그 섹션에 필요한 것만 계산합니다.
+
+    Args:
+        api: SheetsAPI 인스턴스
+        base_date: 기준 날짜 (YYYY-MM-DD, 일요일)
+    """
+
+    def __init__(self, api: SheetsAPI, base_date: str):
+        self.api = api
+        self.base_date = base_date
+        self.base_sunday = pd.Timestamp(base_date)
+
+        # 오늘 기준 최근 일요일 (스택 차트/결석 알림 기준)
+        now = pd.Timestamp.now()
+        self.today_sunday = (now - pd.Timedelta(days=(now.weekday() + 1) % 7)).normalize()
+
+        # 1. 필요한 주일 전체 (기준일 8주 + 오늘 기준 8주)
+        self.base_weeks = self._sundays(self.base_sunday, TREND_WEEKS)
+        self.today_weeks = self._sundays(self.today_sunday, TREND_WEEKS)
+        dates = sorted(set(self.base_weeks) | set(self.today_weeks))
+
+        # 2. 캐시에 없는 시트는 먼저 한 번의 요청으로 함께 조회 (프레임은 섹션에서 처음 쓸 때 생성)
+        years = sorted({int(d[:4]) for d in dates})
+        prefetch_sheets(['Members', '_Departments', '_Groups'] + [f'Attendance_{y}' for y in years])
+
+    # ===== 프레임 (처음 사용할 때 1회 로드) =====
+
+    @cached_property
+    def members(self) -> pd.DataFrame:
+        return self.api.get_members({'status': MEMBER_STATUS})
+
+    @cached_property
+    def departments(self) -> pd.DataFrame:
+        return self.api.get_departments()
+
+    @cached_property
+    def groups(self) -> pd.DataFrame:
+        return self.api.get_groups()
+
+    @cached_property
+    def dept_map(self) -> Dict[str, str]:
+        return self.api._dept_name_map(self.departments)
+
+    @cached_property
+    def dept_keys(self) -> np.ndarray:
+        return self.members['dept_id'].to_numpy() if not self.members.empty else np.array([], dtype=object)
+
+    @cached_property
+    def group_keys(self) -> np.ndarray:
+        return self.members['group_id'].to_numpy() if not self.members.empty else np.array([], dtype=object)
+
+    @cached_property
+    def absent_matrix(self) -> np.ndarray:
+        """연속 결석 판정용 재적 성도 × 최근 주일 출석 행렬"""
+        absent_weeks = self.today_weeks[-ABSENT_WEEKS:]
+        if self.members.empty:
+            return np.zeros((0, len(absent_weeks)), dtype=bool)
+        return self.api.get_presence_matrix(self.members['member_id'].tolist(), absent_weeks)
+
+    # ===== 내부 헬퍼 =====
+
+    @staticmethod
+    def _sundays(last_sunday: pd.Timestamp, weeks: int) -> List[str]:
+        """last_sunday까지 weeks주 일요일 날짜 (과거 → 최근)"""
+        return [
+            (last_sunday - pd.Timedelta(weeks=i)).strftime('%Y-%m-%d')
+            for i in range(weeks - 1, -1, -1)
+        ]
+
+    def _weekly(self, by: str, dates: List[str]) -> pd.DataFrame:
+        """키(부서/목장 ID)별 주간 출석자 수 (키 × 주, 열은 dates 순서 0..n-1) - 주간 집계에서 조회"""
+        weekly = self.api.get_weekly_counts(dates, by, MEMBER_STATUS)
+        return weekly.set_axis(range(len(dates)), axis=1)
+
+    def _count_present(self, date: str) -> int:
+        """해당 날짜 전체 출석 인원 (재적 여부 무관)"""
+        return self.api.get_attendance_store(int(date[:4])).count_present(date)
+
+    # ===== 섹션 =====
+
+    def stat_cards(self) -> Dict:
+        """통계 카드 (전체 성도 / 금주 출석 / 전주 출석 / 신규 등록)"""
+        prev_sunday = (self.base_sunday - pd.Timedelta(days=7)).strftime('%Y-%m-%d')
+        return {
+            'total_members': len(self.members),
+            'current_attend': self._count_present(self.base_date),
+            'last_week_attend': self._count_present(prev_sunday),
+            'new_members': self.api._count_new_members(self.members),
+        }
+
+    def attendance_chart(self) -> Dict:
+        """최근 4주 출석 추이 차트"""
+        dates = self.base_weeks[-CHART_WEEKS:]
+        return {
+            'chart_dates': [pd.Timestamp(d).strftime('%m/%d') for d in dates],
+            'chart_attend': [self._count_present(d) for d in dates],
+            'chart_total': [len(self.members)] * len(dates),
+        }
+
+    def dept_attendance(self) -> List[Dict]:
+        """부서별 출석 현황 (기준일)"""
+        if self.departments.empty or self.members.empty:
+            return []
+
+        counts = self._weekly('dept_id', [self.base_date])[0]
+        totals = pd.Series(self.dept_keys).value_counts()
+
+        results = []
+        for _, dept in self.departments.iterrows():
+            dept_id = str(dept.get('dept_id', ''))
+            dept_name = dept.get('dept_name', '')
+            total = int(totals.get(dept_id, 0))
+            if not dept_id or total == 0:
+                continue
+
+            present = int(counts.get(dept_id, 0))
+            style = DEPT_STYLES.get(dept_name, DEPT_DEFAULT_STYLE)
+            results.append({
+                'dept_id': dept_id,
+                'name': dept_name,
+                'emoji': style['emoji'],
+                'css_class': style['css_class'],
+                'total': total,
+                'present': present,
+                'rate': round((present / total) * 100, 1) if total > 0 else 0
+            })
+        return results
+
+    def mokjang_attendance(self) -> List[Dict]:
+        """목장별 출석 현황 (기준일)"""
+        if self.groups.empty or self.members.empty:
+            return []
+
+        counts = self._weekly('group_id', [self.base_date])[0]
+        totals = pd.Series(self.group_keys).value_counts()
+
+        results = []
+        for _, group in self.groups.iterrows():
+            group_id = str(group.get('group_id', ''))
+            group_name = group.get('group_name', '')
+            total = int(totals.get(group_id, 0))
+            if not group_id or total == 0:
+                continue
+
+            present = int(counts.get(group_id, 0))
+            style = MOKJANG_STYLES.get(group_name, MOKJANG_DEFAULT_STYLE)
+            results.append({
+                'group_id': group_id,
+                'name': group_name,
+                'emoji': style['emoji'],
+                'css_class': style['css_class'],
+                'total': total,
+                'present': present,
+                'rate': round((present / total) * 100, 1) if total > 0 else 0
+            })
+        return results
+
+    def absent_members(self) -> List[Dict]:
+        """3주 연속 결석 성도 (오늘 기준 최근 일요일)"""
+        if self.members.empty:
+            return []
+        return self.api._streak_members(self.members, self.absent_matrix, self.dept_map, ABSENT_WEEKS)
+
+    def birthdays(self) -> List[Dict]:
+        """이번 주 생일자"""
+        if self.members.empty:
+            return []
+        return self.api._find_birthdays(self.members, self.dept_map)
+
+    def stacked_chart(self) -> List[Dict]:
+        """8주 부서별 출석 (스택 바 차트, 오늘 기준 최근 일요일)"""
+        if self.departments.empty or self.members.empty:
+            return []
+
+        weekly = self._weekly('dept_id', self.today_weeks)
+
+        results = []
+        for col, sunday in enumerate(self.today_weeks):
+            week_label = pd.Timestamp(sunday).strftime('%m월 %d일').replace(' 0', ' ').lstrip('0')
+            week_data = {'week': week_label, 'adults': 0, 'youth': 0, 'teens': 0, 'children': 0}
+
+            for _, dept in self.departments.iterrows():
+                dept_id = str(dept.get('dept_id', ''))
+                dept_key = DEPT_CHART_KEYS.get(dept.get('dept_name', ''))
+                if dept_key and dept_id in weekly.index:
+                    week_data[dept_key] = int(weekly.at[dept_id, col])
+
+            results.append(week_data)
+        return results
+
+    def dept_stats(self) -> List[Dict]:
+        """부서별 통계 (부서 카드용, 기준일)"""
+        if self.departments.empty:
+            return []
+
+        counts = self._weekly('dept_id', [self.base_date])[0]
+        totals = pd.Series(self.dept_keys).value_counts()
+        group_counts = {}
+        if not self.groups.empty:
+            group_counts = self.groups['dept_id'].value_counts().to_dict()
+
+        results = []
+        for _, dept in self.departments.iterrows():
+            dept_id = str(dept.get('dept_id', ''))
+            dept_name = dept.get('dept_name', '')
+            if not dept_id:
+                continue
+
+            members_count = int(totals.get(dept_id, 0))
+            attendance_rate = 0
+            if members_count > 0:
+                attendance_rate = int((int(counts.get(dept_id, 0)) / members_count) * 100)
+
+            style = DEPT_CARD_STYLES.get(dept_name, DEPT_DEFAULT_STYLE)
+            results.append({
+                'dept_id': dept_id,
+                'name': dept_name,
+                'emoji': style['emoji'],
+                'css_class': style['css_class'],
+                'groups_count': int(group_counts.get(dept_id, 0)),
+                'members_count': members_count,
+                'attendance_rate': attendance_rate
+            })
+        return results
+
+    def dept_trends(self, dept_ids: Optional[List[str]] = None) -> Dict[str, List[int]]:
+        """부서별 8주 출석률 트렌드 (팝오버 미니차트용, 기준일)"""
+        if dept_ids is None:
+            dept_ids = [d['dept_id'] for d in self.dept_stats()]
+
+        weekly = self._weekly('dept_id', self.base_weeks)
+        totals = pd.Series(self.dept_keys).value_counts()
+
+        trends = {}
+        for dept_id in dept_ids:
+            total = int(totals.get(str(dept_id), 0))
+            if total == 0 or str(dept_id) not in weekly.index:
+                trends[dept_id] = [0] * TREND_WEEKS
+                continue
+            trends[dept_id] = [int((int(p) / total) * 100) for p in weekly.loc[str(dept_id)]]
+        return trends
+
+    def alerts(self) -> Dict:
+        """헤더 알림 (3주 연속 결석 / 이번 주 생일)"""
+        return {'absent_3weeks': self.absent_members(), 'birthdays': self.birthdays()}
+
+    def dept_cards(self) -> Dict:
+        """부서 카드 (부서별 통계 + 8주 트렌드)"""
+        stats = self.dept_stats()
+        return {'dept_stats': stats, 'dept_trends': self.dept_trends([d['dept_id'] for d in stats])}
+
+    def section(self, name: str) -> Dict:
+        """대시보드 섹션 1개 데이터 (SECTIONS 참고)"""
+        return SECTIONS[name](self)
+
+    def to_dict(self) -> Dict:
+        """전체 대시보드 데이터 (모든 섹션 + 출석 추이/부서·목장 출석을 한 번에)"""
+        data = {'last_sunday': self.base_date}
+        data.update(self.stat_cards())
+        data.update(self.attendance_chart())
+        data['dept_attendance'] = self.dept_attendance()
+        data['mokjang_attendance'] = self.mokjang_attendance()
+        data['absent_3weeks'] = self.absent_members()
+        data['birthdays'] = self.birthdays()
+        data['stacked_chart_data'] = self.stacked_chart()
+        data['dept_stats'] = self.dept_stats()
+        data['dept_trends'] = self.dept_trends([d['dept_id'] for d in data['dept_stats']])
+        return data
+
+
+# 대시보드 섹션 → 섹션 데이터 (app.py가 섹션별로 따로 계산/캐시/렌더링, 위에서부터 표시 순서)
+SECTIONS = {
+    'stat_cards': DashboardSnapshot.stat_cards,
+    'alerts': DashboardSnapshot.alerts,
+    'stacked_chart': lambda s: {'stacked_chart_data': s.stacked_chart()},
+    'dept_cards': DashboardSnapshot.dept_cards,
+}
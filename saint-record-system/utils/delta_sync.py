@@ -0,0 +1,110 @@
+"""출석 시트 증분 동기화 - 스냅샷 이후 추가/수정된 끝부분 행만 조회"""
+
+from datetime import date, timedelta
+from typing import List, Dict, Optional, Tuple
+
+from gspread.utils import numericise_all, rowcol_to_a1
+
+RESYNC_WEEKS = 4  # 최근 N주 행은 수정됐을 수 있으므로 다시 조회
+# 앞부분 변경 확인용 열 - attend_id(연도/주차/성도)로 행 추가·삭제·이동을, attend_type으로 값 수정을 확인
+PREFIX_COLUMNS = ('attend_id', 'attend_type')
+
+
+def is_frozen(year: int, synced_at: str, today: Optional[date] = None) -> bool:
+    """
+    지난 연도 출석 스냅샷이 확정됐는지 (해가 바뀐 뒤에 한 번 동기화한 스냅샷은 다시 조회하지 않음)
+
+    Args:
+        year: 출석 연도
+        synced_at: 스냅샷 동기화 날짜 (YYYY-MM-DD)
+    """
+    today = today or date.today()
+    return year < today.year and bool(synced_at) and int(synced_at[:4]) > year
+
+
+def row_records(headers: List[str], rows: List[List]) -> List[Dict]:
+    """조회한 행 → get_all_records()와 같은 레코드 (빈 셀 채움 + 숫자 변환)"""
+    width = len(headers)
+    return [
+        dict(zip(headers, numericise_all((list(row) + [''] * width)[:width])))
+        for row in rows
+    ]
+
+
+def _resync_start(records: List[Dict]) -> int:
+    """다시 조회할 첫 레코드 위치 (최근 RESYNC_WEEKS주 출석 중 가장 앞, 없으면 끝, 날짜 형식이 잘못됐으면 처음)"""
+    dates = [str(r.get('attend_date', '')) for r in records]
+    valid = [d for d in dates if d]
+    if not valid:
+        return len(records)
+    try:
+        cutoff = (date.fromisoformat(max(valid)) - timedelta(weeks=RESYNC_WEEKS)).isoformat()
+    except ValueError:  # 직접 입력한 날짜 등 - 전체 재조회
+        return 0
+    return next((i for i, d in enumerate(dates) if d and d > cutoff), len(records))
+
+
+def _prefix_columns(headers: List[str]) -> List[int]:
+    """앞부분 비교 열 위치 (PREFIX_COLUMNS 중 시트에 있는 열, 없으면 첫 열)"""
+    return [headers.index(c) for c in PREFIX_COLUMNS if c in headers] or [0]
+
+
+def tail_ranges(records: List[Dict]) -> Tuple[List[int], List[str]]:
+    """
+    증분 동기화에 필요한 조회 범위
+
+    Returns: (비교 열 위치 목록, 범위 목록 - 앞부분 비교 열들 + 마지막에 재조회 구간 A{n}:F)
+    """
+    headers = list(records[0].keys())
+    last_col = rowcol_to_a1(1, len(headers))[:-1]
+    start = _resync_start(records)
+
+    # 앞부분 (시트 2행 ~ 재조회 직전 행)의 비교 열
+    columns = _prefix_columns(headers) if start else []
+    ranges = []
+    for c in columns:
+        col = rowcol_to_a1(1, c + 1)[:-1]
+        ranges.append(f'{col}2:{col}{start + 1}')
+    ranges.append(f'A{start + 2}:{last_col}')
+    return columns, ranges
+
+
+def merge_tail(records: List[Dict], columns: List[int], values: List[List[List]]) -> Optional[List[Dict]]:
+    """
+    tail_ranges() 범위의 조회 결과를 스냅샷 레코드에 반영
+
+    Returns: 동기화된 레코드 목록. 앞부분 비교 열이 스냅샷과 달라 전체 재조회가 필요하면 None
+    """
+    headers = list(records[0].keys())
+    start = _resync_start(records)
+    *column_values, tail = values
+    for c, rows in zip(columns, column_values):
+        # 빈 셀은 [] 로, 끝쪽 빈 행은 생략되어 옴
+        cells = [row[0] if row else '' for row in rows] + [''] * start
+        if numericise_all(cells[:start]) != [r[headers[c]] for r in records[:start]]:
+            return None
+
+    return records[:start] + row_records(headers, list(tail))
+
+
+def sync_tail(sheet, records: List[Dict]) -> Optional[List[Dict]]:
+    """
+    스냅샷 레코드를 시트와 증분 동기화 (batch_get 1회)
+
+    출석 시트는 주일마다 아래에 행이 추가되고, 수정은 주로 최근 몇 주에 몰립니다.
+    그래서 최근 RESYNC_WEEKS주 시작 행부터 끝까지(A{n}:F)만 다시 읽어 스냅샷 뒷부분을 교체하고,
+    그 앞부분은 비교 열(attend_id, attend_type)만 읽어 스냅샷과 같은지로 변경 여부를 확인합니다.
+    (Sheets API는 범위 체크섬을 제공하지 않으므로 같은 요청에 비교 열을 함께 조회 -
+     병합 가져오기처럼 오래된 행을 제자리에서 고친 경우도 전체 재조회로 이어짐)
+
+    Args:
+        sheet: gspread Worksheet
+        records: 스냅샷 레코드 (시트 2행부터 순서대로)
+
+    Returns: 동기화된 레코드 목록. 앞부분이 바뀌어 전체 재조회가 필요하면 None
+    """
+    if not records:
+        return None
+
+    columns, ranges = tail_ranges(records)
+    return merge_tail(records, columns, sheet.batch_get(ranges))
@@ -0,0 +1,61 @@
+"""시트 레코드 → 고정 스키마 DataFrame 정규화"""
+
+from typing import List, Dict, Sequence
+
+import pandas as pd
+
+from .attendance_store import PRESENT_TYPES
+
+# 값 종류가 적은 코드 컬럼 (문자열 카테고리)
+MEMBER_CATEGORIES = ('dept_id', 'group_id', 'status')
+DEPARTMENT_CATEGORIES = ('dept_id',)
+GROUP_CATEGORIES = ('group_id', 'dept_id')
+ATTENDANCE_CATEGORIES = ('member_id', 'attend_type')
+
+
+def _as_category(df: pd.DataFrame, columns: Sequence[str]) -> pd.DataFrame:
+    """코드 컬럼을 문자열 카테고리로 (시트의 숫자 1과 문자 '1'을 같은 값으로)"""
+    for col in columns:
+        if col in df.columns:
+            df[col] = df[col].astype(str).astype('category')
+    return df
+
+
+def normalize_members(records: List[Dict]) -> pd.DataFrame:
+    """성도 프레임 - dept_id/group_id/status 카테고리, member_id 문자열"""
+    df = pd.DataFrame(records)
+    if df.empty:
+        return df
+    df['member_id'] = df['member_id'].astype(str)
+    return _as_category(df, MEMBER_CATEGORIES)
+
+
+def normalize_departments(records: List[Dict]) -> pd.DataFrame:
+    """부서 프레임 - dept_id 카테고리"""
+    return _as_category(pd.DataFrame(records), DEPARTMENT_CATEGORIES)
+
+
+def normalize_groups(records: List[Dict]) -> pd.DataFrame:
+    """목장 프레임 - group_id/dept_id 카테고리"""
+    return _as_category(pd.DataFrame(records), GROUP_CATEGORIES)
+
+
+def normalize_attendance(records: List[Dict]) -> pd.DataFrame:
+    """
+    출석 프레임
+    - member_id/attend_type: 카테고리
+    - present: 출석 여부 (attend_type '1' 또는 '2')
+    - attend_date: datetime64 (형식이 틀린 값은 NaT)
+    - year: int16, week_no: int8
+    """
+    df = pd.DataFrame(records)
+    if df.empty:
+        return df
+
+    df = _as_category(df, ATTENDANCE_CATEGORIES)
+    df['present'] = df['attend_type'].isin(PRESENT_TYPES)
+    df['attend_date'] = pd.to_datetime(df['attend_date'].astype(str), format='%Y-%m-%d', errors='coerce')
+    for col, dtype in (('year', 'int16'), ('week_no', 'int8')):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(dtype)
+    return df
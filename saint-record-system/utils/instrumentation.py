@@ -0,0 +1,215 @@
+"""성능 계측 - Sheets API 요청 / 캐시 적중 / SheetsAPI 호출 시간을 링 버퍼에 기록 (설정 > 진단)"""
+
+import functools
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import unquote
+
+MAX_EVENTS = int(os.environ.get('INSTRUMENTATION_EVENTS', 2000))  # 링 버퍼 크기 (오래된 이벤트부터 버림)
+
+_API_PREFIX = re.compile(r'^https://(?:sheets|www)\.googleapis\.com/(?:v4/spreadsheets|drive/v3/files)/[^/:?]+')
+
+
+class Recorder:
+    """
+    계측 이벤트 링 버퍼 + 누적 카운터 (프로세스 공용)
+
+    이벤트 category:
+    - api: Sheets/Drive HTTP 요청 1건 (kind=read/write/metadata, 상태 코드, 주고받은 바이트, 재시도)
+    - cache: 캐시 함수 호출 1건 (hit 여부)
+    - load: 시트 레코드 로드 1건 (source=staged/snapshot/delta/full/missing)
+    - call: SheetsAPI 공개 메서드 / 대시보드 빌드 1건 (depth=중첩 깊이)
+
+    카운터는 버퍼에서 밀려난 이벤트도 포함한 누적값입니다 (reset() 전까지).
+    """
+
+    def __init__(self, max_events: int = MAX_EVENTS):
+        self.events = deque(maxlen=max_events)
+        self.counters: Counter = Counter()
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def record(self, category: str, name: str, duration: float, **fields):
+        """이벤트 1건 기록 (duration: 초)"""
+        event = {'at': time.time(), 'category': category, 'name': name,
+                 'ms': round(duration * 1000, 2), **fields}
+        with self._lock:
+            self.events.append(event)
+
+    def count(self, key: str, n: int = 1):
+        with self._lock:
+            self.counters[key] += n
+
+    def reset(self):
+        with self._lock:
+            self.events.clear()
+            self.counters.clear()
+            self.started_at = time.time()
+
+    def recent(self) -> List[Dict]:
+        """버퍼의 이벤트 (오래된 순)"""
+        with self._lock:
+            return list(self.events)
+
+    def summary(self) -> List[Dict]:
+        """(category, name)별 호출 수 / 합계 / 평균 / 최대 시간 (버퍼 기준, 합계 시간 큰 순)"""
+        groups: Dict[tuple, List[float]] = {}
+        for event in self.recent():
+            groups.setdefault((event['category'], event['name']), []).append(event['ms'])
+        rows = [
+            {'category': category, 'name': name, 'count': len(ms), 'total_ms': round(sum(ms), 1),
+             'avg_ms': round(sum(ms) / len(ms), 1), 'max_ms': round(max(ms), 1)}
+            for (category, name), ms in groups.items()
+        ]
+        return sorted(rows, key=lambda r: r['total_ms'], reverse=True)
+
+    def cache_ratios(self) -> Dict[str, Dict[str, float]]:
+        """캐시별 적중/미스 수와 적중률 (누적)"""
+        with self._lock:
+            counters = dict(self.counters)
+        names = sorted({k.split(':', 1)[1] for k in counters if k.startswith(('cache_hit:', 'cache_miss:'))})
+        ratios = {}
+        for name in names:
+            hits, misses = counters.get(f'cache_hit:{name}', 0), counters.get(f'cache_miss:{name}', 0)
+            ratios[name] = {'hits': hits, 'misses': misses, 'hit_ratio': round(hits / (hits + misses), 3)}
+        return ratios
+
+    def export(self) -> Dict[str, Any]:
+        """JSON 내보내기용 전체 상태"""
+        with self._lock:
+            counters = dict(self.counters)
+        return {
+            'started_at': self.started_at,
+            'exported_at': time.time(),
+            'max_events': self.events.maxlen,
+            'counters': counters,
+            'cache': self.cache_ratios(),
+            'summary': self.summary(),
+            'events': self.recent(),
+        }
+
+
+recorder = Recorder()
+
+# 스레드별 계측 상태 (SheetsAPI 호출 중첩 깊이, 진행 중인 캐시 호출의 미스 여부)
+_local = threading.local()
+
+
+# ===== Sheets API 요청 =====
+
+def request_name(method: str, endpoint: str) -> str:
+    """요청 엔드포인트 → 짧은 이름 (스프레드시트 ID 제거, 범위 디코딩)"""
+    path = unquote(_API_PREFIX.sub('', endpoint)).lstrip('/') or '(spreadsheet)'
+    return f'{method.upper()} {path}'[:80]
+
+
+def request_kind(method: str, endpoint: str) -> str:
+    """요청 종류 - write / read(값 조회) / metadata(시트 목록, Drive 수정 시각 등)"""
+    if method.upper() != 'GET':
+        return 'write'
+    return 'read' if '/values' in endpoint else 'metadata'
+
+
+def record_request(method: str, endpoint: str, duration: float, status: Optional[int],
+                   sent: int, received: int, retries: int, throttled: int):
+    """
+    HTTP 요청 1건 기록 (재시도/토큰 대기 포함 전체 시간)
+
+    Args:
+        status: 최종 응답 코드 (연결 실패면 None)
+        sent / received: 요청/응답 본문 바이트
+        retries: 재시도 횟수, throttled: 그중 429 응답 수
+    """
+    kind = request_kind(method, endpoint)
+    recorder.record('api', request_name(method, endpoint), duration, kind=kind, status=status,
+                    sent=sent, received=received, retries=retries)
+    with recorder._lock:
+        recorder.counters[f'api_{kind}'] += 1
+        recorder.counters['bytes_sent'] += sent
+        recorder.counters['bytes_received'] += received
+        recorder.counters['retries'] += retries
+        recorder.counters['retries_429'] += throttled
+        if status is None or status >= 400:
+            recorder.counters['api_errors'] += 1
+
+
+# ===== 캐시 =====
+
+def cached(name: str, cache_decorator: Callable) -> Callable:
+    """
+    st.cache_data / st.cache_resource 대신 쓰는 계측 데코레이터 (적중/미스 + 호출 시간)
+
+        @instrumentation.cached('members_frame', st.cache_resource(ttl=86400, show_spinner=False))
+        def _cached_get_members_frame(version): ...
+
+    캐시 본문이 실행되면 미스, 실행되지 않으면 적중으로 셉니다.
+    .clear()는 원래 캐시 함수의 것을 그대로 씁니다.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def body(*args, **kwargs):
+            # 본문 실행 = 미스 (바깥 wrapper가 바로 전에 넣은 표시)
+            stack = getattr(_local, 'cache_stack', None)
+            if stack:
+                stack[-1] = True
+            return fn(*args, **kwargs)
+
+        cached_fn = cache_decorator(body)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            stack = _local.__dict__.setdefault('cache_stack', [])
+            stack.append(False)
+            start = time.perf_counter()
+            try:
+                return cached_fn(*args, **kwargs)
+            finally:
+                miss = stack.pop()
+                recorder.record('cache', name, time.perf_counter() - start, hit=not miss)
+                recorder.count(f"cache_{'miss' if miss else 'hit'}:{name}")
+
+        wrapper.clear = cached_fn.clear
+        return wrapper
+    return decorator
+
+
+# ===== 호출 시간 =====
+
+@contextmanager
+def timed(category: str, name: str, **fields):
+    """블록 실행 시간 기록 (예외도 기록 후 그대로 올림)"""
+    depth = getattr(_local, 'depth', 0)
+    _local.depth = depth + 1
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        _local.depth = depth
+        recorder.record(category, name, time.perf_counter() - start, depth=depth,
+                        **({'error': error} if error else {}), **fields)
+
+
+def instrument_methods(cls):
+    """클래스 데코레이터 - 공개 메서드(이름이 _로 시작하지 않는 함수)마다 호출 시간 기록"""
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith('_') or not callable(value) or isinstance(value, (staticmethod, classmethod, type)):
+            continue
+        setattr(cls, attr, _timed_method(f'{cls.__name__}.{attr}', value))
+    return cls
+
+
+def _timed_method(name: str, fn: Callable) -> Callable:
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with timed('call', name):
+            return fn(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,184 @@
+"""
+재실행 프로파일러 - 페이지 1회 재실행을 cProfile로 측정해 어디에 시간을 쓰는지 분류 (opt-in)
+
+켜는 방법:
+- 쿼리 파라미터: ?profile=1 (해당 세션에서 계속 켜짐, ?profile=0으로 끔)
+- 설정 > 진단 > '재실행 프로파일링' 토글
+
+각 페이지에서:
+    st.set_page_config(...)
+    profiler.start("dashboard")   # CSS 로드 전에 시작해야 load_custom_css()도 측정됨
+    ...
+    profiler.render()             # 페이지 끝 - 측정 종료 + 결과 expander
+
+시간은 함수가 정의된 파일 기준으로 데이터 로드 / 집계 / HTML 생성 / Plotly / Streamlit / 기타로 나눕니다.
+내장 함수(str.join, time.sleep 등)의 시간은 호출한 함수의 분류로 넘깁니다.
+"""
+
+import cProfile
+import os
+import pstats
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import pandas as pd
+import streamlit as st
+
+PROFILE_PARAM = 'profile'
+ENABLED_KEY = '_profiler_enabled'
+HISTORY_KEY = '_profiler_history'
+ACTIVE_KEY = '_profiler_active'
+
+MAX_PROFILES = int(os.environ.get('PROFILER_HISTORY', 10))  # 세션별 보관 프로파일 수
+TOP_N = 25
+
+# (분류, 파일 경로에 포함되는 문자열) - 위에서부터 처음 맞는 분류
+CATEGORIES = [
+    ('데이터 로드', ('/utils/sheets_', '/utils/snapshot_cache', '/utils/delta_sync', '/utils/row_index',
+                 '/utils/apps_script_client', '/utils/sheets_pool', '/utils/single_flight',
+                 '/gspread/', '/requests/', '/urllib3/', '/google/auth/', '/google/oauth2/', '/ssl.py', '/socket.py',
+                 '/http/client.py', '/json/')),
+    ('집계', ('/utils/attendance_store', '/utils/weekly_rollup', '/utils/dashboard_snapshot',
+            '/utils/dashboard_cache', '/utils/frames', '/pandas/', '/numpy/')),
+    ('Plotly', ('/plotly/', '/_plotly_utils/')),
+    # 페이지 스크립트 본문은 대부분 f-string HTML 조립
+    ('HTML 생성', ('/utils/ui.py', '/utils/sidebar.py', '/saint-record-system/app.py', '/saint-record-system/pages/')),
+    ('Streamlit', ('/streamlit/', '/google/protobuf/', '/pyarrow/')),
+]
+OTHER = '기타'
+CATEGORY_ORDER = [c for c, _ in CATEGORIES] + [OTHER]
+
+
+def is_enabled() -> bool:
+    """쿼리 파라미터 또는 설정 토글로 켜졌는지 (쿼리 파라미터는 세션 설정으로 기억)"""
+    value = st.query_params.get(PROFILE_PARAM)
+    if value is not None:
+        st.session_state[ENABLED_KEY] = value not in ('0', 'false', 'off', '')
+    return st.session_state.get(ENABLED_KEY, False)
+
+
+def set_enabled(enabled: bool):
+    st.session_state[ENABLED_KEY] = enabled
+    if not enabled and PROFILE_PARAM in st.query_params:
+        del st.query_params[PROFILE_PARAM]
+
+
+def start(page: str):
+    """재실행 측정 시작 (꺼져 있으면 아무것도 하지 않음)"""
+    _stop_active()  # 이전 재실행이 st.stop()/st.rerun()으로 render()까지 못 갔을 때
+    if not is_enabled():
+        return
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:  # 다른 프로파일러가 이미 동작 중
+        return
+    st.session_state[ACTIVE_KEY] = (page, profile, time.time(), time.perf_counter())
+
+
+def render(top_n: int = TOP_N):
+    """측정 종료 → 기록에 추가 → 결과 expander 렌더링 (페이지 마지막에 호출)"""
+    active = _stop_active()
+    if active is None:
+        return
+    page, profile, started_at, start = active
+    result = analyze(profile, top_n)
+    result.update(page=page, at=started_at, wall_ms=round((time.perf_counter() - start) * 1000, 1))
+
+    history = st.session_state.setdefault(HISTORY_KEY, deque(maxlen=MAX_PROFILES))
+    history.append(result)
+    _render_expander(result, list(history))
+
+
+def _stop_active():
+    active = st.session_state.pop(ACTIVE_KEY, None)
+    if active is not None:
+        active[1].disable()
+    return active
+
+
+def categorize(filename: str) -> Optional[str]:
+    """파일 경로 → 분류 (내장 함수면 None)"""
+    if filename == '~' or filename.startswith('<'):
+        return None
+    path = filename.replace('\\', '/')
+    for category, patterns in CATEGORIES:
+        if any(p in path for p in patterns):
+            return category
+    return OTHER
+
+
+def analyze(profile: cProfile.Profile, top_n: int = TOP_N) -> Dict:
+    """
+    cProfile 결과 요약
+
+    Returns: {
+        'categories': {분류: 자체 시간 ms},
+        'top': [누적 시간 상위 함수 (function, location, calls, self_ms, cum_ms, category)],
+    }
+    """
+    stats = pstats.Stats(profile).stats
+    categories = dict.fromkeys(CATEGORY_ORDER, 0.0)
+    for (filename, _, _), (_, _, tottime, _, callers) in stats.items():
+        category = categorize(filename)
+        if category is not None:
+            categories[category] += tottime
+            continue
+        # 내장 함수: 호출한 쪽 분류로 (호출자별 자체 시간)
+        for (caller_file, _, _), caller_stat in callers.items():
+            categories[categorize(caller_file) or OTHER] += caller_stat[2]
+
+    top = []
+    for (filename, line, name), (_, calls, tottime, cumtime, _) in sorted(
+            stats.items(), key=lambda item: item[1][3], reverse=True)[:top_n]:
+        top.append({
+            'function': name,
+            'location': _short_path(filename) + (f':{line}' if line else ''),
+            'calls': calls,
+            'self_ms': round(tottime * 1000, 1),
+            'cum_ms': round(cumtime * 1000, 1),
+            'category': categorize(filename) or '내장',
+        })
+    return {
+        'categories': {k: round(v * 1000, 1) for k, v in categories.items()},
+        'top': top,
+    }
+
+
+def _short_path(filename: str) -> str:
+    path = filename.replace('\\', '/')
+    for marker in ('/site-packages/', '/saint-record-system/', '/lib/python'):
+        if marker in path:
+            return path.split(marker, 1)[1]
+    return path
+
+
+def _render_expander(result: Dict, history: List[Dict]):
+    with st.expander(f"⏱️ 재실행 프로파일 - {result['page']} {result['wall_ms']:,.0f}ms", expanded=False):
+        st.caption("cProfile 측정값이라 실제보다 느립니다. 비율과 재실행 간 비교로 보세요.")
+
+        categories = pd.DataFrame(
+            [{'분류': k, 'ms': v} for k, v in result['categories'].items()]
+        ).sort_values('ms', ascending=False)
+        st.dataframe(
+            categories, hide_index=True, use_container_width=True,
+            column_config={'ms': st.column_config.ProgressColumn(
+                'ms', format='%.1f', min_value=0, max_value=max(categories['ms'].max(), 1.0))}
+        )
+
+        top = pd.DataFrame(result['top'])
+        st.markdown(f"**누적 시간 상위 {len(top)}개 함수**")
+        st.dataframe(
+            top, hide_index=True, use_container_width=True,
+            column_config={'cum_ms': st.column_config.ProgressColumn(
+                'cum_ms', format='%.1f', min_value=0, max_value=max(top['cum_ms'].max(), 1.0) if not top.empty else 1.0)}
+        )
+
+        if len(history) > 1:
+            st.markdown(f"**최근 {len(history)}회 재실행 비교**")
+            st.dataframe(pd.DataFrame([
+                {'시각': time.strftime('%H:%M:%S', time.localtime(p['at'])), '페이지': p['page'],
+                 '전체 ms': p['wall_ms'], **p['categories']}
+                for p in reversed(history)
+            ]), hide_index=True, use_container_width=True)
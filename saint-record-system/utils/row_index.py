@@ -0,0 +1,148 @@
+"""시트 행 인덱스 - 레코드 키 → 실제 시트 행 번호"""
+
+import itertools
+import re
+import threading
+from typing import List, Dict, Optional, Sequence, Tuple
+
+from gspread.utils import numericise
+
+HEADER_ROWS = 1  # 데이터는 2행부터
+
+# 데이터 버전 (프로세스 전체에서 단조 증가) - 인덱스 생성/변경마다 새 번호
+_versions = itertools.count(1)
+_latest_version = 0
+
+
+def _next_version() -> int:
+    global _latest_version
+    _latest_version = next(_versions)
+    return _latest_version
+
+
+def data_version() -> int:
+    """가장 최근에 생성/변경된 인덱스의 버전 (파생 캐시 키용)"""
+    return _latest_version
+
+
+def appended_row(response) -> Optional[int]:
+    """append_row/append_rows 응답(updatedRange)에서 추가된 첫 행 번호"""
+    try:
+        updated_range = response['updates']['updatedRange']
+    except (TypeError, KeyError):
+        return None
+    match = re.search(r'![A-Z]+(\d+)', updated_range)
+    return int(match.group(1)) if match else None
+
+
+class SheetRowIndex:
+    """
+    시트 레코드 키 → 시트 행 번호 인덱스
+
+    - records: get_all_records() 결과 (i번째 레코드 = i + 2행)
+    - key_fields: 키 컬럼 (Members: member_id / Attendance: member_id, attend_date)
+
+    시트를 한 번 읽어 만든 뒤, 이 앱이 행을 수정/삭제/추가할 때마다
+    제자리에서 갱신하는 쓰기 반영(write-through) 캐시입니다.
+    - 단건 수정 전에 시트 전체를 다시 읽거나 sheet.find()로 원격 검색하지 않고 행 번호 조회
+    - 쓰기 후 캐시를 비우고 다시 내려받지 않고 records()로 최신 레코드 제공
+    - 변경마다 version이 바뀌므로 파생 캐시(비트맵, 대시보드)는 version을 키로 사용
+    (시트를 직접 편집한 경우 clear_sheets_cache()로 다시 만들어야 함)
+    """
+
+    def __init__(self, records: List[Dict], key_fields: Sequence[str], headers: Optional[List[str]] = None):
+        self.key_fields = tuple(key_fields)
+        self.headers = list(headers) if headers else (list(records[0].keys()) if records else [])
+        self.lock = threading.RLock()
+        self.version = _next_version()
+        self._records = [dict(r) for r in records]
+        self._positions = None
+
+    @staticmethod
+    def _normalize(fields: Dict) -> Dict:
+        """get_all_records()로 다시 읽은 것과 같은 타입으로 (숫자 문자열 → 숫자)"""
+        return {k: numericise(v) if isinstance(v, str) else v for k, v in fields.items()}
+
+    def _touch(self):
+        """변경 후 새 버전 발급"""
+        self.version = _next_version()
+
+    def _key(self, record: Dict):
+        values = tuple(str(record.get(f, '')) for f in self.key_fields)
+        return values[0] if len(values) == 1 else values
+
+    def _position_map(self) -> Dict:
+        """키 → 레코드 위치 (같은 키가 여러 행이면 첫 행)"""
+        if self._positions is None:
+            positions = {}
+            for i, record in enumerate(self._records):
+                positions.setdefault(self._key(record), i)
+            self._positions = positions
+        return self._positions
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def records(self) -> List[Dict]:
+        """현재 레코드 복사본 (get_all_records()와 같은 형태)"""
+        with self.lock:
+            return [dict(r) for r in self._records]
+
+    @property
+    def next_row(self) -> int:
+        """다음에 추가될 행 번호"""
+        return len(self._records) + HEADER_ROWS + 1
+
+    def row_of(self, key) -> Optional[int]:
+        """키의 시트 행 번호 (없으면 None)"""
+        pos = self._position_map().get(key)
+        return None if pos is None else pos + HEADER_ROWS + 1
+
+    def record(self, key) -> Optional[Dict]:
+        """키의 현재 레코드 (없으면 None)"""
+        pos = self._position_map().get(key)
+        return None if pos is None else self._records[pos]
+
+    def rows_where(self, **fields) -> List[Tuple[int, Dict]]:
+        """컬럼 값이 모두 일치하는 (행 번호, 레코드) 목록 (문자열 비교)"""
+        wanted = {k: str(v) for k, v in fields.items()}
+        return [
+            (i + HEADER_ROWS + 1, record)
+            for i, record in enumerate(self._records)
+            if all(str(record.get(k, '')) == v for k, v in wanted.items())
+        ]
+
+    def update(self, row_num: int, fields: Dict):
+        """행 값 수정 (키 컬럼이 바뀌면 위치 맵 재생성)"""
+        self._records[row_num - HEADER_ROWS - 1].update(self._normalize(fields))
+        if any(f in fields for f in self.key_fields):
+            self._positions = None
+        self._touch()
+
+    def delete(self, row_nums: Sequence[int]):
+        """행 삭제 - 아래 행 번호가 한 칸씩 당겨짐"""
+        for row_num in sorted(set(row_nums), reverse=True):
+            del self._records[row_num - HEADER_ROWS - 1]
+        if row_nums:
+            self._positions = None
+            self._touch()
+
+    def append(self, records: List[Dict], start_row: Optional[int] = None) -> bool:
+        """
+        행 추가 (시트 맨 아래)
+
+        Args:
+            records: 추가한 레코드 목록
+            start_row: API 응답의 실제 추가 위치 (있으면 인덱스와 일치하는지 확인)
+
+        Returns: 인덱스가 시트와 일치하면 True (False면 인덱스를 다시 만들어야 함)
+        """
+        in_sync = start_row is None or start_row == self.next_row
+        positions = self._positions
+        for record in records:
+            if positions is not None:
+                positions.setdefault(self._key(record), len(self._records))
+            self._records.append(self._normalize(record))
+        if records:
+            self._touch()
+        return in_sync
@@ -2,29 +2,85 @@
 
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable
 import streamlit as st
 import os
 import json
-
+import threading
+import time
+from contextlib import contextmanager
+
+from . import instrumentation, sheets_emulator
+from .sheets_pool import SheetsPool
+from .sheets_scheduler import SchedulingHTTPClient
+from .single_flight import SingleFlight
 from .validators import MemberCreate, MemberUpdate, AttendanceCreate
 from .apps_script_client import AppsScriptClient
+from .attendance_store import AttendanceStore, absence_streaks
+from .weekly_rollup import WeeklyRollup
+from .row_index import SheetRowIndex, appended_row, data_version
+from .snapshot_cache import load_snapshot, save_snapshot, clear_snapshots
+from .delta_sync import sync_tail, tail_ranges, merge_tail, is_frozen, row_records
+from .frames import normalize_members, normalize_departments, normalize_groups, normalize_attendance
 
 # 상수
 SHEET_ID = '1cDfZiWbbpV8Z9NwAauG3SAriarJ1HL9xXMkZMJhC5Jo'
 
+# 이모지/CSS 클래스 매핑 (부서명 기반) - 부서별 출석 현황
+DEPT_STYLES = {
+    '장년부': {'emoji': '👨‍👩‍👧', 'css_class': 'adults'},
+    '청년부': {'emoji': '🎓', 'css_class': 'youth'},
+    '청소년부': {'emoji': '🎒', 'css_class': 'teens'},
+    '어린이부': {'emoji': '🧒', 'css_class': 'children'},
+}
+# 부서 카드용 스타일
+DEPT_CARD_STYLES = {
+    '장년부': {'emoji': '👴', 'css_class': 'adults'},
+    '청년부': {'emoji': '👨', 'css_class': 'youth'},
+    '청소년부': {'emoji': '👦', 'css_class': 'teens'},
+    '어린이부': {'emoji': '👧', 'css_class': 'children'},
+}
+DEPT_DEFAULT_STYLE = {'emoji': '👥', 'css_class': 'default'}
+
+# 이모지/CSS 클래스 매핑 (목장명 기반)
+MOKJANG_STYLES = {
+    '네팔 목장': {'emoji': '🇳🇵', 'css_class': 'nepal'},
+    '러시아 목장': {'emoji': '🇷🇺', 'css_class': 'russia'},
+    '필리핀 목장': {'emoji': '🇵🇭', 'css_class': 'philippines'},
+    '태국 목장': {'emoji': '🇹🇭', 'css_class': 'thailand'},
+    '베냉 목장': {'emoji': '🇧🇯', 'css_class': 'benin'},
+    '콩고 목장': {'emoji': '🇨🇩', 'css_class': 'congo'},
+    '칠레 목장': {'emoji': '🇨🇱', 'css_class': 'chile'},
+    '철원 목장': {'emoji': '🏔️', 'css_class': 'cheorwon'},
+}
+MOKJANG_DEFAULT_STYLE = {'emoji': '🏠', 'css_class': 'default'}
+
+# 출석 시트 헤더
+ATTENDANCE_HEADERS = ['attend_id', 'member_id', 'attend_date', 'attend_type', 'year', 'week_no']
+
+# 부서명 → 스택 차트 키 (CSS 클래스)
+DEPT_CHART_KEYS = {
+    '장년부': 'adults',
+    '청년부': 'youth',
+    '청소년부': 'teens',
+    '어린이부': 'children'
+}
+
 
 # ============================================================
 # 전역 캐시 함수 (API 429 에러 방지)
 # ============================================================
 
-def _get_gspread_client():
-    """gspread 클라이언트 생성 (캐시용 내부 함수)"""
-    scope = [
-        'https://spreadsheets.google.com/feeds',
-        'https://www.googleapis.com/auth/drive'
-    ]
+SCOPE = [
+    'https://spreadsheets.google.com/feeds',
+    'https://www.googleapis.com/auth/drive'
+]
+
+
+def _load_credentials():
+    """서비스 계정 인증 정보 (환경변수 → Streamlit Secrets → 로컬 credentials.json 순)"""
     creds = None
 
     # 1순위: 환경변수 (Railway 배포용)
@@ -32,16 +88,16 @@ def _get_gspread_client():
     if gcp_json:
         try:
             creds_dict = json.loads(gcp_json)
-            creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-        except Exception:
-            pass
+            creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, SCOPE)
+        except Exception as e:
+            print(f"환경변수 인증 실패: {e}")
 
     # 2순위: Streamlit Secrets
     if not creds:
         try:
             if hasattr(st, "secrets") and "gcp_service_account" in st.secrets:
                 creds_dict = dict(st.secrets["gcp_service_account"])
-                creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
+                creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, SCOPE)
         except Exception:
             pass
 
@@ -58,139 +114,395 @@ def _get_gspread_client():
 
         for path in possible_paths:
             if os.path.exists(path):
-                creds = ServiceAccountCredentials.from_json_keyfile_name(path, scope)
+                creds = ServiceAccountCredentials.from_json_keyfile_name(path, SCOPE)
                 break
 
     if not creds:
-        raise Exception("인증 정보를 찾을 수 없습니다.")
+        raise Exception("인증 정보를 찾을 수 없습니다. 환경변수 GCP_CREDENTIALS_JSON을 설정하세요.")
 
-    return gspread.authorize(creds)
+    return creds
 
 
-@st.cache_data(ttl=86400, show_spinner=False)  # 24시간 캐시 (어드민 수동 새로고침 시 클리어)
-def _cached_get_sheet_data(sheet_name: str) -> List[Dict]:
-    """시트 데이터 캐시 (24시간 TTL) - Members, Departments, Groups"""
+@st.cache_resource(show_spinner=False)  # 프로세스 전체 공유 (실패 시 캐시되지 않음)
+def _get_sheets_pool() -> SheetsPool:
+    """
+    공용 gspread 연결 (인증 1회 + open_by_key 1회, 모든 요청은 스케줄러 경유)
+
+    SHEETS_BACKEND=emulator면 실제 시트 대신 로컬 에뮬레이터 사용
+    (오프라인 벤치마크/부하 테스트용, 설정은 utils.sheets_emulator 환경변수 참고 -
+     환경변수로 만든 에뮬레이터도 호출마다 같은 스케줄러의 토큰 버킷/재시도/계측을 거침)
+    """
+    if os.environ.get('SHEETS_BACKEND', 'gspread') == 'emulator':
+        return SheetsPool(sheets_emulator.client_from_env(), SHEET_ID)
+    return SheetsPool(gspread.authorize(_load_credentials(), http_client=SchedulingHTTPClient), SHEET_ID)
+
+
+def _get_worksheet(sheet_name: str):
+    """공용 연결의 시트 핸들"""
+    return _get_sheets_pool().worksheet(sheet_name)
+
+
+@instrumentation.cached('modified_time', st.cache_data(ttl=60, show_spinner=False))  # 콜드 스타트 시 시트마다 조회하지 않도록 짧게 캐시
+def _cached_modified_time() -> str:
+    """스프레드시트 마지막 수정 시각 캐시 (조회 실패는 예외로 올려 캐시하지 않음)"""
+    return _get_sheets_pool().spreadsheet.get_lastUpdateTime()
+
+
+def _spreadsheet_modified_time() -> Optional[str]:
+    """스프레드시트 마지막 수정 시각 (Drive modifiedTime, 스냅샷 유효성 확인용). 조회 실패 시 None"""
+    try:
+        return _cached_modified_time()
+    except Exception as e:
+        print(f"Spreadsheet modified time error: {e}")
+        return None
+
+
+def _read_all_records(sheet) -> List[Dict]:
+    """시트 전체 레코드 내려받기 (get_all_records, 중복 헤더 시 직접 파싱)"""
+    try:
+        return sheet.get_all_records()
+    except gspread.exceptions.APIError:
+        raise
+    except Exception:
+        # 중복 헤더 문제 발생 시 직접 파싱
+        all_values = sheet.get_all_values()
+        if len(all_values) < 2:
+            return []
+        headers = all_values[0]
+        clean_headers = []
+        for h in headers:
+            if h and h.strip():
+                clean_headers.append(h.strip())
+            else:
+                break
+        data = []
+        for row in all_values[1:]:
+            if row and row[0]:
+                data.append(dict(zip(clean_headers, row[:len(clean_headers)])))
+        return data
+
+
+# 프리페치로 미리 받아 둔 레코드 (캐시 함수가 처음 실행될 때 네트워크 대신 사용)
+_staged_records: Dict[str, List[Dict]] = {}
+# 캐시 함수 본문이 실행된 시트 (캐시가 이미 채워졌으면 프리페치하지 않음)
+_loaded_sheets = set()
+_staging_lock = threading.Lock()
+
+# 동시 캐시 미스 합치기 - (시트, 캐시 세대)별 진행 중인 조회 1회를 모든 세션이 공유
+_sheet_fetches = SingleFlight()
+_cache_epoch = 0  # clear_sheets_cache()마다 증가 (초기화 전에 시작된 조회에 합류하지 않도록)
+
+
+def _fetch_key(sheet_name: str):
+    """시트 조회 합치기 키 - 시트 이름 + 캐시 세대 + 시트 인덱스 세대"""
+    return sheet_name, _cache_epoch, _row_index_generations.get(sheet_name, 0)
+
+
+def _sheet_year(sheet_name: str) -> Optional[int]:
+    """출석 시트 연도 (출석 시트가 아니면 None)"""
+    return int(sheet_name.split('_')[1]) if sheet_name.startswith('Attendance_') else None
+
+
+def _snapshot_current(sheet_name: str, meta: Dict[str, str], modified_time: Optional[str]) -> bool:
+    """스냅샷을 조회 없이 그대로 써도 되는지 (스프레드시트 미수정 또는 확정된 지난 연도)"""
+    if modified_time and meta.get('modified_time') == modified_time:
+        return True
+    year = _sheet_year(sheet_name)
+    return bool(year) and is_frozen(year, meta.get('synced_at', ''))
+
+
+def _save_fetched(sheet_name: str, records: List[Dict], modified_time: Optional[str]):
+    """내려받은 레코드를 스냅샷으로 저장"""
+    save_snapshot(sheet_name, records, modified_time=modified_time, synced_at=pd.Timestamp.now().strftime('%Y-%m-%d'))
+
+
+def _fetch_sheet_records(sheet_name: str) -> List[Dict]:
+    """시트 전체 레코드 조회 - 같은 시트를 동시에 조회하면 한 번만 내려받아 공유"""
+    return _sheet_fetches.do(_fetch_key(sheet_name), lambda: _load_sheet_records(sheet_name))
+
+
+def _load_sheet_records(sheet_name: str) -> List[Dict]:
+    """
+    시트 전체 레코드 조회 (프리페치 결과 → 디스크 스냅샷 + 증분 동기화, 조회 실패 시 예외)
+    - 스냅샷 저장 후 스프레드시트가 바뀌지 않았으면 내려받지 않음 (재시작 후 콜드 스타트)
+    - 지난 연도 출석은 해가 바뀐 뒤 한 번 동기화하면 고정
+    - 올해 출석은 최근 몇 주 + 새로 추가된 행만 조회 (앞부분이 바뀐 경우만 전체 재조회)
+    """
+    start = time.perf_counter()
+    with _staging_lock:
+        _loaded_sheets.add(sheet_name)
+        staged = _staged_records.pop(sheet_name, None)
+    if staged is not None:
+        return _loaded(sheet_name, 'staged', start, staged)
+
+    modified_time = _spreadsheet_modified_time()
+    year = _sheet_year(sheet_name)
+
+    snapshot = load_snapshot(sheet_name)
+    if snapshot and _snapshot_current(sheet_name, snapshot[1], modified_time):
+        return _loaded(sheet_name, 'snapshot', start, snapshot[0])
+
+    # 조회 실패는 그대로 올림 (빈 목록/옛 스냅샷을 캐시하면 집계가 틀리고 쓰기 행 번호도 어긋남)
     try:
-        client = _get_gspread_client()
-        spreadsheet = client.open_by_key(SHEET_ID)
-        sheet = spreadsheet.worksheet(sheet_name)
+        sheet = _get_worksheet(sheet_name)
+    except gspread.exceptions.WorksheetNotFound:
+        # 아직 만들지 않은 시트 (새해 첫 저장 전 Attendance_{year} 등) - 빈 시트로 캐시, 첫 쓰기 때 생성
+        return _loaded(sheet_name, 'missing', start, [])
+    synced = sync_tail(sheet, snapshot[0]) if snapshot and year else None
+    records = synced if synced is not None else _read_all_records(sheet)
 
+    _save_fetched(sheet_name, records, modified_time)
+    return _loaded(sheet_name, 'delta' if synced is not None else 'full', start, records)
+
+
+def _loaded(sheet_name: str, source: str, start: float, records: List[Dict]) -> List[Dict]:
+    """시트 로드 경로(staged/snapshot/delta/full/missing)와 시간 기록 후 레코드 반환"""
+    instrumentation.recorder.record('load', sheet_name, time.perf_counter() - start, source=source, rows=len(records))
+    instrumentation.recorder.count(f'load_{source}')
+    return records
+
+
+def _values_records(values: List[List]) -> Optional[List[Dict]]:
+    """시트 전체 값(헤더 + 행) → get_all_records()와 같은 레코드 (헤더 중복 시 None)"""
+    if not values:
+        return []
+    headers = list(values[0])
+    if len(set(headers)) != len(headers):
+        return None
+    return row_records(headers, values[1:])
+
+
+def prefetch_sheets(sheet_names: Iterable[str]):
+    """
+    아직 캐시에 없는 시트를 한 번의 values_batch_get으로 미리 조회
+
+    콜드 스타트 시 성도/부서/목장/출석 캐시 함수가 차례로 시트를 하나씩 내려받지 않도록,
+    네트워크가 필요한 시트(스냅샷이 없거나 오래된 시트)의 범위를 모아 요청 1회로 받은 뒤
+    각 캐시 함수가 처음 실행될 때 그 결과를 사용합니다.
+    - 스냅샷이 있는 출석 시트는 증분 동기화 범위(앞부분 비교 열 + 최근 구간)만 요청
+    - 조회 실패/앞부분 불일치/중복 헤더 시트는 기존 경로(시트별 조회)로 처리
+
+    Args:
+        sheet_names: 시트 이름 목록 (예: ['Members', '_Departments', '_Groups', 'Attendance_2025'])
+    """
+    with _staging_lock:
+        pending = [n for n in dict.fromkeys(sheet_names) if n not in _loaded_sheets and n not in _staged_records]
+    # 이미 다른 세션이 조회 중인 시트는 그 결과를 기다리도록 제외
+    pending = [n for n in pending if not _sheet_fetches.in_flight(_fetch_key(n))]
+    if pending:
+        _sheet_fetches.do(('prefetch', _cache_epoch, tuple(sorted(pending))), lambda: _prefetch(pending))
+
+
+def _prefetch(pending: List[str]):
+    """prefetch_sheets() 본체 - 네트워크가 필요한 시트 범위를 values_batch_get 1회로 조회해 대기열에 저장"""
+    modified_time = _spreadsheet_modified_time()
+    plans = []  # (시트 이름, 스냅샷 레코드 또는 None, 비교 열, 범위 목록)
+    staged = {}
+    for name in pending:
+        snapshot = load_snapshot(name)
+        if snapshot and _snapshot_current(name, snapshot[1], modified_time):
+            continue
         try:
-            return sheet.get_all_records()
-        except Exception:
-            # 중복 헤더 문제 발생 시 직접 파싱
-            all_values = sheet.get_all_values()
-            if len(all_values) < 2:
-                return []
-            headers = all_values[0]
-            clean_headers = []
-            for h in headers:
-                if h and h.strip():
-                    clean_headers.append(h.strip())
-                else:
-                    break
-            data = []
-            for row in all_values[1:]:
-                if row and row[0]:
-                    data.append(dict(zip(clean_headers, row[:len(clean_headers)])))
-            return data
+            _get_worksheet(name)
+        except gspread.exceptions.WorksheetNotFound:
+            # 없는 시트는 빈 시트로 (범위에 넣으면 values_batch_get 전체가 실패)
+            staged[name] = []
+            continue
+        except Exception as e:
+            print(f"Sheet prefetch error: {e}")
+            return
+        if snapshot and snapshot[0] and _sheet_year(name):
+            columns, ranges = tail_ranges(snapshot[0])
+            plans.append((name, snapshot[0], columns, [f"'{name}'!{r}" for r in ranges]))
+        else:
+            plans.append((name, None, [], [f"'{name}'"]))
+
+    try:
+        response = _get_sheets_pool().spreadsheet.values_batch_get(
+            [r for _, _, _, ranges in plans for r in ranges]
+        ) if plans else {}
     except Exception as e:
-        print(f"Sheet data fetch error ({sheet_name}): {e}")
-        return []
+        print(f"Sheet prefetch error: {e}")
+        plans = []
+        response = {}
+
+    value_ranges = iter(response.get('valueRanges', []))
+    for name, snapshot_records, columns, ranges in plans:
+        values = [next(value_ranges, {}).get('values', []) for _ in ranges]
+        if snapshot_records is not None:
+            records = merge_tail(snapshot_records, columns, values)
+        else:
+            records = _values_records(values[0])
+        if records is not None:
+            _save_fetched(name, records, modified_time)
+            staged[name] = records
+
+    with _staging_lock:
+        _staged_records.update({n: r for n, r in staged.items() if n not in _loaded_sheets})
 
 
-def clear_sheets_cache():
-    """시트 캐시 수동 삭제"""
+@instrumentation.cached('sheet_data', st.cache_data(ttl=86400, show_spinner=False))  # 24시간 캐시 (어드민 수동 새로고침 시 클리어)
+def _cached_get_sheet_data(sheet_name: str) -> List[Dict]:
+    """시트 데이터 캐시 (24시간 TTL) - Departments, Groups (읽기 전용 시트)"""
+    return _fetch_sheet_records(sheet_name)
+
+
+# 시트별 행 인덱스 세대 (쓰기 실패 등으로 한 시트만 다시 읽어야 할 때 증가)
+_row_index_generations: Dict[str, int] = {}
+
+
+def clear_sheets_cache(full: bool = False):
+    """
+    시트 캐시 수동 삭제 (시트를 직접 편집한 경우)
+
+    Args:
+        full: True면 디스크 스냅샷까지 삭제 (지난 연도 출석 포함 전체 재조회).
+              False면 다음 조회 시 스냅샷 기준 증분 동기화
+    """
+    global _cache_epoch
+    _cache_epoch += 1
+    _cached_modified_time.clear()
+    with _staging_lock:
+        _loaded_sheets.clear()
+        _staged_records.clear()
+    if full:
+        clear_snapshots()
     _cached_get_sheet_data.clear()
-    _cached_get_attendance_data.clear()
+    _cached_get_row_index.clear()
+    _cached_get_members_frame.clear()
+    _cached_get_attendance_frame.clear()
+    _cached_get_attendance_store.clear()
+    _cached_get_weekly_rollup.clear()
+
+
+@instrumentation.cached('row_index', st.cache_resource(ttl=86400, max_entries=32, show_spinner=False))  # 쓰기 시 제자리 갱신하므로 복사 없이 공유
+def _cached_get_row_index(sheet_name: str, generation: int = 0) -> SheetRowIndex:
+    """
+    쓰기 반영 캐시 (24시간 TTL) - Members / Attendance_{year} 레코드 + 행 인덱스
+
+    이 앱의 쓰기는 캐시를 비우지 않고 인덱스에 바로 반영하므로,
+    출석 한 건 저장으로 다른 연도/성도 데이터를 다시 내려받지 않습니다.
+    """
+    records = _fetch_sheet_records(sheet_name)
+    if sheet_name.startswith('Attendance_'):
+        return SheetRowIndex(records, ('member_id', 'attend_date'), ATTENDANCE_HEADERS)
+    return SheetRowIndex(records, ('member_id',))
+
+
+def _get_row_index(sheet_name: str) -> SheetRowIndex:
+    """시트의 현재 행 인덱스"""
+    return _cached_get_row_index(sheet_name, _row_index_generations.get(sheet_name, 0))
+
+
+def _drop_row_index(sheet_name: str):
+    """시트 하나의 행 인덱스만 폐기 (다음 조회 시 다시 읽음)"""
+    _row_index_generations[sheet_name] = _row_index_generations.get(sheet_name, 0) + 1
+    with _staging_lock:
+        _loaded_sheets.discard(sheet_name)
 
 
-@st.cache_data(ttl=86400, show_spinner=False)  # 24시간 캐시 (어드민 수동 새로고침 시 클리어)
 def _cached_get_attendance_data(year: int) -> List[Dict]:
-    """출석 시트 데이터 캐시 (24시간 TTL) - 전체 연도 출석 데이터"""
-    sheet_name = f'Attendance_{year}'
-    try:
-        client = _get_gspread_client()
-        spreadsheet = client.open_by_key(SHEET_ID)
-        sheet = spreadsheet.worksheet(sheet_name)
-        return sheet.get_all_records()
-    except Exception as e:
-        print(f"Attendance data fetch error ({sheet_name}): {e}")
-        return []
+    """연도별 출석 레코드 (쓰기 반영 캐시에서 복사)"""
+    return _get_row_index(f'Attendance_{year}').records()
 
 
-class SheetsAPI:
-    def __init__(self):
-        self.scope = [
-            'https://spreadsheets.google.com/feeds',
-            'https://www.googleapis.com/auth/drive'
-        ]
-        self.sheet_id = SHEET_ID
-        self.script_url = os.environ.get('APPS_SCRIPT_URL', '')
+def _sheet_cell(value) -> Dict:
+    """batch_update(updateCells/appendCells)용 셀 값"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {'userEnteredValue': {'numberValue': value}}
+    return {'userEnteredValue': {'stringValue': str(value)}}
 
-        creds = None
 
-        # 1순위: 환경변수 (Railway 배포용)
-        gcp_json = os.environ.get('GCP_CREDENTIALS_JSON')
-        if gcp_json:
-            try:
-                creds_dict = json.loads(gcp_json)
-                creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, self.scope)
-            except Exception as e:
-                print(f"환경변수 인증 실패: {e}")
+@instrumentation.cached('attendance_frame', st.cache_resource(ttl=86400, max_entries=32, show_spinner=False))  # 읽기 전용 프레임이라 복사 없이 공유
+def _cached_get_attendance_frame(year: int, version: int) -> pd.DataFrame:
+    """연도별 정규화 출석 프레임 캐시 - 출석 데이터 버전별"""
+    return normalize_attendance(_cached_get_attendance_data(year))
 
-        # 2순위: Streamlit Secrets
-        if not creds:
-            try:
-                if hasattr(st, "secrets") and "gcp_service_account" in st.secrets:
-                    creds_dict = dict(st.secrets["gcp_service_account"])
-                    creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, self.scope)
-                    self.script_url = st.secrets.get("apps_script_url", self.script_url)
-            except Exception:
-                pass
 
-        # 3순위: 로컬 credentials.json 파일
-        if not creds:
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-            project_dir = os.path.dirname(base_dir)
-            root_dir = os.path.dirname(project_dir)
+@instrumentation.cached('members_frame', st.cache_resource(ttl=86400, max_entries=8, show_spinner=False))  # 읽기 전용 프레임이라 복사 없이 공유
+def _cached_get_members_frame(version: int) -> pd.DataFrame:
+    """정규화 성도 프레임 캐시 - 성도 데이터 버전별"""
+    return normalize_members(_get_row_index('Members').records())
 
-            possible_paths = [
-                os.path.join(project_dir, 'credentials', 'credentials.json'),
-                os.path.join(root_dir, 'credentials', 'credentials.json')
-            ]
 
-            for path in possible_paths:
-                if os.path.exists(path):
-                    creds = ServiceAccountCredentials.from_json_keyfile_name(path, self.scope)
-                    break
+@instrumentation.cached('attendance_store', st.cache_resource(ttl=86400, max_entries=32, show_spinner=False))  # 읽기 전용 구조라 복사 없이 공유
+def _cached_get_attendance_store(year: int, version: int) -> AttendanceStore:
+    """연도별 출석 비트맵 저장소 캐시 (성도 × 주일) - 출석 데이터 버전별"""
+    return AttendanceStore.from_frame(_cached_get_attendance_frame(year, version))
+
 
-        if not creds:
-            raise Exception("인증 정보를 찾을 수 없습니다. 환경변수 GCP_CREDENTIALS_JSON을 설정하세요.")
+@instrumentation.cached('weekly_rollup', st.cache_resource(ttl=86400, max_entries=16, show_spinner=False))  # 읽기 전용 집계라 복사 없이 공유
+def _cached_get_weekly_rollup(year: int, members_version: int, attendance_version: int) -> WeeklyRollup:
+    """연도별 주간 출석 집계 캐시 - 성도/출석 데이터 버전별"""
+    return WeeklyRollup.build(
+        _cached_get_members_frame(members_version),
+        _cached_get_attendance_store(year, attendance_version)
+    )
+
+
+@contextmanager
+def _editing_rows(sheet_name: str):
+    """행 인덱스 잠금 후 편집 - 쓰기 실패 시 시트와 어긋났을 수 있으므로 해당 시트 인덱스 폐기"""
+    index = _get_row_index(sheet_name)
+    with index.lock:
+        try:
+            yield index
+        except Exception:
+            _drop_row_index(sheet_name)
+            _get_sheets_pool().forget(sheet_name)
+            raise
 
-        self.client = gspread.authorize(creds)
-        self.spreadsheet = self.client.open_by_key(self.sheet_id)
+        # 스냅샷도 반영 (수정 시각은 모르므로 비워 두고, 다음 시작 때 증분 동기화로 확인)
+        save_snapshot(sheet_name, index.records(), synced_at=pd.Timestamp.now().strftime('%Y-%m-%d'))
+
+
+@instrumentation.instrument_methods  # 공개 메서드 호출 시간 기록 (설정 > 진단)
+class SheetsAPI:
+    def __init__(self):
+        self.scope = SCOPE
+        self.sheet_id = SHEET_ID
+        self.script_url = os.environ.get('APPS_SCRIPT_URL', '')
+        if not self.script_url:
+            try:
+                if hasattr(st, "secrets") and "apps_script_url" in st.secrets:
+                    self.script_url = st.secrets["apps_script_url"]
+            except Exception:
+                pass
+
+        # 공용 연결 사용 (세션/페이지마다 인증 + 메타데이터 조회 반복 방지)
+        pool = _get_sheets_pool()
+        self.client = pool.client
+        self.spreadsheet = pool.spreadsheet
         self.apps_script = AppsScriptClient(self.script_url)
     
     def get_sheet(self, name: str):
-        """시트 가져오기"""
-        return self.spreadsheet.worksheet(name)
+        """시트 가져오기 (공용 핸들 캐시)"""
+        return _get_worksheet(name)
+
+    def data_version(self) -> int:
+        """
+        성도/출석 데이터 버전 (쓰기 반영 캐시가 생성/변경될 때마다 증가)
+        페이지/대시보드 캐시 함수의 인자로 넘기면 데이터가 바뀔 때만 다시 계산됩니다.
+        """
+        return data_version()
         
     # ===== Members =====
     
     def get_members(self, filters: Optional[Dict] = None) -> pd.DataFrame:
-        """성도 목록 조회 (5분 캐시)"""
-        data = _cached_get_sheet_data('Members')
-        df = pd.DataFrame(data)
+        """
+        성도 목록 조회 (쓰기 반영 캐시)
+        - dept_id/group_id/status는 문자열 카테고리 (필터 값은 문자열로 비교)
+        """
+        df = _cached_get_members_frame(_get_row_index('Members').version)
 
         if df.empty:
-            return df
+            return df.copy()
 
         if filters:
             if filters.get('dept_id'):
-                df = df[df['dept_id'] == filters['dept_id']]
+                df = df[df['dept_id'] == str(filters['dept_id'])]
             if filters.get('group_id'):
-                df = df[df['group_id'] == filters['group_id']]
+                df = df[df['group_id'] == str(filters['group_id'])]
             if filters.get('status'):
                 df = df[df['status'] == filters['status']]
             if filters.get('member_type'):
@@ -202,7 +514,8 @@ class SheetsAPI:
             if filters.get('search'):
                 df = df[df['name'].str.contains(filters['search'], na=False)]
 
-        return df
+        # 캐시 프레임은 공유되므로 복사본 반환
+        return df.copy()
     
     def get_member_by_id(self, member_id: str) -> Optional[Dict]:
         """성도 상세 조회"""
@@ -221,7 +534,6 @@ class SheetsAPI:
         member_id = self.apps_script.generate_member_id()
         
         sheet = self.get_sheet('Members')
-        headers = sheet.row_values(1)
         
         # 데이터 준비
         member_data = data.dict()
@@ -229,9 +541,14 @@ class SheetsAPI:
         member_data['created_at'] = pd.Timestamp.now().strftime('%Y-%m-%d')
         member_data['updated_at'] = pd.Timestamp.now().strftime('%Y-%m-%d')
         
-        # 행 추가
-        row = [member_data.get(col, '') for col in headers]
-        sheet.append_row(row)
+        with _editing_rows('Members') as index:
+            headers = index.headers or sheet.row_values(1)
+
+            # 행 추가 (행 인덱스에도 반영)
+            row = [member_data.get(col, '') for col in headers]
+            response = sheet.append_row(row)
+            if not index.append([dict(zip(headers, row))], appended_row(response)):
+                _drop_row_index('Members')
         
         return {'success': True, 'member_id': member_id}
     
@@ -239,22 +556,27 @@ class SheetsAPI:
         """성도 수정"""
         sheet = self.get_sheet('Members')
         
-        # member_id로 행 찾기
-        cell = sheet.find(member_id, in_column=1)
-        if not cell:
-            return {'success': False, 'error': 'Member not found'}
-        
-        row_num = cell.row
-        headers = sheet.row_values(1)
-        
-        # 변경된 필드만 업데이트
-        update_data = data.dict(exclude_unset=True)
-        update_data['updated_at'] = pd.Timestamp.now().strftime('%Y-%m-%d')
-        
-        for key, value in update_data.items():
-            if key in headers:
-                col_num = headers.index(key) + 1
-                sheet.update_cell(row_num, col_num, value)
+        with _editing_rows('Members') as index:
+            # member_id로 행 찾기 (행 인덱스, API 호출 없음)
+            row_num = index.row_of(str(member_id))
+            if not row_num:
+                return {'success': False, 'error': 'Member not found'}
+
+            headers = index.headers
+
+            # 변경된 필드만 업데이트 (한 번의 batch_update)
+            update_data = data.dict(exclude_unset=True)
+            update_data['updated_at'] = pd.Timestamp.now().strftime('%Y-%m-%d')
+            update_data = {k: v for k, v in update_data.items() if k in headers}
+
+            sheet.batch_update(
+                [
+                    {'range': gspread.utils.rowcol_to_a1(row_num, headers.index(key) + 1), 'values': [[value]]}
+                    for key, value in update_data.items()
+                ],
+                value_input_option='USER_ENTERED'
+            )
+            index.update(row_num, update_data)
         
         return {'success': True}
     
@@ -267,86 +589,214 @@ class SheetsAPI:
         member_ids: Optional[List[str]] = None,
         date: Optional[str] = None
     ) -> pd.DataFrame:
-        """출석 조회 (5분 캐시 활용 - API 429 에러 방지)"""
-        # 캐시된 데이터 사용
-        data = _cached_get_attendance_data(year)
-        df = pd.DataFrame(data)
+        """
+        출석 조회 (쓰기 반영 캐시 - API 429 에러 방지)
+        - 정규화 프레임: present(bool), attend_date(datetime64), week_no(int8), member_id/attend_type 카테고리
+        """
+        df = _cached_get_attendance_frame(year, _get_row_index(f'Attendance_{year}').version)
 
         if df.empty:
-            return df
+            return df.copy()
 
         if week_no:
             df = df[df['week_no'] == week_no]
         if member_ids:
-            df = df[df['member_id'].isin(member_ids)]
+            df = df[df['member_id'].isin([str(m) for m in member_ids])]
         if date:
-            # 문자열 비교 (YYYY-MM-DD)
-            df = df[df['attend_date'] == date]
+            df = df[df['attend_date'] == pd.Timestamp(date)]
+
+        # 캐시 프레임은 공유되므로 복사본 반환
+        return df.copy()
+
+    def get_attendance_store(self, year: int) -> AttendanceStore:
+        """연도별 출석 비트맵 저장소 (성도 × 주일)"""
+        return _cached_get_attendance_store(year, _get_row_index(f'Attendance_{year}').version)
+
+    def get_weekly_rollup(self, year: int) -> WeeklyRollup:
+        """연도별 주간 출석 집계 ((상태, 부서, 목장) × 주일 출석 인원 + 성도 수)"""
+        return _cached_get_weekly_rollup(
+            year,
+            _get_row_index('Members').version,
+            _get_row_index(f'Attendance_{year}').version
+        )
+
+    def get_weekly_counts(self, dates: List[str], by: str = 'dept_id', status: Optional[str] = None) -> pd.DataFrame:
+        """
+        키별 주간 출석 인원 (주간 집계에서 조회, 연도 경계 처리)
+
+        Args:
+            dates: 날짜 목록 (YYYY-MM-DD, 열 순서)
+            by: 'dept_id' 또는 'group_id'
+            status: 성도 상태 필터 (예: '재적', None이면 전체)
+
+        Returns: DataFrame (index=키, columns=dates)
+        """
+        dates_by_year = {}
+        for d in dates:
+            dates_by_year.setdefault(int(d[:4]), []).append(d)
+
+        parts = [self.get_weekly_rollup(year).present(ds, by, status) for year, ds in dates_by_year.items()]
+        if not parts:
+            return pd.DataFrame(index=pd.Index([], name=by))
+        return pd.concat(parts, axis=1).fillna(0).astype('int64')[list(dates)]
+
+    def get_group_stats(self, date: str, status: Optional[str] = None) -> pd.DataFrame:
+        """
+        목장별 출석 통계 (기준일 한 주, 주간 집계에서 한 번에 조회)
+
+        Args:
+            date: 기준 날짜 (YYYY-MM-DD)
+            status: 성도 상태 필터 (예: '출석', None이면 전체)
+
+        Returns: DataFrame (index=(dept_id, group_id) - 성도의 부서/목장 기준,
+                 columns=total, present, rate). 성도가 없는 목장은 빠짐
+        """
+        rollup = self.get_weekly_rollup(int(date[:4]))
+        keys = ['dept_id', 'group_id']
+        stats = pd.DataFrame({
+            'total': rollup.totals(keys, status),
+            'present': rollup.present([date], keys, status)[date],
+        }).fillna(0).astype('int64')
+        stats['rate'] = (stats['present'] / stats['total'] * 100).round(1)
+        return stats
+
+    def get_presence_matrix(self, member_ids: List[str], dates: List[str]) -> np.ndarray:
+        """
+        성도 × 날짜 출석 행렬 (연도 경계 처리)
+
+        Args:
+            member_ids: 성도 ID 목록 (행 순서)
+            dates: 날짜 목록 (YYYY-MM-DD, 열 순서)
+
+        Returns: bool ndarray, shape=(len(member_ids), len(dates))
+        """
+        matrix = np.zeros((len(member_ids), len(dates)), dtype=bool)
+
+        cols_by_year = {}
+        for col, d in enumerate(dates):
+            cols_by_year.setdefault(int(d[:4]), []).append(col)
+
+        for year, cols in cols_by_year.items():
+            store = self.get_attendance_store(year)
+            matrix[:, cols] = store.presence_matrix(member_ids, [dates[c] for c in cols])
+
+        return matrix
+
+    @staticmethod
+    def _group_counts(keys: np.ndarray, present: np.ndarray):
+        """키(부서/목장 ID)별 (재적 인원, 출석 인원) 집계"""
+        grouped = pd.DataFrame({'key': keys, 'present': present}).groupby('key')['present']
+        return grouped.size().to_dict(), grouped.sum().to_dict()
+
+    def _get_attendance_sheet(self, year: int):
+        """연도별 출석 시트 (없으면 생성)"""
+        sheet_name = f'Attendance_{year}'
+        try:
+            return self.get_sheet(sheet_name)
+        except gspread.exceptions.WorksheetNotFound:
+            # 시트 없으면 생성 (Row count 10000, Col count 10)
+            sheet = _get_sheets_pool().add_worksheet(sheet_name, 10000, 10)
+            sheet.append_row(ATTENDANCE_HEADERS)
+            return sheet
+
+    @staticmethod
+    def _delete_row_requests(sheet, row_nums: List[int]) -> List[Dict]:
+        """행 삭제 batch_update 요청 (아래 행부터 삭제해 번호 밀림 방지)"""
+        return [
+            {
+                'deleteDimension': {
+                    'range': {
+                        'sheetId': sheet.id,
+                        'dimension': 'ROWS',
+                        'startIndex': row_num - 1,
+                        'endIndex': row_num
+                    }
+                }
+            }
+            for row_num in sorted(set(row_nums), reverse=True)
+        ]
+
+    def _delete_sheet_rows(self, sheet, row_nums: List[int]):
+        """여러 행을 한 번의 batch_update로 삭제"""
+        if row_nums:
+            self.spreadsheet.batch_update({'requests': self._delete_row_requests(sheet, row_nums)})
 
-        return df
-    
     def save_attendance(self, records: List[AttendanceCreate]) -> Dict:
         """
-        출석 저장 (Upsert 패턴)
-        - 기존 데이터 삭제 후 새 데이터 삽입
+        출석 저장 (Upsert 패턴, 일괄 처리)
+        - 같은 주차의 기존 행은 제자리 수정, 없는 성도는 추가, 중복 행은 삭제
+        - 기존 행 위치는 행 인덱스로 조회 → API 호출: 수정/삭제/추가 각 최대 1회
+
+        Returns:
+            {'success': True, 'inserted': n, 'updated': n, 'unchanged': n, 'deleted': n,
+             'results': [{'member_id': 'M001', 'action': 'inserted' | 'updated' | 'unchanged'}, ...]}
         """
         if not records:
             return {'success': False, 'error': 'No records provided'}
-        
+
         year = records[0].year
         week_no = records[0].week_no
-        member_ids = [r.member_id for r in records]
-        
-        sheet_name = f'Attendance_{year}'
-        
-        try:
-            sheet = self.get_sheet(sheet_name)
-        except:
-            # 시트 없으면 생성
-            # add_worksheet might fail if not authorized scope, but usually typical scope is fine.
-            # Row count 10000, Col count 10
-            sheet = self.spreadsheet.add_worksheet(sheet_name, 10000, 10)
-            headers = ['attend_id', 'member_id', 'attend_date', 
-                      'attend_type', 'year', 'week_no']
-            sheet.append_row(headers)
-        
-        # 1. 기존 데이터 조회
-        all_data = sheet.get_all_records()
-        
-        # 2. 삭제할 행 찾기
-        rows_to_delete = []
-        for i, row in enumerate(all_data):
-            # Check conditions
-            if (row.get('week_no') == week_no and 
-                row.get('member_id') in member_ids):
-                # row index is i + 2 because header is row 1
-                rows_to_delete.append(i + 2)
-        
-        # 3. 역순으로 삭제
-        deleted_count = 0
-        for row_num in sorted(rows_to_delete, reverse=True):
-            sheet.delete_rows(row_num)
-            deleted_count += 1
-        
-        # 4. 새 데이터 삽입
-        inserted_count = 0
+
+        sheet = self._get_attendance_sheet(year)
+
+        # 1. 새 행 준비 (같은 성도가 여러 번 오면 마지막 값 사용)
+        new_rows = {}
         for record in records:
-            attend_id = f"AT{year}_W{week_no:02d}_{record.member_id}"
-            row = [
-                attend_id,
+            new_rows[str(record.member_id)] = [
+                f"AT{year}_W{week_no:02d}_{record.member_id}",
                 record.member_id,
                 record.attend_date.strftime('%Y-%m-%d'),
                 record.attend_type.value,
                 year,
                 week_no
             ]
-            sheet.append_row(row)
-            inserted_count += 1
-        
+
+        with _editing_rows(sheet.title) as index:
+            # 2. 기존 행 위치 조회 (행 인덱스, API 호출 없음)
+            existing_rows = {}  # member_id → [(시트 행 번호, 레코드), ...]
+            for row_num, row in index.rows_where(week_no=week_no):
+                member_id = str(row.get('member_id', ''))
+                if member_id in new_rows:
+                    existing_rows.setdefault(member_id, []).append((row_num, row))
+
+            updates, appends, rows_to_delete, results = [], [], [], []
+            for member_id, row in new_rows.items():
+                matches = existing_rows.get(member_id, [])
+                if not matches:
+                    appends.append(row)
+                    results.append({'member_id': member_id, 'action': 'inserted'})
+                    continue
+
+                # 첫 행은 제자리 수정, 나머지 중복 행은 삭제 (변경 없는 행은 건너뜀)
+                row_num, current = matches[0]
+                rows_to_delete.extend(r for r, _ in matches[1:])
+                if [str(current.get(h, '')) for h in ATTENDANCE_HEADERS] == [str(v) for v in row]:
+                    results.append({'member_id': member_id, 'action': 'unchanged'})
+                else:
+                    updates.append((row_num, row))
+                    results.append({'member_id': member_id, 'action': 'updated'})
+
+            # 3. 일괄 반영 (수정 → 삭제 → 추가 순서로 행 번호 유지, 행 인덱스도 같은 순서로 갱신)
+            if updates:
+                sheet.batch_update([
+                    {'range': f'A{row_num}:F{row_num}', 'values': [row]} for row_num, row in updates
+                ])
+                for row_num, row in updates:
+                    index.update(row_num, dict(zip(ATTENDANCE_HEADERS, row)))
+            self._delete_sheet_rows(sheet, rows_to_delete)
+            index.delete(rows_to_delete)
+            if appends:
+                response = sheet.append_rows(appends)
+                if not index.append([dict(zip(ATTENDANCE_HEADERS, row)) for row in appends], appended_row(response)):
+                    _drop_row_index(sheet.title)
+
         return {
             'success': True,
-            'deleted': deleted_count,
-            'inserted': inserted_count
+            'inserted': len(appends),
+            'updated': len(updates),
+            'unchanged': len(results) - len(appends) - len(updates),
+            'deleted': len(rows_to_delete),
+            'results': results
         }
 
     def toggle_attendance(self, member_id: str, attend_date: str) -> Dict:
@@ -369,69 +819,152 @@ class SheetsAPI:
         # 주차 계산 (ISO week number)
         week_no = date_obj.isocalendar()[1]
 
-        sheet_name = f'Attendance_{year}'
+        sheet = self._get_attendance_sheet(year)
+
+        with _editing_rows(sheet.title) as index:
+            # 현재 출석 상태 조회 (행 인덱스, API 호출 없음)
+            existing_row = index.record((str(member_id), attend_date))
+            existing_row_num = index.row_of((str(member_id), attend_date))
+
+            if existing_row:
+                current_status = str(existing_row.get('attend_type', '0'))
+                if current_status in ('1', '2'):  # 출석/온라인 → 결석
+                    # 행 삭제 (결석은 레코드 없음으로 처리)
+                    sheet.delete_rows(existing_row_num)
+                    index.delete([existing_row_num])
+                    result = {'success': True, 'new_status': '0', 'action': 'deleted'}
+                else:  # 결석 → 출석
+                    # attend_type을 1로 업데이트
+                    sheet.update_cell(existing_row_num, 4, '1')  # attend_type 컬럼
+                    index.update(existing_row_num, {'attend_type': '1'})
+                    result = {'success': True, 'new_status': '1', 'action': 'updated'}
+            else:
+                # 레코드 없음 = 결석 → 출석으로 생성
+                attend_id = f"AT{year}_W{week_no:02d}_{member_id}"
+                new_row = [
+                    attend_id,
+                    member_id,
+                    attend_date,
+                    '1',  # 출석
+                    year,
+                    week_no
+                ]
+                response = sheet.append_row(new_row)
+                if not index.append([dict(zip(ATTENDANCE_HEADERS, new_row))], appended_row(response)):
+                    _drop_row_index(sheet.title)
+                result = {'success': True, 'new_status': '1', 'action': 'created'}
 
-        try:
-            sheet = self.get_sheet(sheet_name)
-        except:
-            # 시트 없으면 생성
-            sheet = self.spreadsheet.add_worksheet(sheet_name, 10000, 10)
-            headers = ['attend_id', 'member_id', 'attend_date',
-                      'attend_type', 'year', 'week_no']
-            sheet.append_row(headers)
-
-        # 현재 출석 상태 조회
-        all_data = sheet.get_all_records()
-        existing_row = None
-        existing_row_num = None
-
-        for i, row in enumerate(all_data):
-            if row.get('member_id') == member_id and row.get('attend_date') == attend_date:
-                existing_row = row
-                existing_row_num = i + 2  # 헤더가 1행
-                break
+        return result
 
-        if existing_row:
-            current_status = str(existing_row.get('attend_type', '0'))
-            if current_status in ('1', '2'):  # 출석/온라인 → 결석
-                # 행 삭제 (결석은 레코드 없음으로 처리)
-                sheet.delete_rows(existing_row_num)
-                # 캐시 클리어
-                _cached_get_attendance_data.clear()
-                return {'success': True, 'new_status': '0', 'action': 'deleted'}
-            else:  # 결석 → 출석
-                # attend_type을 1로 업데이트
-                sheet.update_cell(existing_row_num, 4, '1')  # attend_type 컬럼
-                _cached_get_attendance_data.clear()
-                return {'success': True, 'new_status': '1', 'action': 'updated'}
-        else:
-            # 레코드 없음 = 결석 → 출석으로 생성
-            attend_id = f"AT{year}_W{week_no:02d}_{member_id}"
-            new_row = [
-                attend_id,
-                member_id,
-                attend_date,
-                '1',  # 출석
-                year,
-                week_no
-            ]
-            sheet.append_row(new_row)
-            _cached_get_attendance_data.clear()
-            return {'success': True, 'new_status': '1', 'action': 'created'}
+    def apply_attendance_changes(self, changes: List[Dict]) -> Dict:
+        """
+        출석 변경 일괄 반영 (대시보드 출석 테이블 편집용)
+        - 연도별 시트당 spreadsheet.batch_update 1회 (수정/삭제, 행 위치는 행 인덱스로 조회)
+          + 새 출석이 있으면 append_rows 1회 (추가 위치가 인덱스와 다르면 인덱스 폐기)
+        - toggle_attendance와 같은 규칙: 출석은 attend_type '1' 행, 결석은 행 삭제
+
+        Args:
+            changes: [{'member_id': 'M001', 'date': 'YYYY-MM-DD', 'new_val': True/False}, ...]
+
+        Returns:
+            {'success': True, 'applied': 3, 'unchanged': 1,
+             'results': [{'member_id', 'date', 'new_status': '1'/'0',
+                          'action': 'created' | 'updated' | 'deleted' | 'unchanged'}, ...]}
+        """
+        from datetime import datetime
+
+        if not changes:
+            return {'success': True, 'applied': 0, 'unchanged': 0, 'results': []}
+
+        # 연도별 그룹 (같은 셀이 여러 번 오면 마지막 값 사용)
+        changes_by_year = {}
+        for change in changes:
+            key = (str(change['member_id']), change['date'])
+            changes_by_year.setdefault(int(change['date'][:4]), {})[key] = bool(change['new_val'])
+
+        results = []
+        for year, year_changes in changes_by_year.items():
+            sheet = self._get_attendance_sheet(year)
+            with _editing_rows(sheet.title) as index:
+                updates, rows_to_delete, appends = [], [], []
+                for (member_id, attend_date), new_val in year_changes.items():
+                    # 현재 상태는 행 인덱스로 조회 (API 호출 없음)
+                    row_num = index.row_of((member_id, attend_date))
+                    current = str((index.record((member_id, attend_date)) or {}).get('attend_type', '0'))
+                    is_present = current in ('1', '2')
+
+                    if new_val == is_present:
+                        action = 'unchanged'
+                    elif new_val and row_num:
+                        updates.append(row_num)
+                        action = 'updated'
+                    elif new_val:
+                        week_no = datetime.strptime(attend_date, '%Y-%m-%d').isocalendar()[1]
+                        appends.append([
+                            f"AT{year}_W{week_no:02d}_{member_id}",
+                            member_id,
+                            attend_date,
+                            '1',  # 출석
+                            year,
+                            week_no
+                        ])
+                        action = 'created'
+                    else:
+                        # 결석은 레코드 없음으로 처리
+                        rows_to_delete.append(row_num)
+                        action = 'deleted'
+
+                    results.append({
+                        'member_id': member_id,
+                        'date': attend_date,
+                        'new_status': '1' if new_val else '0',
+                        'action': action
+                    })
+
+                # 수정 → 삭제(아래 행부터) 요청을 한 번에 전송
+                requests = [
+                    {
+                        'updateCells': {
+                            'start': {'sheetId': sheet.id, 'rowIndex': row_num - 1, 'columnIndex': 3},
+                            'rows': [{'values': [_sheet_cell('1')]}],
+                            'fields': 'userEnteredValue'
+                        }
+                    }
+                    for row_num in updates
+                ]
+                requests += self._delete_row_requests(sheet, rows_to_delete)
+
+                if requests:
+                    self.spreadsheet.batch_update({'requests': requests})
+                for row_num in updates:
+                    index.update(row_num, {'attend_type': '1'})
+                index.delete(rows_to_delete)
+                # 추가는 append_rows로 따로 (appendCells 응답에는 추가 위치가 없어 인덱스와 맞는지 확인 불가)
+                if appends:
+                    response = sheet.append_rows(appends)
+                    if not index.append([dict(zip(ATTENDANCE_HEADERS, row)) for row in appends], appended_row(response)):
+                        _drop_row_index(sheet.title)
+
+        applied = sum(1 for r in results if r['action'] != 'unchanged')
+
+        return {
+            'success': True,
+            'applied': applied,
+            'unchanged': len(results) - applied,
+            'results': results
+        }
 
     # ===== 기타 =====
     
     def get_departments(self) -> pd.DataFrame:
         """부서 목록 (5분 캐시)"""
-        data = _cached_get_sheet_data('_Departments')
-        return pd.DataFrame(data)
+        return normalize_departments(_cached_get_sheet_data('_Departments'))
 
     def get_groups(self, dept_id: Optional[str] = None) -> pd.DataFrame:
         """목장 목록 (5분 캐시)"""
-        data = _cached_get_sheet_data('_Groups')
-        df = pd.DataFrame(data)
+        df = normalize_groups(_cached_get_sheet_data('_Groups'))
         if dept_id and not df.empty:
-            df = df[df['dept_id'] == dept_id]
+            df = df[df['dept_id'] == str(dept_id)]
         return df
     
     def get_faith_events(self, member_id: str) -> pd.DataFrame:
@@ -448,15 +981,6 @@ class SheetsAPI:
         Returns: [{'dept_id': '1', 'name': '장년부', 'emoji': '👨‍👩‍👧', 'css_class': 'adults',
                    'total': 108, 'present': 85, 'rate': 78.7}, ...]
         """
-        # 이모지/CSS 클래스 매핑 (부서명 기반)
-        style_mapping = {
-            '장년부': {'emoji': '👨‍👩‍👧', 'css_class': 'adults'},
-            '청년부': {'emoji': '🎓', 'css_class': 'youth'},
-            '청소년부': {'emoji': '🎒', 'css_class': 'teens'},
-            '어린이부': {'emoji': '🧒', 'css_class': 'children'},
-        }
-        default_style = {'emoji': '👥', 'css_class': 'default'}
-
         # 부서 목록 조회 (DB에서)
         departments = self.get_departments()
         if departments.empty:
@@ -467,9 +991,10 @@ class SheetsAPI:
         if members.empty:
             return []
 
-        # 출석 데이터 조회
+        # 출석 비트맵에서 부서별 재적/출석 인원 집계
         year = int(date[:4])
-        attendance = self.get_attendance(year, date=date)
+        present_mask = self.get_attendance_store(year).present_mask(members['member_id'].tolist(), date)
+        totals, presents = self._group_counts(members['dept_id'].to_numpy(), present_mask)
 
         results = []
         for _, dept in departments.iterrows():
@@ -479,26 +1004,15 @@ class SheetsAPI:
             if not dept_id:
                 continue
 
-            # 해당 부서 성도 필터
-            dept_members = members[members['dept_id'].astype(str) == dept_id]
-            total = len(dept_members)
-
+            total = int(totals.get(dept_id, 0))
             if total == 0:
                 continue
 
             # 출석자 수 (attend_type '1' 또는 '2')
-            if not attendance.empty:
-                dept_attendance = attendance[
-                    attendance['member_id'].isin(dept_members['member_id'].tolist())
-                ]
-                present = len(dept_attendance[
-                    dept_attendance['attend_type'].astype(str).isin(['1', '2'])
-                ])
-            else:
-                present = 0
+            present = int(presents.get(dept_id, 0))
 
             # 스타일 매핑
-            style = style_mapping.get(dept_name, default_style)
+            style = DEPT_STYLES.get(dept_name, DEPT_DEFAULT_STYLE)
 
             results.append({
                 'dept_id': dept_id,
@@ -518,19 +1032,6 @@ class SheetsAPI:
         Returns: [{'group_id': '1', 'name': '네팔 목장', 'emoji': '🇳🇵', 'css_class': 'nepal',
                    'total': 12, 'present': 11, 'rate': 91.7}, ...]
         """
-        # 이모지/CSS 클래스 매핑 (목장명 기반)
-        style_mapping = {
-            '네팔 목장': {'emoji': '🇳🇵', 'css_class': 'nepal'},
-            '러시아 목장': {'emoji': '🇷🇺', 'css_class': 'russia'},
-            '필리핀 목장': {'emoji': '🇵🇭', 'css_class': 'philippines'},
-            '태국 목장': {'emoji': '🇹🇭', 'css_class': 'thailand'},
-            '베냉 목장': {'emoji': '🇧🇯', 'css_class': 'benin'},
-            '콩고 목장': {'emoji': '🇨🇩', 'css_class': 'congo'},
-            '칠레 목장': {'emoji': '🇨🇱', 'css_class': 'chile'},
-            '철원 목장': {'emoji': '🏔️', 'css_class': 'cheorwon'},
-        }
-        default_style = {'emoji': '🏠', 'css_class': 'default'}
-
         # 목장 목록 조회 (DB에서)
         groups = self.get_groups()
         if groups.empty:
@@ -541,9 +1042,10 @@ class SheetsAPI:
         if members.empty:
             return []
 
-        # 출석 데이터 조회
+        # 출석 비트맵에서 목장별 재적/출석 인원 집계
         year = int(date[:4])
-        attendance = self.get_attendance(year, date=date)
+        present_mask = self.get_attendance_store(year).present_mask(members['member_id'].tolist(), date)
+        totals, presents = self._group_counts(members['group_id'].to_numpy(), present_mask)
 
         results = []
         for _, group in groups.iterrows():
@@ -553,26 +1055,15 @@ class SheetsAPI:
             if not group_id:
                 continue
 
-            # 해당 목장 성도 필터
-            group_members = members[members['group_id'].astype(str) == group_id]
-            total = len(group_members)
-
+            total = int(totals.get(group_id, 0))
             if total == 0:
                 continue
 
             # 출석자 수
-            if not attendance.empty:
-                group_attendance = attendance[
-                    attendance['member_id'].isin(group_members['member_id'].tolist())
-                ]
-                present = len(group_attendance[
-                    group_attendance['attend_type'].astype(str).isin(['1', '2'])
-                ])
-            else:
-                present = 0
+            present = int(presents.get(group_id, 0))
 
             # 스타일 매핑
-            style = style_mapping.get(group_name, default_style)
+            style = MOKJANG_STYLES.get(group_name, MOKJANG_DEFAULT_STYLE)
 
             results.append({
                 'group_id': group_id,
@@ -591,7 +1082,11 @@ class SheetsAPI:
         이번 달 신규 등록 성도 수 (재적 성도 기준)
         Returns: {'count': 3, 'last_month_count': 5}
         """
-        members = self.get_members({'status': '재적'})
+        return self._count_new_members(self.get_members({'status': '재적'}))
+
+    @staticmethod
+    def _count_new_members(members: pd.DataFrame) -> Dict:
+        """재적 성도 DataFrame에서 이번 달/지난 달 신규 등록 수 집계"""
         if members.empty:
             return {'count': 0, 'last_month_count': 0}
 
@@ -616,58 +1111,76 @@ class SheetsAPI:
             'last_month_count': len(last_month_new)
         }
 
-    def get_3week_absent_members(self) -> List[Dict]:
+    def get_3week_absent_members(
+        self,
+        min_weeks: int = 3,
+        window: Optional[int] = None,
+        base_date: Optional[str] = None
+    ) -> List[Dict]:
         """
         3주 연속 결석 성도 목록 (재적 성도 기준)
+
+        Args:
+            min_weeks: 알림 기준 연속 결석 주 수
+            window: 연속 결석을 세는 최대 주 수 (기본값 min_weeks, 연도 경계 포함)
+            base_date: 기준 날짜 (YYYY-MM-DD, 일요일). None이면 오늘 기준 최근 일요일
+
         Returns: [{'member_id': 'M001', 'name': '홍길동', 'weeks_absent': 3, 'dept_name': '장년부'}, ...]
         """
-        now = pd.Timestamp.now()
-        # 지난 일요일
-        days_since_sunday = (now.weekday() + 1) % 7
-        last_sunday = now - pd.Timedelta(days=days_since_sunday)
+        window = max(window or min_weeks, min_weeks)
+
+        if base_date:
+            last_sunday = pd.Timestamp(base_date)
+        else:
+            now = pd.Timestamp.now()
+            # 지난 일요일
+            days_since_sunday = (now.weekday() + 1) % 7
+            last_sunday = now - pd.Timedelta(days=days_since_sunday)
 
         members = self.get_members({'status': '재적'})
         if members.empty:
             return []
 
         # 부서명 매핑
-        departments = self.get_departments()
-        dept_map = {}
-        if not departments.empty:
-            dept_map = dict(zip(departments['dept_id'].astype(str), departments['dept_name']))
+        dept_map = self._dept_name_map(self.get_departments())
 
-        # 최근 3주 일요일 날짜들
+        # 최근 window주 일요일 날짜들 (과거 → 최근)
         sundays = [
             (last_sunday - pd.Timedelta(weeks=i)).strftime('%Y-%m-%d')
-            for i in range(3)
+            for i in range(window - 1, -1, -1)
         ]
 
-        absent_candidates = {}
-
-        for member_id in members['member_id'].tolist():
-            absent_count = 0
-            for sunday in sundays:
-                # 각 주마다 연도 추출 (연도 경계 처리)
-                year = int(sunday[:4])
-                attendance = self.get_attendance(year, date=sunday, member_ids=[member_id])
-                if attendance.empty:
-                    absent_count += 1
-                elif not attendance[attendance['attend_type'].astype(str).isin(['1', '2'])].empty:
-                    break  # 출석했으면 패스
-                else:
-                    absent_count += 1
-
-            if absent_count >= 3:
-                member_info = members[members['member_id'] == member_id].iloc[0]
-                dept_id = str(member_info.get('dept_id', ''))
-                absent_candidates[member_id] = {
-                    'member_id': member_id,
-                    'name': member_info['name'],
-                    'weeks_absent': absent_count,
-                    'dept_name': dept_map.get(dept_id, '기타')
-                }
+        # 전체 성도의 연속 결석 주 수를 한 번에 계산
+        matrix = self.get_presence_matrix(members['member_id'].tolist(), sundays)
+        return self._streak_members(members, matrix, dept_map, min_weeks)
+
+    @staticmethod
+    def _dept_name_map(departments: pd.DataFrame) -> Dict[str, str]:
+        """부서 ID(문자열) → 부서명"""
+        if departments.empty:
+            return {}
+        return dict(zip(departments['dept_id'], departments['dept_name']))
+
+    @staticmethod
+    def _streak_members(members: pd.DataFrame, presence: np.ndarray, dept_map: Dict, min_weeks: int) -> List[Dict]:
+        """출석 행렬(성도 × 주일, 과거 → 최근)에서 min_weeks주 이상 연속 결석 성도 추출"""
+        streaks = absence_streaks(presence)
 
-        return list(absent_candidates.values())
+        absent = members.assign(
+            weeks_absent=streaks,
+            dept_name=members['dept_id'].astype(object).map(dept_map).fillna('기타')
+        )
+        absent = absent[absent['weeks_absent'] >= min_weeks].drop_duplicates('member_id')
+
+        return [
+            {
+                'member_id': row['member_id'],
+                'name': row['name'],
+                'weeks_absent': int(row['weeks_absent']),
+                'dept_name': row['dept_name']
+            }
+            for row in absent[['member_id', 'name', 'weeks_absent', 'dept_name']].to_dict('records')
+        ]
 
     def get_birthdays_this_week(self) -> List[Dict]:
         """
@@ -679,11 +1192,13 @@ class SheetsAPI:
             return []
 
         # 부서명 매핑
-        departments = self.get_departments()
-        dept_map = {}
-        if not departments.empty:
-            dept_map = dict(zip(departments['dept_id'].astype(str), departments['dept_name']))
+        dept_map = self._dept_name_map(self.get_departments())
 
+        return self._find_birthdays(members, dept_map)
+
+    @staticmethod
+    def _find_birthdays(members: pd.DataFrame, dept_map: Dict) -> List[Dict]:
+        """재적 성도 DataFrame에서 이번 주(월~일) 생일자 추출"""
         now = pd.Timestamp.now()
         # 이번 주 시작(월요일)과 끝(일요일)
         week_start = now - pd.Timedelta(days=now.weekday())
@@ -734,14 +1249,6 @@ class SheetsAPI:
         days_since_sunday = (now.weekday() + 1) % 7
         last_sunday = now - pd.Timedelta(days=days_since_sunday)
 
-        # 부서 ID → CSS 클래스 매핑
-        dept_name_to_key = {
-            '장년부': 'adults',
-            '청년부': 'youth',
-            '청소년부': 'teens',
-            '어린이부': 'children'
-        }
-
         # 부서 목록 조회
         departments = self.get_departments()
         if departments.empty:
@@ -752,41 +1259,30 @@ class SheetsAPI:
         if members.empty:
             return []
 
-        results = []
-
         # 8주 역순 (오래된 것부터)
-        for i in range(7, -1, -1):
-            sunday = last_sunday - pd.Timedelta(weeks=i)
-            sunday_str = sunday.strftime('%Y-%m-%d')
-            week_label = sunday.strftime('%m월 %d일').replace(' 0', ' ').lstrip('0')
+        sundays = [last_sunday - pd.Timedelta(weeks=i) for i in range(7, -1, -1)]
 
-            year = int(sunday_str[:4])
-            attendance = self.get_attendance(year, date=sunday_str)
+        # 성도 × 8주 출석 행렬 → 부서별 주간 출석자 수 (부서 × 8주)
+        matrix = self.get_presence_matrix(
+            members['member_id'].tolist(),
+            [s.strftime('%Y-%m-%d') for s in sundays]
+        )
+        dept_weekly = pd.DataFrame(matrix).groupby(members['dept_id'].to_numpy()).sum()
 
+        results = []
+        for col, sunday in enumerate(sundays):
+            week_label = sunday.strftime('%m월 %d일').replace(' 0', ' ').lstrip('0')
             week_data = {'week': week_label, 'adults': 0, 'youth': 0, 'teens': 0, 'children': 0}
 
             for _, dept in departments.iterrows():
                 dept_id = str(dept.get('dept_id', ''))
-                dept_name = dept.get('dept_name', '')
-                dept_key = dept_name_to_key.get(dept_name)
+                dept_key = DEPT_CHART_KEYS.get(dept.get('dept_name', ''))
 
                 if not dept_key:
                     continue
 
-                # 해당 부서 성도 필터
-                dept_members = members[members['dept_id'].astype(str) == dept_id]
-                member_ids = dept_members['member_id'].tolist()
-
-                # 출석자 수
-                if not attendance.empty and member_ids:
-                    dept_attendance = attendance[attendance['member_id'].isin(member_ids)]
-                    present = len(dept_attendance[
-                        dept_attendance['attend_type'].astype(str).isin(['1', '2'])
-                    ])
-                else:
-                    present = 0
-
-                week_data[dept_key] = present
+                if dept_id in dept_weekly.index:
+                    week_data[dept_key] = int(dept_weekly.at[dept_id, col])
 
             results.append(week_data)
 
@@ -812,15 +1308,6 @@ class SheetsAPI:
             ...
         ]
         """
-        # 스타일 매핑
-        style_mapping = {
-            '장년부': {'emoji': '👴', 'css_class': 'adults'},
-            '청년부': {'emoji': '👨', 'css_class': 'youth'},
-            '청소년부': {'emoji': '👦', 'css_class': 'teens'},
-            '어린이부': {'emoji': '👧', 'css_class': 'children'},
-        }
-        default_style = {'emoji': '👥', 'css_class': 'default'}
-
         # 부서 목록
         departments = self.get_departments()
         if departments.empty:
@@ -841,8 +1328,19 @@ class SheetsAPI:
             last_sunday = now - pd.Timedelta(days=days_since_sunday)
             last_sunday_str = last_sunday.strftime('%Y-%m-%d')
 
-        year = int(last_sunday_str[:4])
-        attendance = self.get_attendance(year, date=last_sunday_str)
+        # 부서별 재적/출석 인원 (출석 비트맵)
+        totals, presents = {}, {}
+        if not members.empty:
+            year = int(last_sunday_str[:4])
+            present_mask = self.get_attendance_store(year).present_mask(
+                members['member_id'].tolist(), last_sunday_str
+            )
+            totals, presents = self._group_counts(members['dept_id'].to_numpy(), present_mask)
+
+        # 부서별 목장 수
+        group_counts = {}
+        if not groups.empty:
+            group_counts = groups['dept_id'].value_counts().to_dict()
 
         results = []
 
@@ -854,30 +1352,17 @@ class SheetsAPI:
                 continue
 
             # 스타일
-            style = style_mapping.get(dept_name, default_style)
+            style = DEPT_CARD_STYLES.get(dept_name, DEPT_DEFAULT_STYLE)
 
             # 목장 수
-            if not groups.empty:
-                dept_groups = groups[groups['dept_id'].astype(str) == dept_id]
-                groups_count = len(dept_groups)
-            else:
-                groups_count = 0
+            groups_count = int(group_counts.get(dept_id, 0))
 
             # 성도 수
-            if not members.empty:
-                dept_members = members[members['dept_id'].astype(str) == dept_id]
-                members_count = len(dept_members)
-                member_ids = dept_members['member_id'].tolist()
-            else:
-                members_count = 0
-                member_ids = []
+            members_count = int(totals.get(dept_id, 0))
 
             # 출석률
-            if members_count > 0 and not attendance.empty and member_ids:
-                dept_attendance = attendance[attendance['member_id'].isin(member_ids)]
-                present = len(dept_attendance[
-                    dept_attendance['attend_type'].astype(str).isin(['1', '2'])
-                ])
+            if members_count > 0:
+                present = int(presents.get(dept_id, 0))
                 attendance_rate = int((present / members_count) * 100)
             else:
                 attendance_rate = 0
@@ -918,34 +1403,20 @@ class SheetsAPI:
             return [0] * 8
 
         # 해당 부서 성도
-        dept_members = members[members['dept_id'].astype(str) == str(dept_id)]
+        dept_members = members[members['dept_id'] == str(dept_id)]
         total = len(dept_members)
         if total == 0:
             return [0] * 8
 
-        member_ids = dept_members['member_id'].tolist()
-
-        results = []
-
-        for i in range(7, -1, -1):
-            sunday = last_sunday - pd.Timedelta(weeks=i)
-            sunday_str = sunday.strftime('%Y-%m-%d')
-            year = int(sunday_str[:4])
-
-            attendance = self.get_attendance(year, date=sunday_str)
-
-            if not attendance.empty:
-                dept_attendance = attendance[attendance['member_id'].isin(member_ids)]
-                present = len(dept_attendance[
-                    dept_attendance['attend_type'].astype(str).isin(['1', '2'])
-                ])
-                rate = int((present / total) * 100)
-            else:
-                rate = 0
+        sundays = [
+            (last_sunday - pd.Timedelta(weeks=i)).strftime('%Y-%m-%d')
+            for i in range(7, -1, -1)
+        ]
 
-            results.append(rate)
+        # 주별 출석자 수 (부서 성도 × 8주 행렬의 열 합)
+        weekly_present = self.get_presence_matrix(dept_members['member_id'].tolist(), sundays).sum(axis=0)
 
-        return results
+        return [int((present / total) * 100) for present in weekly_present]
 
     def get_groups_by_dept(self, dept_id: str) -> List[Dict]:
         """
@@ -969,7 +1440,7 @@ class SheetsAPI:
 
             # 성도 수
             if not members.empty:
-                group_members = members[members['group_id'].astype(str) == group_id]
+                group_members = members[members['group_id'] == group_id]
                 members_count = len(group_members)
             else:
                 members_count = 0
@@ -1016,11 +1487,11 @@ class SheetsAPI:
             return {'weeks': [w['label'] for w in weeks], 'members': []}
 
         # 부서 필터
-        dept_members = members[members['dept_id'].astype(str) == str(dept_id)]
+        dept_members = members[members['dept_id'] == str(dept_id)]
 
         # 목장 필터 (선택적)
         if group_id:
-            dept_members = dept_members[dept_members['group_id'].astype(str) == str(group_id)]
+            dept_members = dept_members[dept_members['group_id'] == str(group_id)]
 
         if dept_members.empty:
             return {'weeks': [w['label'] for w in weeks], 'members': []}
@@ -1032,41 +1503,22 @@ class SheetsAPI:
             for _, g in groups.iterrows():
                 group_map[str(g.get('group_id', ''))] = g.get('group_name', '')
 
-        # 각 주차별 출석 데이터 조회
-        attendance_by_week = {}
-        for week in weeks:
-            year = int(week['date'][:4])
-            attendance = self.get_attendance(year, date=week['date'])
-            attendance_by_week[week['date']] = attendance
+        # 성도 × 8주 출석 행렬
+        matrix = self.get_presence_matrix(
+            dept_members['member_id'].tolist(),
+            [w['date'] for w in weeks]
+        ).astype(int)
 
         # 멤버별 출석 현황 집계
         result_members = []
-        for _, member in dept_members.iterrows():
-            member_id = member.get('member_id', '')
-            name = member.get('name', '')
+        for row, (_, member) in enumerate(dept_members.iterrows()):
             group_id_val = str(member.get('group_id', ''))
-            group_name = group_map.get(group_id_val, '-')
-
-            # 8주 출석 상태
-            attendance_list = []
-            for week in weeks:
-                att_df = attendance_by_week[week['date']]
-                if att_df.empty:
-                    attendance_list.append(0)
-                else:
-                    member_att = att_df[att_df['member_id'] == member_id]
-                    if member_att.empty:
-                        attendance_list.append(0)
-                    elif member_att['attend_type'].astype(str).isin(['1', '2']).any():
-                        attendance_list.append(1)
-                    else:
-                        attendance_list.append(0)
 
             result_members.append({
-                'member_id': member_id,
-                'name': name,
-                'group_name': group_name,
-                'attendance': attendance_list
+                'member_id': member.get('member_id', ''),
+                'name': member.get('name', ''),
+                'group_name': group_map.get(group_id_val, '-'),
+                'attendance': matrix[row].tolist()
             })
 
         # 이름순 정렬
@@ -0,0 +1,467 @@
+"""로컬 Sheets 에뮬레이터 - 앱이 쓰는 gspread 기능만 프로세스 안에서 흉내 (지연/할당량 시뮬레이션)"""
+
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+import requests
+from gspread.cell import Cell
+from gspread.exceptions import APIError, GSpreadException, WorksheetNotFound
+from gspread.utils import a1_range_to_grid_range, numericise_all, to_records
+
+from . import sheets_scheduler
+
+# 환경변수 설정 (SHEETS_BACKEND=emulator일 때 client_from_env()가 사용)
+DATA_ENV = 'SHEETS_EMULATOR_DATA'                   # 초기 데이터 JSON 경로 ({시트 제목: [[헤더], [행], ...]})
+LATENCY_ENV = 'SHEETS_EMULATOR_LATENCY'             # 호출당 지연 (초)
+JITTER_ENV = 'SHEETS_EMULATOR_JITTER'               # 지연 변동폭 (초, 0 ~ 값 사이 추가)
+READS_ENV = 'SHEETS_EMULATOR_READS_PER_MINUTE'      # 분당 읽기 한도 (0이면 무제한)
+WRITES_ENV = 'SHEETS_EMULATOR_WRITES_PER_MINUTE'    # 분당 쓰기 한도 (0이면 무제한)
+
+
+def _cell(value) -> str:
+    """저장 값 → 시트 표시 값 (FORMATTED_VALUE처럼 문자열, 정수 실수는 소수점 없이)"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _trim(rows: List[List[str]]) -> List[List[str]]:
+    """API 응답처럼 행 끝 빈 칸과 끝쪽 빈 행 제거"""
+    trimmed = []
+    for row in rows:
+        end = len(row)
+        while end and row[end - 1] == '':
+            end -= 1
+        trimmed.append(row[:end])
+    while trimmed and not trimmed[-1]:
+        trimmed.pop()
+    return trimmed
+
+
+def _api_error(code: int, status: str, message: str) -> APIError:
+    """실제 API 오류 응답과 같은 모양의 APIError (scheduled면 스케줄러가 재시도, 아니면 호출부로 그대로 올라감)"""
+    response = requests.Response()
+    response.status_code = code
+    response._content = json.dumps({'error': {'code': code, 'status': status, 'message': message}}).encode()
+    return APIError(response)
+
+
+# 값 조회가 아닌 읽기 (계측에서 metadata로 분류)
+_METADATA_CALLS = {'worksheets', 'worksheet', 'get_lastUpdateTime'}
+
+
+class _Quota:
+    """분당 호출 한도 (최근 60초 호출 수 기준, 넘으면 429)"""
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self.calls = deque()
+
+    def check(self, kind: str):
+        if not self.per_minute:
+            return
+        now = time.monotonic()
+        while self.calls and now - self.calls[0] >= 60:
+            self.calls.popleft()
+        if len(self.calls) >= self.per_minute:
+            raise _api_error(
+                429, 'RESOURCE_EXHAUSTED',
+                f"Quota exceeded for quota metric '{kind.title()} requests' (emulator: {self.per_minute}/min)"
+            )
+        self.calls.append(now)
+
+
+class EmulatedWorksheet:
+    """gspread.Worksheet 대역 (값은 표시 문자열의 2차원 목록, 1행 = 헤더)"""
+
+    def __init__(self, spreadsheet: 'EmulatedSpreadsheet', sheet_id: int, title: str,
+                 rows: Optional[List[List[Any]]] = None):
+        self.spreadsheet = spreadsheet
+        self.id = sheet_id
+        self.title = title
+        self._rows: List[List[str]] = [[_cell(v) for v in row] for row in rows or []]
+
+    def __repr__(self):
+        return f"<EmulatedWorksheet '{self.title}' id:{self.id}>"
+
+    @property
+    def row_count(self) -> int:
+        return len(self._rows)
+
+    # ===== 내부 (호출자가 잠금 보유) =====
+
+    def _grid(self, range_name: Optional[str]):
+        """A1 범위 → (행 시작, 행 끝, 열 시작, 열 끝) 0부터, 끝은 미포함 (None이면 끝까지)"""
+        if not range_name:
+            return 0, None, 0, None
+        grid = a1_range_to_grid_range(range_name.split('!')[-1])
+        return (grid.get('startRowIndex', 0), grid.get('endRowIndex'),
+                grid.get('startColumnIndex', 0), grid.get('endColumnIndex'))
+
+    def _read(self, range_name: Optional[str] = None) -> List[List[str]]:
+        top, bottom, left, right = self._grid(range_name)
+        values = _trim([row[left:right] for row in self._rows[top:bottom]])
+        self.spreadsheet.rows['read'] += len(values)
+        return values
+
+    def _write(self, top: int, left: int, values: Iterable[Iterable[Any]]):
+        for r, row in enumerate(values, start=top):
+            self.spreadsheet.rows['written'] += 1
+            while len(self._rows) <= r:
+                self._rows.append([])
+            target = self._rows[r]
+            for c, value in enumerate(row, start=left):
+                while len(target) <= c:
+                    target.append('')
+                target[c] = _cell(value)
+
+    def _append(self, values: List[List[Any]]) -> Dict:
+        start = len(_trim(self._rows)) + 1
+        del self._rows[start - 1:]
+        self._write(start - 1, 0, values)
+        end = start + len(values) - 1
+        width = max((len(row) for row in values), default=1)
+        last_col = re.sub(r'\d', '', Cell(1, max(width, 1)).address)
+        return {'updates': {'updatedRange': f"'{self.title}'!A{start}:{last_col}{end}",
+                            'updatedRows': len(values)}}
+
+    # ===== 읽기 =====
+
+    def get_all_values(self, *args, **kwargs) -> List[List[str]]:
+        """전체 값 (gspread처럼 직사각형으로 채움)"""
+        self.spreadsheet._call('read', 'get_all_values')
+        with self.spreadsheet._lock:
+            rows = _trim(self._rows)
+            self.spreadsheet.rows['read'] += len(rows)
+        width = max((len(row) for row in rows), default=0)
+        return [row + [''] * (width - len(row)) for row in rows]
+
+    def get_all_records(self, head: int = 1, default_blank: str = '', empty2zero: bool = False, **kwargs) -> List[Dict]:
+        """gspread.get_all_records와 같은 변환 (숫자 문자열 → int/float, 중복 헤더는 예외)"""
+        self.spreadsheet._call('read', 'get_all_records')
+        with self.spreadsheet._lock:
+            rows = _trim(self._rows)
+            self.spreadsheet.rows['read'] += len(rows)
+        if len(rows) < head:
+            return []
+        width = max(len(row) for row in rows)
+        rows = [row + [''] * (width - len(row)) for row in rows]
+        keys = rows[head - 1]
+        duplicates = [k for k, n in Counter(keys).items() if n > 1]
+        if duplicates:
+            raise GSpreadException(f"the header row in the worksheet contains duplicates: {duplicates}")
+        values = [numericise_all(row, empty2zero, default_blank) for row in rows[head:]]
+        return to_records(keys, values)
+
+    def row_values(self, row: int, **kwargs) -> List[str]:
+        self.spreadsheet._call('read', 'row_values')
+        with self.spreadsheet._lock:
+            return (_trim([self._rows[row - 1]]) or [[]])[0] if row <= len(self._rows) else []
+
+    def batch_get(self, ranges: Iterable[str], **kwargs) -> List[List[List[str]]]:
+        """범위별 값 (1회 호출)"""
+        self.spreadsheet._call('read', 'batch_get')
+        with self.spreadsheet._lock:
+            return [self._read(r) for r in ranges]
+
+    def find(self, query, in_row: Optional[int] = None, in_column: Optional[int] = None,
+             case_sensitive: bool = True) -> Optional[Cell]:
+        """첫 번째 일치 셀 (문자열 또는 정규식)"""
+        self.spreadsheet._call('read', 'find')
+        with self.spreadsheet._lock:
+            for r, row in enumerate(self._rows, start=1):
+                if in_row is not None and r != in_row:
+                    continue
+                for c, value in enumerate(row, start=1):
+                    if in_column is not None and c != in_column:
+                        continue
+                    if isinstance(query, re.Pattern):
+                        matched = bool(query.search(value))
+                    elif case_sensitive:
+                        matched = value == query
+                    else:
+                        matched = value.lower() == str(query).lower()
+                    if matched:
+                        return Cell(r, c, value)
+        return None
+
+    # ===== 쓰기 =====
+
+    def append_row(self, values: List[Any], value_input_option: str = 'RAW', **kwargs) -> Dict:
+        return self.append_rows([values], value_input_option, **kwargs)
+
+    def append_rows(self, values: List[List[Any]], value_input_option: str = 'RAW', **kwargs) -> Dict:
+        """마지막 값 행 다음에 추가 (응답 updatedRange 포함)"""
+        self.spreadsheet._call('write', 'append_rows')
+        with self.spreadsheet._lock:
+            return self._append([list(row) for row in values])
+
+    def update(self, values, range_name: Optional[str] = None, **kwargs) -> Dict:
+        """범위 쓰기 (예전 gspread 순서 update('A1', values)도 허용)"""
+        if isinstance(values, str):
+            values, range_name = range_name, values
+        self.spreadsheet._call('write', 'update')
+        with self.spreadsheet._lock:
+            top, _, left, _ = self._grid(range_name or 'A1')
+            self._write(top, left, values)
+        return {'updatedRange': f"'{self.title}'!{range_name or 'A1'}"}
+
+    def update_cell(self, row: int, col: int, value) -> Dict:
+        self.spreadsheet._call('write', 'update_cell')
+        with self.spreadsheet._lock:
+            self._write(row - 1, col - 1, [[value]])
+        return {'updatedCells': 1}
+
+    def batch_update(self, data: Iterable[Dict], **kwargs) -> Dict:
+        """여러 범위 쓰기 (1회 호출)"""
+        self.spreadsheet._call('write', 'batch_update')
+        with self.spreadsheet._lock:
+            data = list(data)
+            for item in data:
+                top, _, left, _ = self._grid(item['range'])
+                self._write(top, left, item['values'])
+        return {'totalUpdatedRanges': len(data)}
+
+    def delete_rows(self, start_index: int, end_index: Optional[int] = None) -> Dict:
+        """start_index ~ end_index 행 삭제 (1부터, 끝 포함)"""
+        self.spreadsheet._call('write', 'delete_rows')
+        with self.spreadsheet._lock:
+            del self._rows[start_index - 1:(end_index or start_index)]
+        return {}
+
+    def clear(self) -> Dict:
+        self.spreadsheet._call('write', 'clear')
+        with self.spreadsheet._lock:
+            self._rows = []
+        return {}
+
+
+class EmulatedSpreadsheet:
+    """
+    gspread.Spreadsheet 대역 - 앱이 사용하는 Sheets/Drive 기능의 인메모리 구현
+
+    - 호출마다 latency(+0~jitter)초 대기 → 네트워크 왕복 비용 재현
+    - 분당 읽기/쓰기 한도를 넘으면 실제 API와 같은 429 APIError
+    - calls / rows: 메서드별 호출 수, 읽고 쓴 행 수 (벤치마크에서 API 비용 비교용)
+    - 쓰기마다 get_lastUpdateTime()이 바뀜 (스냅샷 유효성 확인 경로도 그대로 동작)
+
+    구현하지 않은 batch_update 요청은 400 오류로 알려, 앱이 새 기능을 쓰기 시작하면
+    에뮬레이터도 함께 확장하도록 합니다.
+
+    Args:
+        sheets: {시트 제목: [[헤더], [행], ...]} 초기 데이터
+        latency: 호출당 지연 (초)
+        jitter: 지연 변동폭 (초)
+        reads_per_minute / writes_per_minute: 분당 한도 (0이면 무제한)
+        scheduled: True면 호출마다 실제 연결과 같은 스케줄러(sheets_scheduler.schedule - 토큰 버킷,
+                   429/5xx 재시도, 계측)를 거침. False면 에뮬레이터 오류가 호출부로 바로 올라감
+    """
+
+    def __init__(self, sheets: Optional[Dict[str, List[List[Any]]]] = None, latency: float = 0.0,
+                 jitter: float = 0.0, reads_per_minute: int = 0, writes_per_minute: int = 0,
+                 spreadsheet_id: str = 'emulator', title: str = 'emulator', scheduled: bool = False):
+        self.id = spreadsheet_id
+        self.title = title
+        self.latency = latency
+        self.jitter = jitter
+        self.scheduled = scheduled
+        self.calls: Counter = Counter()
+        self.rows: Counter = Counter()  # 'read'/'written' 행 수 (벤치마크의 처리 행 수)
+        self._quotas = {'read': _Quota(reads_per_minute), 'write': _Quota(writes_per_minute)}
+        self._lock = threading.RLock()
+        self._worksheets: List[EmulatedWorksheet] = []
+        self._modified = time.time()
+        for title, rows in (sheets or {}).items():
+            self._worksheets.append(EmulatedWorksheet(self, len(self._worksheets), title, rows))
+
+    def __repr__(self):
+        return f"<EmulatedSpreadsheet {[ws.title for ws in self._worksheets]}>"
+
+    def _call(self, kind: str, method: str):
+        """호출 1회 처리 (scheduled면 스케줄러 경유 - 할당량 초과 시 대기/재시도)"""
+        if not self.scheduled:
+            return self._transmit(kind, method)
+        endpoint = f'emulator/{method}' if method in _METADATA_CALLS or kind == 'write' else f'emulator/values/{method}'
+        sheets_scheduler.schedule(kind, 'GET' if kind == 'read' else 'POST', endpoint,
+                                  lambda: self._transmit(kind, method))
+
+    def _transmit(self, kind: str, method: str):
+        """요청 1회: 지연 → 할당량 확인 → 호출 수 기록 (쓰기는 수정 시각 갱신)"""
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+        with self._lock:
+            self._quotas[kind].check(kind)
+            self.calls[method] += 1
+            if kind == 'write':
+                self._modified = max(time.time(), self._modified + 1e-6)
+
+    def _sheet(self, title: str) -> EmulatedWorksheet:
+        for ws in self._worksheets:
+            if ws.title == title:
+                return ws
+        raise WorksheetNotFound(title)
+
+    def _sheet_by_id(self, sheet_id: int) -> EmulatedWorksheet:
+        for ws in self._worksheets:
+            if ws.id == sheet_id:
+                return ws
+        raise _api_error(400, 'INVALID_ARGUMENT', f'No grid with id: {sheet_id}')
+
+    # ===== 시트 =====
+
+    def worksheets(self, exclude_hidden: bool = False) -> List[EmulatedWorksheet]:
+        self._call('read', 'worksheets')
+        with self._lock:
+            return list(self._worksheets)
+
+    def worksheet(self, title: str) -> EmulatedWorksheet:
+        self._call('read', 'worksheet')
+        with self._lock:
+            return self._sheet(title)
+
+    def add_worksheet(self, title: str, rows: int = 1000, cols: int = 26, index: Optional[int] = None) -> EmulatedWorksheet:
+        self._call('write', 'add_worksheet')
+        with self._lock:
+            if any(ws.title == title for ws in self._worksheets):
+                raise _api_error(400, 'INVALID_ARGUMENT', f'A sheet with the name "{title}" already exists.')
+            sheet = EmulatedWorksheet(self, max((ws.id for ws in self._worksheets), default=-1) + 1, title)
+            self._worksheets.append(sheet)
+            return sheet
+
+    def get_lastUpdateTime(self) -> str:
+        """Drive modifiedTime 형식 (마지막 쓰기 시각)"""
+        self._call('read', 'get_lastUpdateTime')
+        with self._lock:
+            return datetime.fromtimestamp(self._modified, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+    # ===== 값 =====
+
+    def values_batch_get(self, ranges: List[str], params: Optional[Dict] = None) -> Dict:
+        """여러 시트/범위 값 (1회 호출). 빈 범위는 실제 API처럼 values 키 없음"""
+        self._call('read', 'values_batch_get')
+        value_ranges = []
+        with self._lock:
+            for range_name in ranges:
+                title, _, cells = range_name.rpartition('!') if '!' in range_name else (range_name, '', '')
+                values = self._sheet(title.strip("'"))._read(cells or None)
+                value_ranges.append({'range': range_name, **({'values': values} if values else {})})
+        return {'spreadsheetId': self.id, 'valueRanges': value_ranges}
+
+    def values_batch_update(self, body: Dict) -> Dict:
+        """여러 시트/범위 쓰기 (1회 호출)"""
+        self._call('write', 'values_batch_update')
+        with self._lock:
+            for item in body.get('data', []):
+                title, _, cells = item['range'].rpartition('!')
+                sheet = self._sheet(title.strip("'"))
+                top, _, left, _ = sheet._grid(cells)
+                sheet._write(top, left, item['values'])
+        return {'totalUpdatedRanges': len(body.get('data', []))}
+
+    def batch_update(self, body: Dict) -> Dict:
+        """
+        spreadsheets.batchUpdate (1회 호출, 요청 순서대로 적용)
+        지원: deleteDimension(ROWS), updateCells, appendCells (userEnteredValue)
+        """
+        self._call('write', 'batch_update')
+        with self._lock:
+            for request in body.get('requests', []):
+                (kind, spec), = request.items()
+                if kind == 'deleteDimension' and spec['range'].get('dimension') == 'ROWS':
+                    grid = spec['range']
+                    del self._sheet_by_id(grid['sheetId'])._rows[grid['startIndex']:grid['endIndex']]
+                elif kind == 'updateCells' and 'start' in spec:
+                    start = spec['start']
+                    self._sheet_by_id(start['sheetId'])._write(
+                        start.get('rowIndex', 0), start.get('columnIndex', 0), self._cell_rows(spec['rows'])
+                    )
+                elif kind == 'appendCells':
+                    self._sheet_by_id(spec['sheetId'])._append(self._cell_rows(spec['rows']))
+                else:
+                    raise _api_error(400, 'INVALID_ARGUMENT', f'Emulator does not support request: {kind}')
+        return {'spreadsheetId': self.id, 'replies': [{} for _ in body.get('requests', [])]}
+
+    @staticmethod
+    def _cell_rows(rows: List[Dict]) -> List[List[Any]]:
+        """RowData → 값 목록"""
+        return [
+            [next(iter(cell.get('userEnteredValue', {'stringValue': ''}).values())) for cell in row.get('values', [])]
+            for row in rows
+        ]
+
+    # ===== 저장/불러오기 =====
+
+    def to_dict(self) -> Dict[str, List[List[str]]]:
+        """{시트 제목: 값} (호출 수/지연에 포함하지 않음)"""
+        with self._lock:
+            return {ws.title: _trim(ws._rows) for ws in self._worksheets}
+
+    def save(self, path: str):
+        """현재 데이터를 JSON으로 저장 (SHEETS_EMULATOR_DATA로 다시 불러올 수 있음)"""
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> 'EmulatedSpreadsheet':
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f), **kwargs)
+
+
+# install()로 지정한 스프레드시트 (client_from_env()가 파일 대신 사용)
+_installed: Optional[EmulatedSpreadsheet] = None
+
+
+def install(spreadsheet: Optional[EmulatedSpreadsheet]):
+    """
+    에뮬레이터 스프레드시트 지정 (벤치마크처럼 메모리에서 만든 데이터를 파일 없이 사용)
+    None이면 해제. 이미 만들어진 연결에는 적용되지 않으므로 _get_sheets_pool.clear()와 함께 사용
+    (앱 연결과 같은 할당량 대기/재시도를 거치려면 EmulatedSpreadsheet(..., scheduled=True)로 생성)
+    """
+    global _installed
+    _installed = spreadsheet
+
+
+class EmulatedClient:
+    """
+    gspread.Client 대역 (SheetsPool이 쓰는 open_by_key만)
+
+    SheetsPool(EmulatedClient(spreadsheet), SHEET_ID)처럼 실제 클라이언트 자리에 넣으면
+    SheetsAPI의 모든 읽기/쓰기 경로가 에뮬레이터로 갑니다.
+    """
+
+    def __init__(self, spreadsheet: EmulatedSpreadsheet):
+        self.spreadsheet = spreadsheet
+
+    def open_by_key(self, key: str) -> EmulatedSpreadsheet:
+        return self.spreadsheet
+
+
+def client_from_env() -> EmulatedClient:
+    """환경변수 설정으로 에뮬레이터 클라이언트 생성 (install()한 스프레드시트 → SHEETS_EMULATOR_DATA → 빈 스프레드시트 순)"""
+    if _installed is not None:
+        return EmulatedClient(_installed)
+    options = {
+        'latency': float(os.environ.get(LATENCY_ENV, 0)),
+        'jitter': float(os.environ.get(JITTER_ENV, 0)),
+        'reads_per_minute': int(os.environ.get(READS_ENV, 0)),
+        'writes_per_minute': int(os.environ.get(WRITES_ENV, 0)),
+        'scheduled': True,  # 앱 연결과 같은 스케줄러 경유
+    }
+    path = os.environ.get(DATA_ENV)
+    if path and os.path.exists(path):
+        return EmulatedClient(EmulatedSpreadsheet.load(path, **options))
+    return EmulatedClient(EmulatedSpreadsheet(**options))
@@ -0,0 +1,55 @@
+"""프로세스 공용 gspread 연결 - 인증 클라이언트 + Spreadsheet/Worksheet 핸들"""
+
+import threading
+from typing import Dict, Optional
+
+import gspread
+
+
+class SheetsPool:
+    """
+    인증된 gspread 클라이언트와 시트 핸들을 프로세스 전체에서 공유
+
+    - client: gspread.authorize() 1회 (HTTP 세션 keep-alive, 토큰 만료 시 자동 갱신)
+    - spreadsheet: open_by_key() 1회
+    - worksheet(title): 전체 시트 목록을 한 번에 받아 제목별 핸들 캐시
+
+    세션/페이지마다 인증 + 메타데이터 조회를 반복하지 않고,
+    캐시 미스 시 값 조회 요청 1회만 보내기 위한 구조입니다.
+    client는 open_by_key()만 쓰므로 로컬 에뮬레이터(sheets_emulator.EmulatedClient)로 바꿔 끼울 수 있습니다.
+    """
+
+    def __init__(self, client: gspread.Client, sheet_id: str):
+        self.client = client
+        self.spreadsheet = client.open_by_key(sheet_id)
+        self._worksheets: Dict[str, gspread.Worksheet] = {}
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        """시트 목록 다시 조회 (메타데이터 1회)"""
+        self._worksheets = {ws.title: ws for ws in self.spreadsheet.worksheets()}
+
+    def worksheet(self, title: str) -> gspread.Worksheet:
+        """제목으로 시트 핸들 조회 (없으면 목록을 한 번 갱신, 그래도 없으면 WorksheetNotFound)"""
+        with self._lock:
+            if title not in self._worksheets:
+                self._refresh()
+            try:
+                return self._worksheets[title]
+            except KeyError:
+                raise gspread.exceptions.WorksheetNotFound(title)
+
+    def add_worksheet(self, title: str, rows: int, cols: int) -> gspread.Worksheet:
+        """시트 생성 후 핸들 캐시"""
+        with self._lock:
+            sheet = self.spreadsheet.add_worksheet(title, rows, cols)
+            self._worksheets[title] = sheet
+            return sheet
+
+    def forget(self, title: Optional[str] = None):
+        """시트 핸들 폐기 (시트가 삭제/이름 변경됐을 수 있을 때). title이 없으면 전체"""
+        with self._lock:
+            if title is None:
+                self._worksheets.clear()
+            else:
+                self._worksheets.pop(title, None)
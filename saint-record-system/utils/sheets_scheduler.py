@@ -0,0 +1,175 @@
+"""Sheets API 요청 스케줄러 - 분당 할당량 토큰 버킷 + 429/5xx 재시도 + 동일 조회 합치기"""
+
+import functools
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Optional
+
+import requests
+from gspread.exceptions import APIError
+from gspread.http_client import HTTPClient
+
+from . import instrumentation
+from .single_flight import SingleFlight
+
+# 분당 요청 한도 (Sheets API 기본 할당량: 사용자별 분당 읽기 60 / 쓰기 60)
+READS_PER_MINUTE = int(os.environ.get('SHEETS_READS_PER_MINUTE', 60))
+WRITES_PER_MINUTE = int(os.environ.get('SHEETS_WRITES_PER_MINUTE', 60))
+
+MAX_RETRIES = 6       # 재시도 횟수 (대기 합계 최대 약 1분)
+BACKOFF_BASE = 1.0    # 첫 재시도 대기 상한 (초), 이후 2배씩
+BACKOFF_MAX = 32.0    # 재시도 대기 상한 (초)
+
+# 다시 보내도 되는 응답 코드 (쓰기는 처리되지 않았음이 확실한 429/408만)
+READ_RETRY_STATUS = {408, 429, 500, 502, 503, 504}
+WRITE_RETRY_STATUS = {408, 429}
+
+
+class TokenBucket:
+    """
+    분당 요청 수 제한 (토큰이 없으면 채워질 때까지 대기)
+
+    Args:
+        per_minute: 분당 허용 요청 수 (버킷 크기도 같음)
+    """
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0  # 초당 충전량
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """토큰 1개 사용 (필요하면 대기). 대기한 시간(초) 반환"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+# 할당량은 서비스 계정(프로세스 전체) 기준이므로 버킷도 프로세스 공용
+_buckets = {
+    'read': TokenBucket(READS_PER_MINUTE),
+    'write': TokenBucket(WRITES_PER_MINUTE),
+}
+
+
+# 진행 중인 동일 조회 합치기 (엔드포인트 + 파라미터 기준)
+_reads = SingleFlight()
+
+
+def _freeze(value) -> Any:
+    """요청 파라미터 → 합치기 키 (dict/list를 해시 가능한 형태로)"""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _should_retry(error: BaseException, kind: str) -> bool:
+    """재시도할 오류인지 (할당량 초과/일시적 서버 오류/연결 오류)"""
+    if isinstance(error, APIError):
+        if kind == 'read' and error.code == 403:
+            # Drive API는 할당량 초과를 403 usageLimits로 응답
+            errors = error.error.get('errors') or [{}]
+            return errors[0].get('domain') == 'usageLimits'
+        return error.code in (READ_RETRY_STATUS if kind == 'read' else WRITE_RETRY_STATUS)
+    # 연결 실패는 요청이 도달하지 않았으므로 쓰기도 재시도
+    return isinstance(error, requests.ConnectionError) or (kind == 'read' and isinstance(error, requests.Timeout))
+
+
+class SchedulingHTTPClient(HTTPClient):
+    """
+    gspread HTTP 클라이언트 - 모든 Sheets/Drive 요청이 거치는 스케줄러
+
+    - 토큰 버킷: 읽기(GET)/쓰기(그 외) 분당 한도를 넘기 전에 대기
+    - 재시도: 429/5xx 응답 시 지수 백오프 + 지터 (쓰기는 중복 반영을 피하려고 429/408만)
+    - 합치기: 같은 조회가 진행 중이면 새로 보내지 않고 그 결과를 공유
+    - 계측: 요청마다 시간/상태 코드/바이트/재시도 수를 instrumentation에 기록 (설정 > 진단)
+
+    일요일 피크처럼 할당량이 모자랄 때는 빈 결과 대신 느린 응답이 되고,
+    재시도 후에도 실패하면 예외를 그대로 올려 캐시 함수가 실패 결과를 저장하지 않게 합니다.
+    사용법: gspread.authorize(creds, http_client=SchedulingHTTPClient)
+    """
+
+    def request(self, method: str, endpoint: str, params=None, **kwargs) -> requests.Response:
+        kind = 'read' if method.upper() == 'GET' else 'write'
+        if kind == 'write':
+            return self._send(kind, method, endpoint, params=params, **kwargs)
+
+        return _reads.do(
+            (endpoint, _freeze(params)),
+            lambda: self._send(kind, method, endpoint, params=params, **kwargs)
+        )
+
+    def _send(self, kind: str, method: str, endpoint: str, **kwargs) -> requests.Response:
+        """스케줄러를 거쳐 실제 HTTP 요청 전송"""
+        return schedule(kind, method, endpoint, functools.partial(super().request, method, endpoint, **kwargs),
+                        sent=_body_size(kwargs))
+
+
+def schedule(kind: str, method: str, endpoint: str, send: Callable[[], Optional[requests.Response]],
+             sent: int = 0) -> Optional[requests.Response]:
+    """
+    토큰 확보 후 send() 실행, 재시도 가능한 오류면 백오프 후 다시 실행 (요청마다 계측 기록)
+
+    SchedulingHTTPClient와 Sheets 에뮬레이터(utils.sheets_emulator)가 같은 버킷/재시도/계측을 씁니다.
+
+    Args:
+        kind: 'read' / 'write' (버킷과 재시도 기준)
+        method / endpoint: 계측용 요청 이름
+        send: 요청 1회 전송 (응답 없이 끝나는 에뮬레이터 호출은 None 반환)
+        sent: 요청 본문 바이트
+    """
+    start = time.perf_counter()
+    status, received, throttled, attempt = None, 0, 0, 0
+    try:
+        for attempt in range(MAX_RETRIES + 1):
+            _buckets[kind].acquire()
+            try:
+                response = send()
+                if response is None:
+                    status = 200
+                else:
+                    status, received = response.status_code, len(response.content or b'')
+                return response
+            except (APIError, requests.RequestException) as e:
+                status = _error_status(e)
+                throttled += status == 429
+                if attempt == MAX_RETRIES or not _should_retry(e, kind):
+                    raise
+                # full jitter: 0 ~ min(상한, 기본 × 2^n) 사이 임의 대기 (동시 재시도 분산)
+                time.sleep(random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)))
+    finally:
+        instrumentation.record_request(
+            method, endpoint, time.perf_counter() - start, status, sent, received, attempt, throttled
+        )
+
+
+def _error_status(error: BaseException):
+    """오류의 HTTP 상태 코드 (응답 없이 실패했으면 None)"""
+    if isinstance(error, APIError):
+        return error.code
+    response = getattr(error, 'response', None)
+    return response.status_code if response is not None else None
+
+
+def _body_size(kwargs) -> int:
+    """요청 본문 바이트 (json은 직렬화 크기)"""
+    if kwargs.get('json') is not None:
+        return len(json.dumps(kwargs['json']).encode())
+    data = kwargs.get('data')
+    return len(data) if isinstance(data, (bytes, str)) else 0
@@ -0,0 +1,59 @@
+"""단일 실행(single-flight) - 같은 키의 동시 호출을 한 번의 실행으로 합침"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar('T')
+
+
+class _Call:
+    """진행 중인 실행 (기다리는 호출이 결과/예외를 공유)"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 호출 중 첫 호출만 실행하고, 나머지는 그 결과를 기다려 공유
+
+    캐시가 한꺼번에 비었을 때(TTL 만료, 캐시 초기화) 여러 세션이 같은 시트를
+    각자 내려받지 않도록 합니다. 실행이 끝나면 키를 지우므로 결과를 보관하지는 않습니다.
+    (실패도 공유만 하고 남기지 않음 - 다음 호출은 다시 실행)
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """key로 진행 중인 실행이 있으면 그 결과를, 없으면 fn()을 실행해 반환"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def in_flight(self, key: Hashable) -> bool:
+        """key로 실행 중인 호출이 있는지"""
+        with self._lock:
+            return key in self._calls
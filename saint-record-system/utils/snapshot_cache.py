@@ -0,0 +1,104 @@
+"""시트 스냅샷 디스크 캐시 - 프로세스 재시작 시 빠른 콜드 스타트"""
+
+import os
+from typing import List, Dict, Optional, Tuple
+
+import pyarrow as pa
+from gspread.utils import numericise_all
+
+# 스냅샷 디렉터리 (Railway 볼륨 등 재시작 후에도 남는 경로를 지정 가능)
+CACHE_DIR = os.environ.get(
+    'SHEETS_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'sheets')
+)
+
+_MIXED_KEY = 'mixed_columns'  # 숫자/문자가 섞인 컬럼 (문자열로 저장, 읽을 때 숫자 변환)
+
+
+def _snapshot_path(sheet_name: str) -> str:
+    return os.path.join(CACHE_DIR, f'{sheet_name}.arrow')
+
+
+def _numericise_column(values: List[str]) -> List:
+    """문자열 컬럼을 get_all_records()처럼 숫자 변환 (같은 값은 한 번만 변환)"""
+    converted = dict(zip(set(values), numericise_all(list(set(values)))))
+    return [converted[v] for v in values]
+
+
+def _column_array(values: List) -> Tuple[pa.Array, bool]:
+    """컬럼 값 → Arrow 배열 (타입이 하나면 그대로, 섞여 있으면 문자열). (배열, 섞임 여부)"""
+    types = {type(v) for v in values}
+    if types == {int}:
+        return pa.array(values, pa.int64()), False
+    if types == {float}:
+        return pa.array(values, pa.float64()), False
+    if types <= {str}:
+        return pa.array(values, pa.string()), False
+    return pa.array(['' if v is None else str(v) for v in values], pa.string()), True
+
+
+def load_snapshot(sheet_name: str) -> Optional[Tuple[List[Dict], Dict[str, str]]]:
+    """
+    저장된 스냅샷 조회 (memory-map)
+
+    Returns: (get_all_records()와 같은 형태의 레코드 목록, 메타데이터). 스냅샷이 없으면 None
+        메타데이터: modified_time (저장 당시 스프레드시트 수정 시각), synced_at (저장 날짜) 등
+    """
+    path = _snapshot_path(sheet_name)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with pa.memory_map(path) as source:
+            table = pa.ipc.open_file(source).read_all()
+        metadata = {k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()}
+
+        headers = table.column_names
+        mixed = set(metadata.pop(_MIXED_KEY, '').split('\x1f'))
+        columns = [
+            _numericise_column(table.column(h).to_pylist()) if h in mixed else table.column(h).to_pylist()
+            for h in headers
+        ]
+        return [dict(zip(headers, row)) for row in zip(*columns)], metadata
+    except Exception as e:
+        print(f"Snapshot load error ({sheet_name}): {e}")
+        return None
+
+
+def save_snapshot(sheet_name: str, records: List[Dict], **metadata: str):
+    """
+    레코드를 스냅샷으로 저장 (Arrow IPC, 임시 파일 → 교체)
+
+    Args:
+        sheet_name: 시트 이름
+        records: get_all_records() 결과
+        **metadata: modified_time (내려받기 직전의 스프레드시트 수정 시각), synced_at 등
+    """
+    try:
+        headers = list(records[0].keys()) if records else []
+        arrays, mixed = {}, []
+        for h in headers:
+            arrays[h], is_mixed = _column_array([r.get(h, '') for r in records])
+            if is_mixed:
+                mixed.append(h)
+        metadata[_MIXED_KEY] = '\x1f'.join(mixed)
+        table = pa.table(arrays, metadata={k: str(v or '') for k, v in metadata.items()})
+
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        path = _snapshot_path(sheet_name)
+        tmp_path = f'{path}.tmp'
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Snapshot save error ({sheet_name}): {e}")
+
+
+def clear_snapshots():
+    """저장된 스냅샷 전체 삭제"""
+    if not os.path.isdir(CACHE_DIR):
+        return
+    for name in os.listdir(CACHE_DIR):
+        if name.endswith('.arrow'):
+            os.remove(os.path.join(CACHE_DIR, name))
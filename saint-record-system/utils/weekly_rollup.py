@@ -0,0 +1,82 @@
+"""주간 출석 집계 테이블 - (상태, 부서, 목장) × 주일 출석 인원"""
+
+from typing import Optional, Sequence, Union
+
+import pandas as pd
+
+from .attendance_store import AttendanceStore
+
+ROLLUP_KEYS = ('status', 'dept_id', 'group_id')
+
+
+class WeeklyRollup:
+    """
+    연도별 주간 출석 집계 (미리 계산한 집계 테이블)
+
+    - counts: (status, dept_id, group_id) × 주일(YYYY-MM-DD) 출석 인원
+    - sizes: (status, dept_id, group_id)별 성도 수 (출석률 분모)
+
+    성도 × 주일 비트맵을 한 번 그룹 합계로 줄여 두면, 연간/8주/4주 차트와
+    부서/목장 통계는 성도 수와 무관하게 (그룹 수 × 주 수) 크기만 읽습니다.
+    성도/출석 데이터 버전별로 만들어 캐시합니다 (쓰기 후 새 버전에서 다시 집계).
+    """
+
+    def __init__(self, counts: pd.DataFrame, sizes: pd.Series):
+        self.counts = counts
+        self.sizes = sizes
+
+    @classmethod
+    def build(cls, members: pd.DataFrame, store: AttendanceStore) -> 'WeeklyRollup':
+        """
+        성도 프레임 + 출석 비트맵으로 집계
+
+        Args:
+            members: 성도 프레임 (모든 상태, member_id/status/dept_id/group_id)
+            store: 해당 연도 출석 비트맵
+        """
+        dates = [str(d) for d in store.dates]
+        if members.empty:
+            index = pd.MultiIndex.from_tuples([], names=ROLLUP_KEYS)
+            return cls(pd.DataFrame(columns=dates, index=index, dtype='int64'), pd.Series(index=index, dtype='int64'))
+
+        keys = [members[k].astype(str).rename(k) for k in ROLLUP_KEYS]
+        presence = store.presence_matrix(members['member_id'].tolist(), dates)
+        counts = pd.DataFrame(presence, columns=dates, index=members.index).groupby(keys).sum().astype('int64')
+        sizes = members.groupby(keys).size().astype('int64')
+        return cls(counts, sizes)
+
+    def _select(self, frame, status: Optional[str]):
+        """상태 필터 (None이면 전체)"""
+        if status is None or frame.empty:
+            return frame
+        return frame[frame.index.get_level_values('status') == status]
+
+    def present(self, dates: Sequence[str], by: Union[str, Sequence[str]] = 'dept_id',
+                status: Optional[str] = None) -> pd.DataFrame:
+        """
+        키별 주간 출석 인원
+
+        Args:
+            dates: 주일 날짜 목록 (YYYY-MM-DD, 열 순서 - 출석 기록이 없는 날짜는 0)
+            by: 집계 키 ('dept_id', 'group_id' 또는 ['dept_id', 'group_id'])
+            status: 성도 상태 필터 (예: '재적')
+
+        Returns: DataFrame (index=키, columns=dates)
+        """
+        counts = self._select(self.counts, status)
+        if counts.empty:
+            return pd.DataFrame(0, index=self._empty_index(by), columns=list(dates))
+        return counts.groupby(level=by).sum().reindex(columns=list(dates), fill_value=0)
+
+    def totals(self, by: Union[str, Sequence[str]] = 'dept_id', status: Optional[str] = None) -> pd.Series:
+        """키별 성도 수 (출석률 분모)"""
+        sizes = self._select(self.sizes, status)
+        if sizes.empty:
+            return pd.Series(dtype='int64', index=self._empty_index(by))
+        return sizes.groupby(level=by).sum()
+
+    @staticmethod
+    def _empty_index(by: Union[str, Sequence[str]]) -> pd.Index:
+        if isinstance(by, str):
+            return pd.Index([], name=by)
+        return pd.MultiIndex.from_tuples([], names=list(by))